@@ -0,0 +1,43 @@
+"""Compare the old full-scan admin lookup with the tg_id index.
+
+Run from the repository root: ``python benchmarks/bench_admin_index.py [n_admins]``
+"""
+
+import os
+import sys
+import timeit
+from pathlib import Path
+
+os.environ.setdefault("TOKEN", "fake-token-for-bench")
+os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
+os.environ.setdefault("APPLICATIONS_CHAT_ID", "1")
+os.environ.setdefault("OWNERS", "[]")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from brvideo.core.managers.admins import AdminManager, _CachedAdmin  # noqa: E402
+
+
+def main(n: int = 10_000, number: int = 1_000):
+    mgr = AdminManager()
+    for i in range(n):
+        mgr._cache[i] = _CachedAdmin.model_validate(
+            {"id": i, "nickname": f"admin{i}", "tg_id": 1_000_000 + i}
+        )
+
+    hit = 1_000_000 + n - 1  # worst case for the scan: last inserted admin
+    miss = -1
+
+    def scan(tg_id):
+        return next((True for a in mgr._cache.values() if a.tg_id == tg_id), False)
+
+    def indexed(tg_id):
+        return mgr._cache.get_by("tg_id", tg_id) is not None
+
+    for name, fn in (("scan", scan), ("index", indexed)):
+        for label, tg_id in (("hit", hit), ("miss", miss)):
+            t = timeit.timeit(lambda: fn(tg_id), number=number)
+            print(f"{name:>5} {label:>4}: {t / number * 1e6:10.2f} us/lookup ({n} admins)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
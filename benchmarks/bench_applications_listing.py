@@ -0,0 +1,120 @@
+"""Review listing latency on a large applications table.
+
+Compares keyset pages (indexed) with OFFSET pages at increasing depth, plus
+the in-memory pending queue. Uses a temporary SQLite file. Run from the
+repository root: ``python benchmarks/bench_applications_listing.py [rows]`` (default 1M)
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+os.environ.setdefault("TOKEN", "fake-token-for-bench")
+os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
+os.environ.setdefault("APPLICATIONS_CHAT_ID", "1")
+os.environ.setdefault("OWNERS", "[]")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from tortoise import Tortoise, connections  # noqa: E402
+
+from brvideo.core.enums import ApplicationStatus, Socials  # noqa: E402
+from brvideo.core.managers.applications import ApplicationManager  # noqa: E402
+from brvideo.core.models import Applications  # noqa: E402
+
+PENDING_SHARE = 0.05
+SERVERS = 90
+
+
+async def populate(n: int):
+    conn = connections.get("default")
+    socials = [s.value for s in Socials]
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rnd = random.Random(0)
+    sql = (
+        'INSERT INTO "applications" ("uid","tg_id","nickname","server","social",'
+        '"date","link_acc","accepted","reason","updated_at") VALUES (?,?,?,?,?,?,?,?,?,?)'
+    )
+    batch = []
+    for i in range(n):
+        date = (start + timedelta(seconds=i * 30)).isoformat()
+        accepted = None if rnd.random() < PENDING_SHARE else rnd.random() < 0.5
+        batch.append(
+            [str(uuid.uuid4()), i, f"Nick_{i}", rnd.randrange(SERVERS), rnd.choice(socials),
+             date, f"https://example.com/{i}", accepted, None, date]
+        )
+        if len(batch) == 50_000:
+            await conn.execute_many(sql, batch)
+            batch = []
+    if batch:
+        await conn.execute_many(sql, batch)
+
+
+async def timed(label: str, coro_fn, repeat: int = 20):
+    await coro_fn()  # warm up
+    t = time.perf_counter()
+    for _ in range(repeat):
+        await coro_fn()
+    print(f"{label:<48} {(time.perf_counter() - t) / repeat * 1e3:9.3f} ms")
+
+
+async def main(n: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        await Tortoise.init(
+            db_url=f"sqlite://{tmp}/bench.sqlite3",
+            modules={"models": ["brvideo.core.models"]},
+        )
+        await Tortoise.generate_schemas()
+
+        t = time.perf_counter()
+        await populate(n)
+        print(f"populated {n} rows in {time.perf_counter() - t:.1f} s")
+
+        mgr = ApplicationManager()
+        t = time.perf_counter()
+        await mgr.cache.load_initial_data()
+        print(f"warmed pending queue ({len(mgr.cache.pending)} items) in {time.perf_counter() - t:.2f} s")
+
+        pending = await Applications.filter(accepted__isnull=True).order_by("date", "id").values_list("date", "id")
+        for depth in (0, len(pending) // 2, len(pending) - 60):
+            after = pending[depth - 1] if depth else None
+
+            await timed(
+                f"keyset  pending page @ {depth}",
+                lambda: mgr.list_applications(ApplicationStatus.PENDING, after=after),
+            )
+            await timed(
+                f"offset  pending page @ {depth}",
+                lambda: Applications.filter(accepted__isnull=True)
+                .order_by("date", "id").offset(depth).limit(50),
+            )
+
+            async def memory():
+                mgr.list_pending(after=after)
+
+            await timed(f"memory  pending page @ {depth}", memory, repeat=1000)
+
+        await timed(
+            "keyset  pending, server+social filter",
+            lambda: mgr.list_applications(ApplicationStatus.PENDING, server=7, social=Socials.VK),
+        )
+
+        async def memory_filtered():
+            mgr.list_pending(server=7, social=Socials.VK)
+
+        await timed("memory  pending, server+social filter", memory_filtered, repeat=1000)
+        await timed(
+            "keyset  accepted, server filter",
+            lambda: mgr.list_applications(ApplicationStatus.ACCEPTED, server=7),
+        )
+
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
@@ -0,0 +1,63 @@
+"""Pack/unpack cost and size of aiogram's `prefix:a:b` callback data (before)
+and the compact codec (after).
+
+Run from the repository root: ``python benchmarks/bench_callback_codec.py [n]``
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("TOKEN", "fake-token-for-bench")
+os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
+os.environ.setdefault("APPLICATIONS_CHAT_ID", "1")
+os.environ.setdefault("OWNERS", "[]")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from aiogram.filters.callback_data import CallbackData  # noqa: E402
+
+from brvideo.bot.keyboards.codec import CompactCallbackData  # noqa: E402
+
+
+class PlainDecision(CallbackData, prefix="app"):
+    app_id: int
+    reviewer_id: int
+    accepted: bool
+
+
+class CompactDecision(CompactCallbackData, prefix="app"):
+    app_id: int
+    reviewer_id: int
+    accepted: bool
+
+
+def measure(cls, n: int):
+    items = [
+        cls(app_id=100_000 + i, reviewer_id=5_000_000_000 + i, accepted=i % 2 == 0)
+        for i in range(n)
+    ]
+    started = time.perf_counter()
+    packed = [item.pack() for item in items]
+    pack_us = (time.perf_counter() - started) / n * 1e6
+    started = time.perf_counter()
+    for value in packed:
+        cls.unpack(value)
+    unpack_us = (time.perf_counter() - started) / n * 1e6
+    return pack_us, unpack_us, max(len(value) for value in packed)
+
+
+def main(n: int = 20_000, rounds: int = 5):
+    results = {}
+    # interleave the variants and keep the best round of each to dampen noise
+    for _ in range(rounds):
+        for name, cls in (("before", PlainDecision), ("after", CompactDecision)):
+            pack_us, unpack_us, size = measure(cls, n)
+            best = results.get(name, (float("inf"), float("inf"), size))
+            results[name] = (min(best[0], pack_us), min(best[1], unpack_us), size)
+    for name, (pack_us, unpack_us, size) in results.items():
+        print(f"{name:>7}: pack {pack_us:5.2f} us, unpack {unpack_us:5.2f} us, {size} bytes")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
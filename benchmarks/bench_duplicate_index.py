@@ -0,0 +1,59 @@
+"""Insert and lookup cost of the applications duplicate index.
+
+Run from the repository root: ``python benchmarks/bench_duplicate_index.py [n_links]``
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+os.environ.setdefault("TOKEN", "fake-token-for-bench")
+os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
+os.environ.setdefault("APPLICATIONS_CHAT_ID", "1")
+os.environ.setdefault("OWNERS", "[]")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from brvideo.core.managers.applications import DuplicateIndex  # noqa: E402
+
+
+def main(n: int = 1_000_000, lookups: int = 100_000):
+    rows = [
+        (uuid.uuid4(), f"https://youtube.com/@player{i}", f"Player_{i}", i % 100)
+        for i in range(n)
+    ]
+
+    index = DuplicateIndex()
+    started = time.perf_counter()
+    for row in rows:
+        index.add(*row)
+    insert = time.perf_counter() - started
+
+    # tracemalloc slows inserts down a lot, measure memory on a separate build
+    tracemalloc.start()
+    sample = DuplicateIndex()
+    for row in rows[: n // 10]:
+        sample.add(*row)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del sample
+
+    step = max(n // lookups, 1)
+    hits = [(f"www.youtube.com/@player{i}/", f"player_{i}", i % 100) for i in range(0, n, step)]
+    misses = [(f"https://youtube.com/@nobody{i}", f"Nobody_{i}", 0) for i in range(len(hits))]
+
+    for label, probes in (("hit", hits), ("miss", misses)):
+        started = time.perf_counter()
+        found = sum(index.find(*probe) is not None for probe in probes)
+        elapsed = time.perf_counter() - started
+        assert found == (len(probes) if label == "hit" else 0)
+        print(f"lookup {label:>4}: {elapsed / len(probes) * 1e6:8.2f} us ({len(index)} indexed)")
+
+    print(f"insert     : {insert / n * 1e6:8.2f} us")
+    print(f"memory     : {memory / (n // 10):8.0f} bytes/application (uuids shared with the rows)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
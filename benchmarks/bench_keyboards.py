@@ -0,0 +1,69 @@
+"""Render time per keyboard built from scratch on every call (before) and
+rendered from a cached template (after).
+
+Run from the repository root: ``python benchmarks/bench_keyboards.py [n_renders]``
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("TOKEN", "fake-token-for-bench")
+os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
+os.environ.setdefault("APPLICATIONS_CHAT_ID", "1")
+os.environ.setdefault("OWNERS", "[]")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from aiogram.filters.callback_data import CallbackData  # noqa: E402
+
+from brvideo.bot.keyboards.base import MagicKeyboard  # noqa: E402
+
+
+class MenuAction(CallbackData, prefix="menu"):
+    action: str
+    page: int
+    initiator_id: int
+
+
+class MenuKeyboard(MagicKeyboard):
+    """Initiator-bound: every button carries the initiator."""
+
+    def __init__(self, page: int):
+        for action in ("profile", "apply", "status", "help", "settings"):
+            self.row(self.cb(action.title(), MenuAction(action=action, page=page, initiator_id=0)))
+        self.row(self.url("Channel", "https://t.me/example"))
+
+
+class ConfirmKeyboard(MagicKeyboard):
+    """Static: identical for everyone."""
+
+    def __init__(self):
+        self.row(self.cb("Yes", "confirm:yes"), self.cb("No", "confirm:no"))
+
+
+def measure(cls, args, n: int) -> float:
+    started = time.perf_counter()
+    for i in range(n):
+        cls(i, *args)
+    return (time.perf_counter() - started) / n * 1e6
+
+
+def main(n: int = 20_000, rounds: int = 5):
+    cases = [("initiator-bound", MenuKeyboard, (1,)), ("static", ConfirmKeyboard, ())]
+    for name, cls, args in cases:
+        results = {"before": float("inf"), "after": float("inf")}
+        # interleave the variants and keep the best round of each to dampen noise
+        for _ in range(rounds):
+            for variant, cached in (("before", False), ("after", True)):
+                cls.cache_templates = cached
+                results[variant] = min(results[variant], measure(cls, args, n))
+        speedup = results["before"] / results["after"]
+        print(
+            f"{name:>16}: {results['before']:7.2f} -> {results['after']:6.2f} us/keyboard"
+            f" ({speedup:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
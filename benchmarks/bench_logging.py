@@ -0,0 +1,146 @@
+"""Event-loop stalls during a burst of logs, synchronous vs background sinks.
+
+A ticker coroutine wakes every millisecond and records how late it woke
+while other coroutines log a burst through loguru and the stdlib (the
+`InterceptHandler`). Logs go to a file standing in for stdout and to a log
+file rotated every few megabytes, so the burst includes gzip compressions.
+
+Also times single stdlib records through the handler, against the previous
+frame-walking handler, and a stdlib debug call that the level gate drops.
+
+Run from the repository root: ``python benchmarks/bench_logging.py [n_records]``
+"""
+
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("TOKEN", "fake-token-for-bench")
+os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
+os.environ.setdefault("APPLICATIONS_CHAT_ID", "1")
+os.environ.setdefault("OWNERS", "[]")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from loguru import logger  # noqa: E402
+
+from brvideo.core.logging import InterceptHandler  # noqa: E402
+
+ROTATE_BYTES = 2_000_000
+TICK = 0.001
+
+
+class FrameWalkingHandler(logging.Handler):
+    """The handler before this change, for comparison."""
+
+    def emit(self, record):
+        try:
+            level = logger.level(record.levelname).name
+        except ValueError:
+            level = record.levelno
+        logger.opt(depth=6, exception=record.exc_info).log(level, record.getMessage())
+
+
+def _configure(mode: str, workdir: Path):
+    logger.remove()
+    stdout = (workdir / "stdout.log").open("a")
+    logfile = workdir / "bot.log"
+    background = mode == "background"
+    logger.add(stdout, level="INFO", enqueue=background)
+    logger.add(
+        logfile, rotation=ROTATE_BYTES, compression="gz", level="INFO", enqueue=background
+    )
+    logging.basicConfig(handlers=[InterceptHandler(logging.INFO)], level=logging.INFO, force=True)
+
+
+async def _burst(n: int, workers: int = 8):
+    lib = logging.getLogger("aiogram.event")
+
+    async def worker(w: int):
+        for i in range(n // workers):
+            if i % 2:
+                logger.info(f"worker {w} handled update {i} from chat {i * 7}")
+            else:
+                lib.info("Update id=%s is handled. Duration %s ms by bot id=42", i, w)
+            await asyncio.sleep(0)  # one record per update, as handlers log
+
+    await asyncio.gather(*(worker(w) for w in range(workers)))
+
+
+async def _stalls(n: int):
+    lateness = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            expected = time.perf_counter() + TICK
+            await asyncio.sleep(TICK)
+            lateness.append(max(time.perf_counter() - expected, 0))
+
+    tick_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    await _burst(n)
+    burst = time.perf_counter() - started
+    done.set()
+    await tick_task
+    return burst, max(lateness), statistics.quantiles(lateness, n=100)[98]
+
+
+def _per_record(handler: logging.Handler, n: int = 20_000) -> float:
+    lib = logging.getLogger("bench.lib")
+    lib.handlers, lib.propagate = [handler], False
+    started = time.perf_counter()
+    for i in range(n):
+        lib.info("record %s", i)
+    return (time.perf_counter() - started) / n
+
+
+def _gated_debug(level: int, n: int = 200_000) -> float:
+    logging.getLogger().setLevel(level)
+    lib = logging.getLogger("bench.debug")
+    started = time.perf_counter()
+    for i in range(n):
+        lib.debug("query %s", i)
+    return (time.perf_counter() - started) / n
+
+
+def main(n: int, rounds: int = 3):
+    results = {}
+    for _ in range(rounds):
+        for mode in ("sync", "background"):
+            with tempfile.TemporaryDirectory() as tmp:
+                _configure(mode, Path(tmp))
+                burst, worst, p99 = asyncio.run(_stalls(n))
+                logger.remove()  # waits for the queued messages to be written
+            # keep the calmest round of each mode to dampen noise
+            if mode not in results or worst < results[mode][1]:
+                results[mode] = (burst, worst, p99)
+    for mode, (burst, worst, p99) in results.items():
+        print(
+            f"{mode:>10}: {n} records in {burst * 1e3:7.1f} ms,"
+            f" loop stall max {worst * 1e3:6.1f} ms, p99 {p99 * 1e3:5.2f} ms"
+        )
+
+    null = open(os.devnull, "w")
+    logger.remove()
+    logger.add(null, level="INFO")
+    handlers = (FrameWalkingHandler(), InterceptHandler())
+    previous, current = (
+        min(rounds) for rounds in zip(*(map(_per_record, handlers) for _ in range(5)))
+    )
+    logger.remove()
+    null.close()
+    print(f"stdlib record: frame walking {previous * 1e6:.2f} us, patched {current * 1e6:.2f} us")
+    print(
+        f"stdlib debug below the sinks: root at DEBUG {_gated_debug(logging.DEBUG) * 1e6:.3f} us,"
+        f" gated at INFO {_gated_debug(logging.INFO) * 1e6:.3f} us"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 40_000)
@@ -0,0 +1,89 @@
+"""Cost of the metrics hooks: dispatching a message and taking a manager
+lock, with metrics disabled (nothing installed) and enabled.
+
+Run from the repository root: ``python benchmarks/bench_metrics.py [n]``
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("TOKEN", "fake-token-for-bench")
+os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
+os.environ.setdefault("APPLICATIONS_CHAT_ID", "1")
+os.environ.setdefault("OWNERS", "[]")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from aiogram import Bot, Dispatcher, Router  # noqa: E402
+from aiogram.types import Message, Update  # noqa: E402
+
+from brvideo.bot.middlewares.metrics import HandlerMetricsMiddleware  # noqa: E402
+from brvideo.core.metrics import Registry  # noqa: E402
+
+UPDATE = Update.model_validate(
+    {
+        "update_id": 1,
+        "message": {
+            "message_id": 1, "date": 0, "text": "hi",
+            "chat": {"id": 1, "type": "private"},
+            "from": {"id": 1, "is_bot": False, "first_name": "u"},
+        },
+    }
+)
+
+
+def _dispatcher(enabled: bool) -> Dispatcher:
+    router = Router()
+
+    @router.message()
+    async def _noop(message: Message):
+        pass
+
+    dp = Dispatcher()
+    if enabled:
+        dp.message.middleware(HandlerMetricsMiddleware(Registry(enabled=True)))
+    dp.include_router(router)
+    return dp
+
+
+async def _dispatch(dp: Dispatcher, bot: Bot, n: int) -> float:
+    started = time.perf_counter()
+    for _ in range(n):
+        await dp.feed_update(bot, UPDATE)
+    return (time.perf_counter() - started) / n
+
+
+async def _locks(lock: asyncio.Lock, n: int) -> float:
+    started = time.perf_counter()
+    for _ in range(n):
+        async with lock:
+            pass
+    return (time.perf_counter() - started) / n
+
+
+async def main(n: int, rounds: int = 5):
+    bot = Bot("42:TEST")
+    dispatchers = {enabled: _dispatcher(enabled) for enabled in (False, True)}
+    best = {}
+    # interleave the variants and keep the best round of each to dampen noise
+    for _ in range(rounds):
+        for enabled, dp in dispatchers.items():
+            took = await _dispatch(dp, bot, n)
+            best[("dispatch", enabled)] = min(best.get(("dispatch", enabled), took), took)
+            lock = Registry(enabled=enabled).lock("bench")
+            took = await _locks(lock, n * 10)
+            best[("lock", enabled)] = min(best.get(("lock", enabled), took), took)
+    await bot.session.close()
+
+    for what in ("dispatch", "lock"):
+        off, on = best[(what, False)], best[(what, True)]
+        print(
+            f"{what:>8}: disabled {off * 1e6:7.2f} us, enabled {on * 1e6:7.2f} us"
+            f" ({(on - off) * 1e6:+.2f} us)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,89 @@
+"""Reader latency while `AdminCacheManager.sync` and a writer run, locked vs lock-free reads.
+
+The writer holds the manager lock across an await (as a DB-backed write
+does), which is where readers that take the lock start queueing.
+
+Run from the repository root: ``python benchmarks/bench_read_contention.py [n_dirty] [n_readers]``
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("TOKEN", "fake-token-for-bench")
+os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
+os.environ.setdefault("APPLICATIONS_CHAT_ID", "1")
+os.environ.setdefault("OWNERS", "[]")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from brvideo.core.managers.admins import AdminManager, _CachedAdmin  # noqa: E402
+from brvideo.core.managers.base import BaseSyncWriter  # noqa: E402
+
+
+class FakeWriter(BaseSyncWriter):
+    async def write(self, upserts, deletes):
+        await asyncio.sleep(0.001)  # one DB round-trip per batch
+
+
+async def run(locked: bool, n_dirty: int, n_readers: int, reads: int = 200):
+    mgr = AdminManager()
+    mgr.cache.sync_writer = FakeWriter()
+    for i in range(n_dirty):
+        mgr._cache[i] = _CachedAdmin.model_validate(
+            {"id": i, "nickname": f"admin{i}", "tg_id": i}
+        )
+
+    async def read(tg_id: int) -> bool:
+        if locked:
+            async with mgr._lock:
+                return mgr.cache.get_by("tg_id", tg_id) is not None
+        return await mgr.cache.is_admin(tg_id)
+
+    stop = False
+
+    async def syncer():
+        while not stop:
+            mgr.cache._dirty.update(mgr._cache.keys())
+            await mgr.cache.sync()
+
+    async def writer():
+        while not stop:
+            async with mgr._lock:
+                await asyncio.sleep(0.0005)
+            await asyncio.sleep(0.0005)
+
+    latencies: list[float] = []
+
+    async def reader(seed: int):
+        for i in range(reads):
+            t = time.perf_counter()
+            await read((seed * reads + i) % n_dirty)
+            latencies.append(time.perf_counter() - t)
+            await asyncio.sleep(0)
+
+    background = [asyncio.create_task(syncer()), asyncio.create_task(writer())]
+    await asyncio.gather(*(reader(r) for r in range(n_readers)))
+    stop = True
+    await asyncio.gather(*background)
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(
+        f"{'locked' if locked else 'lock-free':>9}: "
+        f"mean {statistics.mean(latencies) * 1e6:9.1f} us, "
+        f"p99 {p99 * 1e6:9.1f} us, max {latencies[-1] * 1e6:9.1f} us "
+        f"({n_readers} readers, {n_dirty} dirty entries)"
+    )
+
+
+def main(n_dirty: int = 10_000, n_readers: int = 100):
+    for locked in (True, False):
+        asyncio.run(run(locked, n_dirty, n_readers))
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,127 @@
+"""Time from process start to the first getUpdates request.
+
+Starts the bot (``app.run()``) in a subprocess against a fake Telegram API
+and an in-memory database, and records when it first polls. Pass another
+checkout's ``src`` directory to compare against it, e.g. a git worktree of
+an older commit.
+
+Run from the repository root: ``python benchmarks/bench_startup.py [rounds] [src ...]``
+"""
+
+import asyncio
+import os
+import signal
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from aiohttp import web
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+CHILD = """
+import time
+started = time.perf_counter()
+import asyncio, sys
+from brvideo import app
+sys.stderr.write(f"IMPORTED {time.perf_counter() - started}\\n")
+from brvideo.core.config import settings
+settings.LOCAL_SESSION_URL = sys.argv[1]
+asyncio.run(app.run())
+"""
+
+
+class FakeTelegram:
+    def __init__(self):
+        self.first_poll = asyncio.Event()
+        self.app = web.Application()
+        self.app.router.add_post("/bot{token}/{method}", self.handle)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"].lower()
+        if method == "getupdates":
+            self.first_poll.set()
+            await asyncio.sleep(1)
+            return web.json_response({"ok": True, "result": []})
+        if method == "getme":
+            user = {"id": 42, "is_bot": True, "first_name": "bench", "username": "bench_bot"}
+            return web.json_response({"ok": True, "result": user})
+        return web.json_response({"ok": True, "result": True})
+
+
+async def start_once(src: Path, url: str, server: FakeTelegram, workdir: Path):
+    server.first_poll.clear()
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(src),
+        "TOKEN": "42:TEST",
+        "DATABASE_URL": "sqlite://:memory:",
+        "APPLICATIONS_CHAT_ID": "1",
+        "OWNERS": "[]",
+    }
+    log = workdir / "bot.out"
+    started = time.perf_counter()
+    # the db config resolves model paths relative to a `src` working directory
+    with log.open("wb") as stdout:
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, "-c", CHILD, url,
+            cwd=workdir, env=env,
+            stdout=stdout, stderr=asyncio.subprocess.PIPE,
+        )
+    imported = float("nan")
+    assert proc.stderr is not None
+    while line := await proc.stderr.readline():
+        if line.startswith(b"IMPORTED "):
+            imported = float(line.split()[1])
+            break
+    await asyncio.wait_for(server.first_poll.wait(), timeout=120)
+    polled = time.perf_counter() - started
+    proc.send_signal(signal.SIGINT)
+    try:
+        await asyncio.wait_for(proc.wait(), timeout=10)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+    # per-phase timings, logged by versions with a startup graph
+    phases = [line for line in log.read_text().splitlines() if "Startup in" in line]
+    return imported, polled, phases[-1].split(" - ", 1)[-1] if phases else ""
+
+
+async def main(rounds: int, sources: list[Path]):
+    server = FakeTelegram()
+    runner = web.AppRunner(server.app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    url = f"http://127.0.0.1:{port}"
+
+    results = {src: (float("inf"), float("inf")) for src in sources}
+    phases = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp) / "src"
+        workdir.mkdir()
+        for src in sources:  # warm the bytecode caches and the router manifest
+            await start_once(src, url, server, workdir)
+        # interleave the variants and keep the best round of each to dampen noise
+        for _ in range(rounds):
+            for src in sources:
+                imported, polled, phases[src] = await start_once(src, url, server, workdir)
+                best = results[src]
+                results[src] = (min(best[0], imported), min(best[1], polled))
+    await runner.cleanup()
+
+    for src, (imported, polled) in results.items():
+        print(
+            f"{str(src):>40}: import brvideo.app {imported * 1e3:7.1f} ms,"
+            f" first poll {polled * 1e3:7.1f} ms"
+        )
+        if phases[src]:
+            print(f"{'':>42}{phases[src]}")
+
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    sources = [Path(path).resolve() for path in sys.argv[2:]] or [SRC]
+    asyncio.run(main(rounds, sources))
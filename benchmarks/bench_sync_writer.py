@@ -0,0 +1,92 @@
+"""Sync throughput of the upsert writer vs the old select + bulk_update/bulk_create path.
+
+Runs against in-memory SQLite. Run from the repository root:
+``python benchmarks/bench_sync_writer.py [rows ...]`` (default 1000 10000 100000)
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("TOKEN", "fake-token-for-bench")
+os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
+os.environ.setdefault("APPLICATIONS_CHAT_ID", "1")
+os.environ.setdefault("OWNERS", "[]")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from tortoise import Tortoise  # noqa: E402
+
+from brvideo.core.managers.admins import AdminManager, _CachedAdmin  # noqa: E402
+from brvideo.core.managers.base import BaseSyncWriter  # noqa: E402
+from brvideo.core.models import Admins  # noqa: E402
+
+FIELDS = list(_CachedAdmin.model_fields)
+
+
+class LegacySyncWriter(BaseSyncWriter):
+    """The pre-upsert strategy: select existing rows, diff, bulk_update + bulk_create."""
+
+    async def write(self, upserts, deletes):
+        existing = {
+            row.id: row for row in await Admins.filter(id__in=[u.id for u in upserts])
+        }
+        to_update, to_create = [], []
+        for cached in upserts:
+            row = existing.get(cached.id)
+            if row is None:
+                to_create.append(Admins(**cached.model_dump()))
+                continue
+            changed = False
+            for field in FIELDS:
+                if getattr(row, field) != getattr(cached, field):
+                    setattr(row, field, getattr(cached, field))
+                    changed = True
+            if changed:
+                to_update.append(row)
+        if to_update:
+            await Admins.bulk_update(to_update, fields=FIELDS, batch_size=len(to_update))
+        if to_create:
+            await Admins.bulk_create(to_create, batch_size=len(to_create))
+
+
+async def run(n: int, legacy: bool) -> float:
+    await Tortoise.init(db_url="sqlite://:memory:", modules={"models": ["brvideo.core.models"]})
+    await Tortoise.generate_schemas()
+
+    # half of the dirty rows already exist in the db, half are new
+    await Admins.bulk_create(
+        [Admins(id=i, nickname=f"old{i}", tg_id=i) for i in range(1, n // 2 + 1)],
+        batch_size=1000,
+    )
+
+    mgr = AdminManager()
+    if legacy:
+        mgr.cache.sync_writer = LegacySyncWriter()
+    for i in range(1, n + 1):
+        mgr._cache[i] = _CachedAdmin.model_validate({"id": i, "nickname": f"new{i}", "tg_id": i})
+        mgr.cache._mark_dirty(i)
+
+    t = time.perf_counter()
+    await mgr.cache.sync()
+    elapsed = time.perf_counter() - t
+
+    assert not mgr.cache._dirty
+    assert await Admins.all().count() == n
+    await Tortoise.close_connections()
+    return elapsed
+
+
+def main(sizes):
+    for n in sizes:
+        for legacy in (True, False):
+            elapsed = asyncio.run(run(n, legacy))
+            print(
+                f"{'legacy' if legacy else 'upsert':>6} {n:>7} rows: "
+                f"{elapsed:8.3f} s, {n / elapsed:10.0f} rows/s"
+            )
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000])
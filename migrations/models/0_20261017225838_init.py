@@ -0,0 +1,56 @@
+from tortoise import BaseDBAsyncClient
+
+RUN_IN_TRANSACTION = True
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "admins" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "nickname" VARCHAR(50) NOT NULL,
+    "tg_id" BIGINT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS "applications" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "nickname" VARCHAR(50) NOT NULL,
+    "server" INT NOT NULL,
+    "social" VARCHAR(255) NOT NULL,
+    "date" TIMESTAMPTZ NOT NULL,
+    "link_acc" TEXT NOT NULL,
+    "accepted" BOOL NOT NULL,
+    "reason" TEXT
+);
+COMMENT ON COLUMN "applications"."social" IS 'YOUTUBE: youtube\nTIKTOK: tiktok\nVK: vk\nTWITCH: twitch';
+CREATE TABLE IF NOT EXISTS "aerich" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "version" VARCHAR(255) NOT NULL,
+    "app" VARCHAR(100) NOT NULL,
+    "content" JSONB NOT NULL
+);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        """
+
+
+MODELS_STATE = (
+    "eJztl+1T2jAYwP+VXj/hnfOwgDC/AeuUqXSn1TnnrhfaUHK0SW1TlXP+70tSSl8oHbidA4"
+    "5PlOelefp7XpK8yC6xoBMctC0X4UA+ll5kDFzIHnKafUkGnpfIuYCCgSNMQWIzCKgPTMqk"
+    "Q+AEkIksGJg+8igimElx6DhcSExmiLCdiEKMHkJoUGJDOoI+U/z4ycQIW/AZBvFfb2wMEX"
+    "SsTKjI4msLuUEnnpD1MP0sDPlqA8MkTujixNib0BHBM2uEKZfaEEMfUMhfT/2Qh8+jm35n"
+    "/EVRpIlJFGLKx4JDEDo09bkDI5HJhtHXdONK1Q1DXgGQSTCHy0KNEmXzED4oh/VmvVU7qr"
+    "eYiQhzJmm+RksnYCJHgaevy69CDyiILATjBCpG5lg8z6HtjoBfzDbtkyPMQs8TjnmWIY4F"
+    "CeOkrt4DsgueDQdim47Y30a1hOhN+7J72r6sNKp7fEHC2iDqjv5UowgVh55AprZRVLwdZC"
+    "+s35nLn0t4EwBHVfxRUWq1plKtHbUa9Waz0arOynleVVbXnd4JL+1MAqJa59NjOE6VOhcM"
+    "gDl+Ar5lzGmIQhbZzqtcxc1LAAa2wMm/mwccz1PPc5AJOKfieZvWl0/dvOVu9u5m7272Lj"
+    "17A+g/Qn+F6k0ctmn0/mURp3gSEwGnuGRVHLoCao+FALAJ5+HOvNe5eOXv2rV+3VGPpQkJ"
+    "aTiA91jvnenaGZs/aEzJ+B7fsOdH9qt/6+ndUyZ/QtQcyW8oeaXRWKLmmdXCohe6bJbYzC"
+    "kYK5+YlCIXFhd+7JPLjDV1Oogf1idPyzeBD4GlYWcy3UFKgOu9C/VKb1985cu5QfDgCHJt"
+    "XeUaRUgnOWnlKJeb2UskVh6nEv8r3Wl9VeAlAbV9sWJip9/JPCYQUmJg8mQAK7XZxdKYWi"
+    "bTDsJjA5jmfLZ1+LxgxKV91rkPl85vWT7VWz2TyrhvKhft271MOs+1/klsnuqz7rnWybUX"
+    "Ywc9Tmf+TE+IAwEu5p52y3EfML/tAt/RtPMM+E4vT/b6oqNeVg5FFpgRoqmDfBo3696Axb"
+    "VChSceb6rvaeNtAOV/Vt7rcnGCPjJHctGVKdLsl16WEpvdNWmzTpiLr0nsNB6govZffEtK"
+    "uWzF/vYOJ0beVCsQnppvId3D6jJ3UGa1kK7QZemyFSmMWjtL+MuV1i8mnHLJn8iRSaVfko"
+    "OCTbyQlsDlMMo3s/y+lTtP8xf8983s9TcE7BD2"
+)
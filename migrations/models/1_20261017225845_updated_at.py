@@ -0,0 +1,44 @@
+from tortoise import BaseDBAsyncClient
+
+RUN_IN_TRANSACTION = True
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "admins" ADD "updated_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP;
+        ALTER TABLE "admins" ALTER COLUMN "updated_at" DROP DEFAULT;
+        ALTER TABLE "applications" ADD "updated_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP;
+        ALTER TABLE "applications" ALTER COLUMN "updated_at" DROP DEFAULT;
+        CREATE INDEX IF NOT EXISTS "idx_admins_updated_7ec2b5" ON "admins" ("updated_at");
+        CREATE INDEX IF NOT EXISTS "idx_application_updated_6a83c9" ON "applications" ("updated_at");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_application_updated_6a83c9";
+        DROP INDEX IF EXISTS "idx_admins_updated_7ec2b5";
+        ALTER TABLE "admins" DROP COLUMN "updated_at";
+        ALTER TABLE "applications" DROP COLUMN "updated_at";"""
+
+
+MODELS_STATE = (
+    "eJztmG1T2kAQgP8Kk084Yx0MItRvxFKlCulotNbauTmSM9yQ3MXkojLW/967CyEvhBRspc"
+    "rwiWRfcptnd7N3PCkutZAT7LQtF5NAOag8KQS6iF/kNNsVBXpeIhcCBgeONIWJzSBgPjQZ"
+    "l95CJ0BcZKHA9LHHMCVcSkLHEUJqckNM7EQUEnwXIsCojdgQ+Vzx4ycXY2KhRxTEt94I3G"
+    "LkWJlQsSXWlnLAxp6UdQn7LA3FagNgUid0SWLsjdmQkqk1JkxIbUSQDxkSj2d+KMIX0U3e"
+    "M36jKNLEJAox5WOhWxg6LPW6A5DIFAD6ugHOOwYAyhKATEoEXB5qlChbhPBB3d1r7rXq+3"
+    "stbiLDnEqaz9HSCZjIUeLpG8qz1EMGIwvJOIFKsDmS1zNoD4fQL2ab9skR5qHnCcc8yxDH"
+    "goRxUlergOzCR+AgYrMhv23USohets8Oj9tn1UZtSyxIeRtE3dGfaFSpEtATyMwGRcWrYX"
+    "tu/U5d/lzC7wFwVMUfVbVeb6q1+n6rsddsNlq1aTnPqsrqWuseidLOJCCu9QR76FkCEYBs"
+    "lv0nrmHYRcX0s565FFgT15344t8kZKVfFR9BSyfOeLJuCWqj2+ucG+3eV7GcGwR3jsTXNj"
+    "pCo0rpOCet7ueaY/qQyreucVwRt5Vrvd+RdGnAbF+umNgZ14qICYaMAkIfALTSYGNxHL0Y"
+    "Gbej1PdNCAbQHD1A3wIzGqrSebazKld18xJIoC1TJuCKMOMh6nkONqFIRvGQTevLR23ecj"
+    "NwNwN3M3AXHrgB8u+Rv0T1Jg7rNG//sohTPKmJoVNcsh0SuhJql4cAiYlm4U6933LxKt/1"
+    "C+NC6xxUxjRk4QDdEKN7Yugn/PuDR4yObsglv77nvwafYofHXP6AmTlUXlDyaqOxQM1zq7"
+    "lFL3XZLIn9yLI7ndhnNXuc1TbB+9zkTIZdao8jqWUy7WAyAtA0Z7NtoMc5n7i0z1vuw4Xz"
+    "W5bPzpWRSWXcN9Ve+2ork85TvX8Um6f67PBU13LtxdkhT9CZga5R6iBIirmn3XLcB9xvvc"
+    "Brun6aAa9182QvelrnrLors8CNMJtzeuPdG/C4lqjwxONF9T1pvHdA+VXKe3NaXrNB8tZP"
+    "y8jH5lApOidHmu3SE3Jiszkbr6wRXvlszI9gAS765s8/Gqdc1mJTs4JjgmiqJQhPzNeQ7m"
+    "5tkT8euNVculKXpctXZIgUzNAv53q/mHDKJT88sckqvyoODt7jvxAlcAWM8h1MfrOSm33i"
+    "AWIH81+H2fNvcA5RLQ=="
+)
@@ -0,0 +1,63 @@
+from tortoise import BaseDBAsyncClient
+
+RUN_IN_TRANSACTION = True
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "fsm_states" (
+    "id" VARCHAR(255) NOT NULL PRIMARY KEY,
+    "state" VARCHAR(255),
+    "data" JSONB NOT NULL,
+    "updated_at" TIMESTAMPTZ NOT NULL
+);
+CREATE INDEX IF NOT EXISTS "idx_fsm_states_updated_12b2d7" ON "fsm_states" ("updated_at");
+        ALTER TABLE "applications" ADD "uid" UUID NOT NULL DEFAULT gen_random_uuid();
+        ALTER TABLE "applications" ALTER COLUMN "uid" DROP DEFAULT;
+        CREATE UNIQUE INDEX IF NOT EXISTS "uid_application_uid_a3101f" ON "applications" ("uid");
+        ALTER TABLE "applications" ADD "tg_id" BIGINT;
+        ALTER TABLE "applications" ADD "link_video" TEXT;
+        ALTER TABLE "applications" ALTER COLUMN "accepted" DROP NOT NULL;
+        CREATE INDEX IF NOT EXISTS "idx_application_accepte_ddab17" ON "applications" ("accepted", "date", "id");
+        CREATE INDEX IF NOT EXISTS "idx_application_accepte_7317c8" ON "applications" ("accepted", "social", "date", "id");
+        CREATE INDEX IF NOT EXISTS "idx_application_accepte_1f2e94" ON "applications" ("accepted", "server", "date", "id");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "uid_application_uid_a3101f";
+        DROP INDEX IF EXISTS "idx_application_accepte_1f2e94";
+        DROP INDEX IF EXISTS "idx_application_accepte_7317c8";
+        DROP INDEX IF EXISTS "idx_application_accepte_ddab17";
+        ALTER TABLE "applications" DROP COLUMN "uid";
+        ALTER TABLE "applications" DROP COLUMN "tg_id";
+        ALTER TABLE "applications" DROP COLUMN "link_video";
+        ALTER TABLE "applications" ALTER COLUMN "accepted" SET NOT NULL;
+        DROP TABLE IF EXISTS "fsm_states";"""
+
+
+MODELS_STATE = (
+    "eJztmf9v2jgUwP8VlJ86aatogNJNp5OgYytbIVMJu922U2QSAxaJnSVOW7Tr/362Q+J8pa"
+    "VrA+P4pYX3BTsfP7/37PxUHGJB2z/uWA7CvvKm9lPBwIHsQ0bzsqYA15VyLqBgYgtTIG0m"
+    "PvWASZl0CmwfMpEFfdNDLkUEMykObJsLickMEZ5JUYDRjwAalMwgnUOPKb79w8QIW/AW+t"
+    "FXd2FMEbSt1FSRxccWcoMuXSHrY/pOGPLRJoZJ7MDB0thd0jnBsTXClEtnEEMPUMh/nnoB"
+    "nz6f3eo5oycKZypNwikmfCw4BYFNE487MaRMMYyhphujnm4YygaATII5XDbVcKFmfAqv1J"
+    "Nmu3nWOG2eMRMxzVjSvguHlmBCR4FnqCt3Qg8oCC0EYwkVI3MhPufQns+BV8w26ZMhzKae"
+    "JRzxXIc4EkjGMq6qgOyAW8OGeEbn7Gurvobo587V+UXn6qhVf8EHJGwbhLtjuNKoQsWhS8"
+    "h0ZhQFbxfNSuM3drk/hH8HwGEUv1bVRqOt1hunZ61mu906q8fhnFeti+tu/z0P7dQCRLEu"
+    "sQeuxREZgObZv2UaihxYTD/tmVkCa+V6HH14mgWpNKt4EFgatpercdeg1vuD3kjvDD7x4R"
+    "zf/2ELfB29xzWqkC4z0qPTzOaIf6T2V1+/qPGvta/asCfoEp/OPDGitNO/KnxOIKDEwOTG"
+    "AFYSbCSOZs9LxnSRyG9cMAHm4gZ4lpHTEJWU2eZVjupkJQCDmVgyDpdPMyqirmsjE/DFKC"
+    "6ySf36Upu1fM6C+00BpgldHrthpRABzbIPs0vrfOhdQ+9eK2IiYGetDmW9yrIeFFEdj/tv"
+    "S/JdIdeAiY+502MS3P14lT+mATY5uZoYif9p/qk8E/E1OEVBb4Q5K5mNxKNvuZKvqP2/C/"
+    "mhSa2gSZXJ/YG5WDrsU4/6iyk5wTMug/mQ7eHAEVD7bAoAmzAPN/be5eBV/tbG+rjbe1Nb"
+    "koAGE/gd6/2PuvaRJS60oGTxHX9mn6/Zf511fucXTH6DqDlXHhHyaqv1gJhnVqVBL3TpVY"
+    "palE1OB5FPNeeCajfB73kwWFXJxLlAUEuttI3wwmB9an61dXhbkuKSPru8D5+iC9J7X/TU"
+    "Ukb75mjQ+fIitZyX2vB9ZJ7YZ+eXWjezvQTAa2RBsjH22OtR4Hesb6qae/I8lmlVCbEhwM"
+    "Xgk24Z7BPmt1fcu5p2meLe7WfBjgfd3tXRiVgEZoRoSX/KkqbP5rVBhEuPQ3RvHt2Hi709"
+    "q987frH3bjQYURYDhbd6Uvly3ZXe1HcMX9rtzBu08hN04a3FI9ue7V62Pdcxovz+Taz0Jr"
+    "Bjh32oB9Wc20Ce74eRNiw9s4GilI9MWvu3ZiP/2a4sEteckwDZFGH/mA+7jZtOzmd9Nc4W"
+    "3kwe5z9wqMaHarzV12zQQ+a8qBSvNGvrMJA2O1ODD6+7fvF11zX0fFR0AisvuAmXvbjZqa"
+    "Dm8k21AeGV+R7SPak/5O0LsyqlK3RpumxECnFBDS1vahIu1fc127lPeLIOZqvF7O4/hIIu"
+    "4w=="
+)
@@ -1,25 +1,69 @@
+import asyncio
+import importlib
+
 from loguru import logger
 
-from brvideo.core.config import settings
-from brvideo.core import logging
 
-logging.setup_logger(level="INFO")
+async def run() -> None:
+    # importing this module stays cheap: config, logging and aiogram are only
+    # loaded once the bot is actually started
+    from brvideo.core import logging
+    from brvideo.core.config import settings
 
+    logging.setup_logger(level="INFO", background=settings.LOG_BACKGROUND)
 
-async def run() -> None:
     from brvideo.core import managers, models
+    from brvideo.core.lifecycle import StepGraph
+    from brvideo.core.managers.base import PostgresInvalidationBus
+
+    bus = (
+        PostgresInvalidationBus(settings.DATABASE_URL)
+        if settings.CACHE_INVALIDATION_BUS
+        else None
+    )
+    managers.configure()
+    service = {}
+
+    async def import_bot():
+        # importing aiogram takes seconds of CPU; on a thread it overlaps with
+        # connecting to the db and warming the caches
+        await asyncio.to_thread(importlib.import_module, "brvideo.bot.services.bot")
+
+    async def init_bot():
+        from brvideo.bot.services.bot import BotService, BotServiceConfig
 
-    await models.init()
-    await managers.initialize()
+        service["bot"] = BotService(service_config=BotServiceConfig(token=settings.TOKEN))
+        await service["bot"].initialize()
 
-    from brvideo.bot.services.bot import BotService, BotServiceConfig
+    startup = StepGraph("Startup")
+    startup.add("db", models.init)
+    startup.add("import", import_bot)
+    for manager in managers.to_init:
+        startup.add(
+            f"cache:{type(manager).__name__}",
+            lambda manager=manager: managers.initialize_manager(manager, bus),
+            after=["db"],
+        )
+    startup.add("bot", init_bot, after=["import"])
+    await startup.run()
 
-    botservice = BotService(service_config=BotServiceConfig(token=settings.TOKEN))
+    botservice = service["bot"]
+    managers.applications.on_created(botservice.digest.add)
 
     await botservice.run()
 
-    await models.close()
-    await botservice.bot.session.close()
-    await managers.close()
+    shutdown = StepGraph("Shutdown", keep_going=True)
+    for manager in managers.to_init:
+        shutdown.add(
+            f"cache:{type(manager).__name__}",
+            lambda manager=manager: managers.close_manager(manager),
+        )
+    flushed = [f"cache:{type(manager).__name__}" for manager in managers.to_init]
+    # managers flush buffered applications, which still feed the digest
+    shutdown.add("bot", botservice.close, after=flushed)
+    if bus is not None:
+        shutdown.add("bus", bus.close, after=flushed)
+    shutdown.add("db", models.close, after=flushed)
+    await shutdown.run()
 
     logger.warning("Bot stopped")
@@ -1,31 +1,93 @@
-import importlib.util
+import functools
+import importlib
+import json
 import os
 from pathlib import Path
+from typing import Dict, List, Optional
 
 from aiogram import Router
+from loguru import logger
 
-from brvideo.bot.handlers import primary
+HANDLERS_DIR = Path(__file__).parent
+# rebuilt whenever a handler file or directory changes; lives next to the
+# bytecode so read-only installs just rebuild it in memory on every start
+MANIFEST_PATH = HANDLERS_DIR / "__pycache__" / "routers.json"
+PRIMARY = "primary"  # primary handlers are called first when an event occurs
 
 
-def find_routers(folder_path):
-    routers = [primary.router]  # primary handlers are called first when an event occurs
-    for root, _, files in os.walk(folder_path):
-        for file in files:
-            if file.endswith(".py") and file not in ("__init__.py", "primary.py"):
-                module_path = os.path.join(root, file)
-                module_name = os.path.splitext(file)[0]
+def _snapshot(folder: Path) -> Dict[str, int]:
+    """mtime of every handler file and directory, relative to `folder`.
 
-                spec = importlib.util.spec_from_file_location(module_name, module_path)
-                assert spec is not None and spec.loader is not None
+    Directory mtimes change when files are added, removed or renamed."""
+    mtimes = {".": folder.stat().st_mtime_ns}
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = [d for d in dirs if d != "__pycache__"]
+        for name in (*dirs, *(f for f in files if f.endswith(".py"))):
+            path = os.path.join(root, name)
+            mtimes[os.path.relpath(path, folder)] = os.stat(path).st_mtime_ns
+    return mtimes
 
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
 
-                if hasattr(module, "router"):
-                    routers.append(getattr(module, "router"))
-    return routers
+def _is_current(mtimes: Dict[str, int], folder: Path) -> bool:
+    try:
+        return all(
+            os.stat(folder / path).st_mtime_ns == mtime for path, mtime in mtimes.items()
+        )
+    except OSError:
+        return False
 
 
-found_routers = find_routers(Path(__file__).parent)
-root_router = Router()
-root_router.include_routers(*found_routers)
+def _module_names(mtimes: Dict[str, int]) -> List[str]:
+    names = []
+    for path in sorted(mtimes):
+        if path.endswith(".py") and os.path.basename(path) != "__init__.py":
+            names.append(path[: -len(".py")].replace(os.sep, "."))
+    return names
+
+
+def _import(name: str):
+    return importlib.import_module(f"{__name__}.{name}")
+
+
+def build_manifest(folder: Path = HANDLERS_DIR) -> dict:
+    """Import every handler module and record the ones exposing a `router`."""
+    names = _module_names(_snapshot(folder))
+    modules = [name for name in names if hasattr(_import(name), "router")]
+    if PRIMARY in modules:
+        modules.remove(PRIMARY)
+        modules.insert(0, PRIMARY)
+    # after importing: writing bytecode may have touched the directories
+    return {"mtimes": _snapshot(folder), "modules": modules}
+
+
+def load_manifest(path: Optional[Path] = None, folder: Path = HANDLERS_DIR) -> dict:
+    path = path or MANIFEST_PATH
+    try:
+        manifest = json.loads(path.read_text())
+        if _is_current(manifest["mtimes"], folder):
+            return manifest
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    try:
+        path.parent.mkdir(exist_ok=True)
+    except OSError:
+        pass
+    manifest = build_manifest(folder)
+    try:
+        path.write_text(json.dumps(manifest))
+    except OSError as e:
+        logger.debug(f"Router manifest not saved: {e}")
+    return manifest
+
+
+def find_routers() -> List[Router]:
+    return [_import(name).router for name in load_manifest()["modules"]]
+
+
+@functools.cache
+def get_root_router() -> Router:
+    """All handler routers under one router; a router can only be attached to
+    one dispatcher, so this is built once per process."""
+    root_router = Router()
+    root_router.include_routers(*find_routers())
+    return root_router
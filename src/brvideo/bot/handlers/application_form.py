@@ -0,0 +1,71 @@
+from aiogram import F, Router
+from aiogram.enums import ChatType
+from aiogram.filters import Command
+from aiogram.fsm.context import FSMContext
+
+from brvideo.bot.states import ApplicationForm
+from brvideo.bot.types import Message
+from brvideo.core import managers
+from brvideo.core.enums import Socials
+from brvideo.core.links import detect_social, normalize_link
+
+router = Router()
+router.message.filter(F.chat.type == ChatType.PRIVATE)
+
+
+@router.message(Command("apply"))
+async def apply(message: Message, state: FSMContext):
+    await state.set_state(ApplicationForm.nickname)
+    return await message.answer(text="Your in-game nickname:")
+
+
+@router.message(Command("cancel"), ApplicationForm())
+async def cancel(message: Message, state: FSMContext):
+    await state.clear()
+    return await message.answer(text="Application cancelled.")
+
+
+@router.message(ApplicationForm.nickname, F.text)
+async def nickname(message: Message, state: FSMContext):
+    await state.update_data(nickname=message.text.strip()[:50])
+    await state.set_state(ApplicationForm.server)
+    return await message.answer(text="Server number:")
+
+
+@router.message(ApplicationForm.server, F.text)
+async def server(message: Message, state: FSMContext):
+    if not message.text.strip().isdigit():
+        return await message.answer(text="Send the server number, e.g. 12.")
+    await state.update_data(server=int(message.text))
+    await state.set_state(ApplicationForm.link_acc)
+    return await message.answer(text="Link to your channel or account:")
+
+
+@router.message(ApplicationForm.link_acc, F.text)
+async def link_acc(message: Message, state: FSMContext):
+    social = detect_social(normalize_link(message.text))
+    if social is None:
+        return await message.answer(
+            text="Only YouTube, TikTok, VK and Twitch links are accepted."
+        )
+    await state.update_data(link_acc=message.text.strip(), social=social.value)
+    await state.set_state(ApplicationForm.link_video)
+    return await message.answer(text="Link to the video:")
+
+
+@router.message(ApplicationForm.link_video, F.text)
+async def link_video(message: Message, state: FSMContext):
+    form = await state.get_data()
+    _, created = await managers.applications.submit(
+        tg_id=message.from_user.id,
+        nickname=form["nickname"],
+        server=form["server"],
+        social=Socials(form["social"]),  # stored as its value, data must be json
+        link_acc=form["link_acc"],
+        link_video=message.text.strip(),
+    )
+    # only now: if submitting fails the user can send the video link again
+    await state.clear()
+    if not created:
+        return await message.answer(text="This application was already submitted.")
+    return await message.answer(text="Application sent for review.")
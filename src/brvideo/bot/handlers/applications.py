@@ -0,0 +1,33 @@
+from aiogram import Router
+
+from brvideo.bot.keyboards.callbackdata import ApplicationDecision
+from brvideo.bot.types import CallbackQuery
+from brvideo.core import managers
+from brvideo.core.config import settings
+
+router = Router()
+
+
+@router.callback_query(ApplicationDecision.filter())
+async def decide_application(query: CallbackQuery, callback_data: ApplicationDecision):
+    tg_id = query.from_user.id
+    if tg_id not in settings.OWNERS and not await managers.admins.is_admin(tg_id):
+        return await query.answer("Only admins can review applications", show_alert=True)
+
+    # callbacks from the review chat are handled one at a time, in order
+    application = await managers.applications.get(callback_data.app_id)
+    if application is None:
+        return await query.answer("Application not found", show_alert=True)
+    if application.accepted is not None:
+        verdict = "accepted" if application.accepted else "rejected"
+        return await query.answer(
+            f"Application #{application.id} is already {verdict}", show_alert=True
+        )
+
+    application = await managers.applications.decide(
+        callback_data.app_id, callback_data.accepted
+    )
+    if application is None:
+        return await query.answer("Application not found", show_alert=True)
+    verdict = "accepted" if callback_data.accepted else "rejected"
+    return await query.answer(f"Application #{application.id} {verdict}")
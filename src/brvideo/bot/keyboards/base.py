@@ -1,20 +1,138 @@
-from typing import Self, Sequence, Union, overload
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Callable, ClassVar, List, Optional, Self, Sequence, Tuple, Union, overload
 
-from aiogram.filters.callback_data import CallbackData
+from aiogram.filters.callback_data import MAX_CALLBACK_LENGTH, CallbackData
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from brvideo.bot.keyboards.codec import CompactCallbackData
+
+# callback_data of template buttons waiting for an initiator: prefix + slot number
+_SLOT = "\x00"
+_PLAIN = (int, str, float, bool, bytes, Enum, type(None))
+
+# packs a template button's callback data for one initiator
+_Slot = Callable[[int], str]
+
+
+def _plain(value: Any) -> bool:
+    """Immutable values a keyboard layout can safely be cached by."""
+    if isinstance(value, (tuple, frozenset)):
+        return all(_plain(item) for item in value)
+    return isinstance(value, _PLAIN)
+
+
+def _typed(value: Any) -> Any:
+    """`value` with the type of every item next to it: 1, True and 1.0 are
+    equal and hash alike, but may lay a keyboard out differently."""
+    if isinstance(value, tuple):
+        return tuple, tuple(_typed(item) for item in value)
+    if isinstance(value, frozenset):
+        return frozenset, frozenset(_typed(item) for item in value)
+    return type(value), value
+
+
+def _template_key(cls: type, args: Tuple[Any, ...], kwargs: dict) -> Any:
+    """Template cache key of a keyboard built with plain arguments."""
+    return cls, _typed(args), tuple(sorted((name, _typed(v)) for name, v in kwargs.items()))
+
+
+def _join_slot(parts: List[str], index: int, separator: str) -> _Slot:
+    def pack(initiator_id: int) -> str:
+        filled = parts.copy()
+        filled[index] = str(initiator_id)
+        data = separator.join(filled)
+        if len(data.encode()) > MAX_CALLBACK_LENGTH:
+            raise ValueError(f"Callback data is too long: {data!r}")
+        return data
+
+    return pack
+
+
+class _Template:
+    """A built layout; only callback data carrying `initiator_id` (or kept in
+    the payload store, whose entries expire) is packed per render."""
+
+    __slots__ = ("rows", "slots", "markup")
+
+    def __init__(
+        self,
+        rows: List[List[InlineKeyboardButton]],
+        slots: List[_Slot],
+    ):
+        self.rows = rows
+        self.slots = slots
+        # no initiator-dependent buttons: one markup serves every render
+        self.markup = None if slots else InlineKeyboardMarkup(inline_keyboard=rows)
+
+    def render(self, initiator_id: int) -> InlineKeyboardMarkup:
+        if self.markup is not None:
+            return self.markup
+        rows = []
+        for row in self.rows:
+            rendered = []
+            for button in row:
+                data = button.callback_data
+                if data is not None and data.startswith(_SLOT):
+                    data = self.slots[int(data[1:])](initiator_id)
+                    button = button.model_copy(update={"callback_data": data})
+                rendered.append(button)
+            rows.append(rendered)
+        return InlineKeyboardMarkup(inline_keyboard=rows)
+
 
 class MagicKeyboard:
+    """Instantiating a subclass returns the built `InlineKeyboardMarkup`.
+
+    Layouts are cached per (class, arguments) when every argument is a plain
+    immutable value; set `cache_templates = False` on keyboards whose layout
+    depends on anything else. Cached markups are shared and must not be
+    mutated.
+    """
+
+    cache_templates: ClassVar[bool] = True
+    template_cache_size: ClassVar[int] = 1024
+    _templates: ClassVar["OrderedDict[Any, _Template]"] = OrderedDict()
+
     _kb: InlineKeyboardBuilder
     _initiator_id: int
+    _slots: Optional[List[_Slot]]
 
     def __new__(cls, initiator_id: int, *args, **kwargs):
+        cacheable = all(_plain(arg) for arg in args) and all(
+            _plain(value) for value in kwargs.values()
+        )
+        if not cls.cache_templates or not cacheable:
+            return cls._build(initiator_id, None, args, kwargs).as_markup()
+
+        key = _template_key(cls, args, kwargs)
+        templates = MagicKeyboard._templates
+        template = templates.get(key)
+        if template is None:
+            slots: List[_Slot] = []
+            builder = cls._build(0, slots, args, kwargs)
+            template = templates[key] = _Template(builder.export(), slots)
+            if len(templates) > cls.template_cache_size:
+                templates.popitem(last=False)
+        else:
+            templates.move_to_end(key)
+        return template.render(initiator_id)
+
+    @classmethod
+    def _build(
+        cls,
+        initiator_id: int,
+        slots: Optional[List[_Slot]],
+        args: Tuple[Any, ...],
+        kwargs: dict,
+    ) -> InlineKeyboardBuilder:
         self = super().__new__(cls)
         self._kb = InlineKeyboardBuilder()
         self._initiator_id = initiator_id
+        self._slots = slots
         cls.__init__(self, *args, **kwargs)
-        return self._kb.as_markup()
+        return self._kb
 
     def add(self, *buttons: InlineKeyboardButton):
         self._kb.add(*buttons)
@@ -47,10 +165,31 @@ class MagicKeyboard:
         return self
 
     def cb(self, text: str, data: CallbackData | str):
-        if isinstance(data, CallbackData) and hasattr(data, "initiator_id"):
-            data.initiator_id = self._initiator_id  # type: ignore
-        callback_data = data.pack() if isinstance(data, CallbackData) else data
-        return InlineKeyboardButton(text=text, callback_data=callback_data)
+        if isinstance(data, CallbackData):
+            bound = hasattr(data, "initiator_id")
+            if bound:
+                data.initiator_id = self._initiator_id  # type: ignore
+            slot = self._slot(data, bound) if self._slots is not None else None
+            if slot is not None:
+                self._slots.append(slot)  # type: ignore[union-attr]
+                slot_id = len(self._slots) - 1  # type: ignore[arg-type]
+                return InlineKeyboardButton(text=text, callback_data=f"{_SLOT}{slot_id}")
+            data = data.pack()
+        return InlineKeyboardButton(text=text, callback_data=data)
+
+    @staticmethod
+    def _slot(data: CallbackData, bound: bool) -> Optional[_Slot]:
+        if isinstance(data, CompactCallbackData):
+            if bound:
+                return data.packer("initiator_id")
+            return data.packer() if data.stored else None
+        if not bound:
+            return None
+        # values never contain the separator, so the packed string splits
+        # back into prefix + one part per field
+        parts = data.pack().split(data.__separator__)
+        index = 1 + list(type(data).model_fields).index("initiator_id")
+        return _join_slot(parts, index, data.__separator__)
 
     def url(self, text: str, url: str):
         return InlineKeyboardButton(text=text, url=url)
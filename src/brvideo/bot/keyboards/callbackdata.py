@@ -0,0 +1,6 @@
+from brvideo.bot.keyboards.codec import CompactCallbackData
+
+
+class ApplicationDecision(CompactCallbackData, prefix="app"):
+    app_id: int
+    accepted: bool
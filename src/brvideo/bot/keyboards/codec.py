@@ -0,0 +1,284 @@
+import binascii
+import hashlib
+import time
+import typing
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from enum import Enum
+from types import UnionType
+from typing import Any, Callable, ClassVar, List, Optional, Self, Tuple
+from uuid import UUID
+
+from aiogram.filters.callback_data import MAX_CALLBACK_LENGTH, CallbackData
+
+# <prefix>.<base64 payload> inline, <prefix>~<key> for payloads kept in the store;
+# neither character is in the base64url alphabet or aiogram's `:` format
+_INLINE = "."
+_STORED = "~"
+
+_Encoder = Callable[[Any, bytearray], None]
+_Decoder = Callable[[bytes, int], Tuple[Any, int]]
+
+
+def _write_uint(value: int, out: bytearray):
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_uint(buf: bytes, pos: int) -> Tuple[int, int]:
+    byte = buf[pos]
+    if byte < 0x80:  # string lengths almost always fit in one byte
+        return byte, pos + 1
+    result, shift = byte & 0x7F, 7
+    pos += 1
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _write_int(value: int, out: bytearray):
+    # length byte + signed big-endian: one step per int to decode, unlike varints
+    length = (value.bit_length() + 8) // 8
+    out.append(length)
+    out += value.to_bytes(length, "big", signed=True)
+
+
+def _read_int(buf: bytes, pos: int) -> Tuple[int, int]:
+    end = pos + 1 + buf[pos]
+    if end > len(buf):
+        raise ValueError("Truncated int")
+    return int.from_bytes(buf[pos + 1 : end], "big", signed=True), end
+
+
+def _write_bool(value: bool, out: bytearray):
+    out.append(1 if value else 0)
+
+
+def _read_bool(buf: bytes, pos: int) -> Tuple[bool, int]:
+    byte = buf[pos]
+    if byte > 1:
+        raise ValueError(f"Bad bool byte {byte}")
+    return byte == 1, pos + 1
+
+
+def _write_str(value: str, out: bytearray):
+    raw = value.encode()
+    _write_uint(len(raw), out)
+    out += raw
+
+
+def _read_str(buf: bytes, pos: int) -> Tuple[str, int]:
+    length, pos = _read_uint(buf, pos)
+    end = pos + length
+    if end > len(buf):
+        raise ValueError("Truncated string")
+    return buf[pos:end].decode(), end
+
+
+def _write_uuid(value: UUID, out: bytearray):
+    out += value.bytes
+
+
+def _read_uuid(buf: bytes, pos: int) -> Tuple[UUID, int]:
+    if pos + 16 > len(buf):
+        raise ValueError("Truncated uuid")
+    return UUID(bytes=buf[pos : pos + 16]), pos + 16
+
+
+_SCALARS = {
+    bool: (_write_bool, _read_bool),
+    int: (_write_int, _read_int),
+    str: (_write_str, _read_str),
+    UUID: (_write_uuid, _read_uuid),
+}
+
+
+def _field_codec(annotation: Any) -> Tuple[_Encoder, _Decoder]:
+    if typing.get_origin(annotation) in (typing.Union, UnionType):
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) != 1:
+            raise TypeError(f"Unsupported union {annotation!r}")
+        return _optional(*_field_codec(args[0]))
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return _enum(annotation)
+    if annotation in _SCALARS:
+        return _SCALARS[annotation]
+    raise TypeError(f"Can not encode callback data field of type {annotation!r}")
+
+
+def _optional(encode: _Encoder, decode: _Decoder) -> Tuple[_Encoder, _Decoder]:
+    def write(value: Any, out: bytearray):
+        if value is None:
+            out.append(0)
+        else:
+            out.append(1)
+            encode(value, out)
+
+    def read(buf: bytes, pos: int) -> Tuple[Any, int]:
+        present, pos = _read_bool(buf, pos)
+        return decode(buf, pos) if present else (None, pos)
+
+    return write, read
+
+
+def _enum(enum: type[Enum]) -> Tuple[_Encoder, _Decoder]:
+    # by value, not by position, so reordering members keeps old buttons working
+    value_type = str if all(isinstance(m.value, str) for m in enum) else int
+    encode, decode = _SCALARS[value_type]
+
+    def write(value: Enum, out: bytearray):
+        encode(value.value, out)
+
+    def read(buf: bytes, pos: int) -> Tuple[Enum, int]:
+        value, pos = decode(buf, pos)
+        return enum(value), pos
+
+    return write, read
+
+
+def _b64(raw: bytes) -> str:
+    return urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+class CallbackPayloadStore:
+    """Payloads too long for callback data, kept for `ttl` seconds.
+
+    Keys are derived from the payload, so rendering the same button again
+    reuses (and refreshes) its entry instead of adding one.
+    """
+
+    def __init__(self, max_entries: int = 100_000, ttl: float = 7 * 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, Tuple[float, bytes]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(self, payload: bytes) -> str:
+        key = _b64(hashlib.blake2b(payload, digest_size=9).digest())
+        self._entries[key] = (time.monotonic() + self.ttl, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return key
+
+    def get(self, key: str) -> Optional[bytes]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, payload = item
+        if time.monotonic() > expires_at:
+            del self._entries[key]
+            return None
+        return payload
+
+
+payload_store = CallbackPayloadStore()
+
+
+class CompactCallbackData(CallbackData, prefix="compact"):
+    """`CallbackData` packed as base64 of length-prefixed binary fields.
+
+    Payloads that still exceed Telegram's 64 bytes go to `store` and only
+    their key is sent; such buttons stop working once the entry expires.
+    Strings in aiogram's own `prefix:a:b` format are still accepted, so
+    buttons sent before a class switched to this codec keep working.
+    """
+
+    store: ClassVar[CallbackPayloadStore] = payload_store
+
+    __fields_codec__: ClassVar[List[Tuple[str, _Encoder, _Decoder]]]
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any):
+        super().__pydantic_init_subclass__(**kwargs)
+        if _INLINE in cls.__prefix__ or _STORED in cls.__prefix__:
+            raise ValueError(
+                f"Prefix {cls.__prefix__!r} can not contain {_INLINE!r} or {_STORED!r}"
+            )
+        cls.__fields_codec__ = [
+            (name, *_field_codec(field.annotation))
+            for name, field in cls.model_fields.items()
+        ]
+
+    def _encode(self) -> bytearray:
+        out = bytearray()
+        for name, encode, _ in self.__fields_codec__:
+            encode(getattr(self, name), out)
+        return out
+
+    def _fits(self, raw: bytes) -> bool:
+        # unpadded base64 length
+        return len(self.__prefix__) + 1 + (len(raw) * 4 + 2) // 3 <= MAX_CALLBACK_LENGTH
+
+    def _finish(self, raw: bytes) -> str:
+        if self._fits(raw):
+            return f"{self.__prefix__}{_INLINE}{_b64(raw)}"
+        return f"{self.__prefix__}{_STORED}{self.store.put(bytes(raw))}"
+
+    def pack(self) -> str:
+        return self._finish(self._encode())
+
+    @property
+    def stored(self) -> bool:
+        """Whether `pack` has to go through the payload store."""
+        return not self._fits(self._encode())
+
+    def packer(self, field: Optional[str] = None) -> Callable[[Any], str]:
+        """Pack this data with `field` replaced by the argument, encoding the
+        other fields once for all calls."""
+        if field is None:
+            raw = bytes(self._encode())
+            return lambda _: self._finish(raw)
+        head, tail = bytearray(), bytearray()
+        out, encode_field = head, _write_int
+        for name, encode, _ in self.__fields_codec__:
+            if name == field:
+                out, encode_field = tail, encode
+            else:
+                encode(getattr(self, name), out)
+
+        def pack(value: Any) -> str:
+            raw = bytearray(head)
+            encode_field(value, raw)
+            raw += tail
+            return self._finish(raw)
+
+        return pack
+
+    @classmethod
+    def unpack(cls, value: str) -> Self:
+        prefix_length = len(cls.__prefix__)
+        if not value.startswith(cls.__prefix__) or len(value) <= prefix_length:
+            raise ValueError(f"Bad prefix ({value!r} is not {cls.__prefix__!r})")
+        marker, body = value[prefix_length], value[prefix_length + 1 :]
+        if marker == _INLINE:
+            try:
+                raw = urlsafe_b64decode(body + "=" * (-len(body) % 4))
+            except binascii.Error as e:
+                raise ValueError(f"Bad callback payload {value!r}") from e
+        elif marker == _STORED:
+            stored = cls.store.get(body)
+            if stored is None:
+                raise ValueError(f"Callback payload {value!r} expired")
+            raw = stored
+        else:
+            return super().unpack(value)
+
+        fields = {}
+        pos = 0
+        try:
+            for name, _, decode in cls.__fields_codec__:
+                fields[name], pos = decode(raw, pos)
+        except (IndexError, UnicodeDecodeError) as e:
+            raise ValueError(f"Bad callback payload {value!r}") from e
+        if pos != len(raw):
+            raise ValueError(f"Bad callback payload {value!r}: trailing bytes")
+        return cls(**fields)
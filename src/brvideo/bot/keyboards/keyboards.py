@@ -0,0 +1,15 @@
+from typing import Iterable
+
+from brvideo.bot.keyboards.base import MagicKeyboard
+from brvideo.bot.keyboards.callbackdata import ApplicationDecision
+
+
+class ApplicationsDigestKeyboard(MagicKeyboard):
+    """One accept/reject row per application in a review digest."""
+
+    def __init__(self, app_ids: Iterable[int]):
+        for app_id in app_ids:
+            self.row(
+                self.cb(f"✅ #{app_id}", ApplicationDecision(app_id=app_id, accepted=True)),
+                self.cb(f"❌ #{app_id}", ApplicationDecision(app_id=app_id, accepted=False)),
+            )
@@ -1,6 +1,12 @@
-from brvideo.bot.middlewares.ensure_message import EnsureMessageMiddleware
+from brvideo.bot.middlewares.ensure_message import (
+    EnsureCallbackQueryMiddleware,
+    EnsureMessageMiddleware,
+)
+from brvideo.bot.middlewares.throttling import ThrottlingMiddleware
 
 
 loaded_middlewares = [
+    ThrottlingMiddleware,  # first, so floods are cut before any other work
     EnsureMessageMiddleware,
+    EnsureCallbackQueryMiddleware,
 ]
@@ -1,25 +1,37 @@
 from typing import Any, Awaitable, Callable
 
 from aiogram import BaseMiddleware
-from aiogram.dispatcher.event.bases import CancelHandler
-from aiogram.types import InaccessibleMessage, Update
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.types import CallbackQuery, InaccessibleMessage, Message
 
 
 class EnsureMessageMiddleware(BaseMiddleware):
+    observers = ("message",)
+
+    async def __call__(
+        self,
+        handler: Callable[[Message, dict[str, Any]], Awaitable[Any]],
+        event: Message,
+        data: dict[str, Any],
+    ) -> Any:
+        if not event.bot or not event.from_user:
+            return UNHANDLED
+        return await handler(event, data)
+
+
+class EnsureCallbackQueryMiddleware(BaseMiddleware):
+    observers = ("callback_query",)
+
     async def __call__(
         self,
-        handler: Callable[[Update, dict[str, Any]], Awaitable[Any]],
-        event: Update,
+        handler: Callable[[CallbackQuery, dict[str, Any]], Awaitable[Any]],
+        event: CallbackQuery,
         data: dict[str, Any],
     ) -> Any:
-        if event.message:
-            if not event.message.bot or not event.message.from_user:
-                raise CancelHandler()
-        elif event.callback_query:
-            if (
-                not event.callback_query.message
-                or isinstance(event.callback_query.message, InaccessibleMessage)
-                or not event.callback_query.bot
-            ):
-                raise CancelHandler()
+        if (
+            not event.message
+            or isinstance(event.message, InaccessibleMessage)
+            or not event.bot
+        ):
+            return UNHANDLED
         return await handler(event, data)
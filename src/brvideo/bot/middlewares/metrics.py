@@ -0,0 +1,54 @@
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.bases import CancelHandler, SkipHandler
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.types import TelegramObject
+
+from brvideo.core.metrics import Counter, Histogram, Registry, registry
+
+HANDLERS_PACKAGE = "brvideo.bot.handlers."
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Inner middleware timing every handler call, labelled by the handler.
+
+    Registered on the dispatcher's observers only while metrics are enabled;
+    inner middlewares of the dispatcher apply to handlers of every nested
+    router, and only run once the filters picked a handler.
+    """
+
+    def __init__(self, metrics: Registry = registry):
+        self.metrics = metrics
+        self._handlers: Dict[Callable, Tuple[Histogram, Counter]] = {}
+
+    def _metrics_for(self, callback: Callable) -> Tuple[Histogram, Counter]:
+        metrics = self._handlers.get(callback)
+        if metrics is None:
+            module = callback.__module__.removeprefix(HANDLERS_PACKAGE)
+            labels = {"handler": f"{module}.{callback.__qualname__}"}
+            metrics = self._handlers[callback] = (
+                self.metrics.histogram("handler_seconds", "Handler run time", labels),
+                self.metrics.counter("handler_errors_total", "Handlers that raised", labels),
+            )
+        return metrics
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        handler_object: HandlerObject = data["handler"]
+        duration, errors = self._metrics_for(handler_object.callback)
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except (SkipHandler, CancelHandler):  # control flow, not failures
+            raise
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            duration.observe(time.perf_counter() - started)
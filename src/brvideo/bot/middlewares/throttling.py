@@ -0,0 +1,111 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Literal, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import Update, User
+
+from brvideo.core import managers
+from brvideo.core.config import settings
+
+
+@dataclass
+class ThrottleStats:
+    passed: int = 0
+    delayed: int = 0
+    dropped: int = 0
+
+
+class RateTable:
+    """Per-user GCRA state: one float (the theoretical arrival time) per user.
+
+    Entries live in two generations swapped every `period` seconds. A TAT is
+    never more than `period` ahead of the time it was written, so once a
+    generation is a period old it only holds users allowed a full burst again
+    and dropping it loses nothing. Memory is bounded by users active within
+    the last two periods.
+    """
+
+    def __init__(self, rate: float, burst: int, max_wait: float = 0):
+        self.interval = 1 / rate
+        self.tolerance = (burst - 1) * self.interval
+        self.period = self.tolerance + self.interval + max_wait
+        self._current: Dict[int, float] = {}
+        self._previous: Dict[int, float] = {}
+        self._rotated_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._current) + len(self._previous)
+
+    def _rotate(self, now: float):
+        if now - self._rotated_at >= self.period:
+            # more than one period idle: both generations are stale
+            stale = now - self._rotated_at >= 2 * self.period
+            self._previous = {} if stale else self._current
+            self._current = {}
+            self._rotated_at = now
+
+    def wait(self, user_id: int, max_wait: float = 0) -> float:
+        """Seconds until `user_id` may proceed. Waits up to `max_wait` are
+        reserved (the update counts once that time has passed), longer ones
+        are refused and leave the state untouched."""
+        now = time.monotonic()
+        self._rotate(now)
+        tat = self._current.get(user_id)
+        if tat is None:
+            tat = self._previous.pop(user_id, now)
+        tat = max(tat, now)
+        wait = tat - self.tolerance - now
+        if wait <= max_wait:
+            self._current[user_id] = tat + self.interval
+        elif user_id not in self._current:
+            self._current[user_id] = tat
+        return max(wait, 0)
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Limits how fast one user can drive handlers.
+
+    In `drop` mode updates over the limit are discarded. In `delay` mode they
+    wait for their slot if it is at most `max_delay` away, otherwise they are
+    dropped. Owners and admins are never throttled.
+    """
+
+    observers = ("update",)
+
+    def __init__(
+        self,
+        rate: float = settings.THROTTLE_RATE,
+        burst: int = settings.THROTTLE_BURST,
+        mode: Literal["drop", "delay"] = settings.THROTTLE_MODE,
+        max_delay: float = settings.THROTTLE_MAX_DELAY,
+    ):
+        self.mode = mode
+        self.max_delay = max_delay if mode == "delay" else 0
+        self.table = RateTable(rate, burst, max_wait=self.max_delay)
+        self.stats = ThrottleStats()
+
+    async def __call__(
+        self,
+        handler: Callable[[Update, dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: dict[str, Any],
+    ) -> Any:
+        user: Optional[User] = data.get("event_from_user")
+        if (
+            user is None
+            or user.id in settings.OWNERS
+            or await managers.admins.is_admin(user.id)
+        ):
+            return await handler(event, data)
+
+        wait = self.table.wait(user.id, self.max_delay)
+        if wait > self.max_delay:
+            self.stats.dropped += 1
+            return None
+        if wait > 0:
+            self.stats.delayed += 1
+            await asyncio.sleep(wait)
+        self.stats.passed += 1
+        return await handler(event, data)
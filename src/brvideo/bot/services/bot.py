@@ -1,15 +1,31 @@
+import asyncio
+import signal
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional
 
-from aiogram import Bot, Dispatcher
+from aiogram import BaseMiddleware, Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.client.telegram import TelegramAPIServer
 from aiogram.enums import ParseMode
+from aiogram.webhook.aiohttp_server import setup_application
+from aiohttp import web
+from loguru import logger
 
 from brvideo.bot import handlers
+from brvideo.bot.keyboards.codec import payload_store
 from brvideo.bot.middlewares import loaded_middlewares
-from brvideo.core import config
+from brvideo.bot.middlewares.metrics import HandlerMetricsMiddleware
+from brvideo.bot.middlewares.throttling import ThrottlingMiddleware
+from brvideo.bot.services.digest import ApplicationDigest
+from brvideo.bot.services.metrics import MetricsExporter
+from brvideo.bot.services.ratelimit import RateLimitMiddleware
+from brvideo.bot.services.scheduler import UpdateScheduler
+from brvideo.bot.services.send_queue import SendQueue
+from brvideo.bot.services.storage import ManagerStorage
+from brvideo.bot.services.webhook import QueuedRequestHandler
+from brvideo.core import config, managers
+from brvideo.core.metrics import registry
 
 
 @dataclass
@@ -23,6 +39,19 @@ class BotService:
         self._bot: Optional[Bot] = None
         self._dp: Optional[Dispatcher] = None
         self._session: Optional[AiohttpSession] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._scheduler: Optional[UpdateScheduler] = None
+        self._send_queue: Optional[SendQueue] = None
+        self._digest: Optional[ApplicationDigest] = None
+        self._metrics: Optional[MetricsExporter] = None
+        self.middlewares: List[BaseMiddleware] = []
+        # update types with a registered handler, requested from Telegram
+        self.allowed_updates: List[str] = []
+        self.rate_limiter = RateLimitMiddleware(
+            global_rate=config.settings.SEND_GLOBAL_RATE,
+            chat_rate=config.settings.SEND_CHAT_RATE,
+            group_rate=config.settings.SEND_GROUP_RATE,
+        )
 
     @property
     def bot(self) -> Bot:
@@ -30,6 +59,28 @@ class BotService:
             raise RuntimeError("Bot is not initialized. Call initialize() first.")
         return self._bot
 
+    @property
+    def scheduler(self) -> UpdateScheduler:
+        if self._scheduler is None:
+            raise RuntimeError(
+                "Scheduler is not initialized. Call initialize() first."
+            )
+        return self._scheduler
+
+    @property
+    def send_queue(self) -> SendQueue:
+        if self._send_queue is None:
+            raise RuntimeError(
+                "Send queue is not initialized. Call initialize() first."
+            )
+        return self._send_queue
+
+    @property
+    def digest(self) -> ApplicationDigest:
+        if self._digest is None:
+            raise RuntimeError("Digest is not initialized. Call initialize() first.")
+        return self._digest
+
     @property
     def dp(self) -> Dispatcher:
         if self._dp is None:
@@ -49,7 +100,10 @@ class BotService:
                     is_local=True,
                 )
             )
-        self._dp = Dispatcher()
+        else:
+            self._session = AiohttpSession()
+        self._session.middleware(self.rate_limiter)
+        self._dp = Dispatcher(storage=ManagerStorage(managers.fsm))
         self._bot = Bot(
             token=self._config.token,
             session=self._session,
@@ -58,10 +112,73 @@ class BotService:
             ),
         )
 
-        for mw in loaded_middlewares:
-            self.dp.update.middleware(mw())
+        payload_store.max_entries = config.settings.CALLBACK_STORE_SIZE
+        payload_store.ttl = config.settings.CALLBACK_STORE_TTL
+        self._send_queue = SendQueue(self._bot)
+        self._digest = ApplicationDigest(
+            self._send_queue,
+            chat_id=config.settings.APPLICATIONS_CHAT_ID,
+            thread_id=config.settings.APPLICATIONS_THREAD_ID,
+            window=config.settings.DIGEST_WINDOW,
+            max_items=config.settings.DIGEST_MAX_ITEMS,
+        )
+        # each middleware runs only for the event types it declares, e.g. the
+        # message checks never see callback queries. Update-level ones are
+        # registered before the scheduler and so run outside it: an update the
+        # throttle delays waits without holding a concurrency permit
+        self.middlewares = [mw() for mw in loaded_middlewares]
+        for mw in self.middlewares:
+            for observer in getattr(mw, "observers", ("update",)):
+                self.dp.observers[observer].outer_middleware(mw)
+
+        self._scheduler = UpdateScheduler(
+            concurrency=config.settings.UPDATE_CONCURRENCY,
+            max_pending=config.settings.UPDATE_MAX_PENDING,
+        )
+        # runs after aiogram's UserContextMiddleware resolved the chat and
+        # before its FSM middleware reads the chat's state
+        self._scheduler.install(self._dp)
+
+        self._dp.include_router(handlers.get_root_router())
+        self.allowed_updates = self._dp.resolve_used_update_types()
 
-        self._dp.include_router(handlers.root_router)
+        if registry.enabled:
+            self._register_metrics()
+            settings = config.settings
+            self._metrics = MetricsExporter(
+                registry,
+                host=settings.METRICS_HOST,
+                port=settings.METRICS_PORT,
+                file=settings.METRICS_FILE,
+                interval=settings.METRICS_DUMP_INTERVAL,
+            )
+            await self._metrics.start()
+
+    def _register_metrics(self) -> None:
+        """Time every handler and expose the services' stats."""
+        timing = HandlerMetricsMiddleware()
+        for name, observer in self.dp.observers.items():
+            if name != "update":  # its handler is the whole dispatch
+                observer.middleware(timing)
+
+        registry.stats("telegram_send", self.rate_limiter.stats)
+        registry.stats("send_queue", self.send_queue.stats)
+        registry.stats("digest", self.digest.stats)
+        for mw in self.middlewares:
+            if isinstance(mw, ThrottlingMiddleware):
+                registry.stats("throttle", mw.stats)
+        registry.gauge(
+            "updates_pending", "Updates admitted and not finished",
+            read=lambda: self.scheduler.pending,
+        )
+        registry.gauge(
+            "updates_busy_chats", "Chats with an update being handled",
+            read=lambda: self.scheduler.busy_chats,
+        )
+        registry.gauge(
+            "digest_depth", "Applications waiting for the next digest",
+            read=lambda: self.digest.depth,
+        )
 
     async def run(self) -> None:
         if self._bot is None or self._dp is None:
@@ -69,4 +186,72 @@ class BotService:
         if self._bot is None or self._dp is None:
             raise RuntimeError("The bot or dispatcher failed to initialize.")
 
-        await self._dp.start_polling(self._bot, allowed_updates=["message"])
+        if config.settings.BOT_RUN_MODE == "webhook":
+            await self._run_webhook()
+        else:
+            await self._dp.start_polling(
+                self._bot,
+                allowed_updates=self.allowed_updates,
+                tasks_concurrency_limit=self.scheduler.max_pending,
+                close_bot_session=False,  # closed by `close` after the send queue drains
+            )
+
+    def build_webhook_app(self) -> web.Application:
+        """aiohttp app serving updates on `WEBHOOK_PATH`; POST fake updates to
+        it to exercise the bot locally."""
+        settings = config.settings
+        app = web.Application()
+        QueuedRequestHandler(
+            dispatcher=self.dp,
+            bot=self.bot,
+            scheduler=self.scheduler,
+            secret_token=settings.WEBHOOK_SECRET,
+        ).register(app, path=settings.WEBHOOK_PATH)
+        setup_application(app, self.dp, bot=self.bot)
+        return app
+
+    async def _run_webhook(self) -> None:
+        settings = config.settings
+        runner = web.AppRunner(self.build_webhook_app())
+        await runner.setup()
+        await web.TCPSite(runner, settings.WEBHOOK_HOST, settings.WEBHOOK_PORT).start()
+        logger.info(
+            f"Serving webhook on {settings.WEBHOOK_HOST}:{settings.WEBHOOK_PORT}"
+            f"{settings.WEBHOOK_PATH}"
+        )
+
+        if settings.WEBHOOK_URL:
+            await self.bot.set_webhook(
+                url=settings.WEBHOOK_URL.rstrip("/") + settings.WEBHOOK_PATH,
+                secret_token=settings.WEBHOOK_SECRET,
+                allowed_updates=self.allowed_updates,
+            )
+
+        self._stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self._stop_event.set)
+            except NotImplementedError:  # windows
+                pass
+        try:
+            await self._stop_event.wait()
+        finally:
+            # stops accepting requests, then drains in-flight updates (see QueuedRequestHandler.close)
+            await runner.cleanup()
+
+    async def close(self) -> None:
+        if self._digest is not None:
+            await self._digest.close()
+        if self._send_queue is not None:
+            await self._send_queue.close()
+        if self._bot is not None:
+            await self._bot.session.close()
+        if self._metrics is not None:  # last, so the final dump has everything
+            await self._metrics.close()
+
+    async def stop(self) -> None:
+        if self._stop_event is not None:
+            self._stop_event.set()
+        elif self._dp is not None:
+            await self._dp.stop_polling()
@@ -0,0 +1,94 @@
+import asyncio
+import html
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+from brvideo.bot.keyboards.keyboards import ApplicationsDigestKeyboard
+from brvideo.bot.services.send_queue import SendQueue
+from brvideo.core.managers.applications import _CachedApplication
+
+
+@dataclass
+class DigestStats:
+    applications: int = 0
+    messages: int = 0
+
+
+class ApplicationDigest:
+    """Posts new applications to the review chat in batches.
+
+    Applications are collected for up to `window` seconds and sent as one
+    message with an accept/reject row per item. A batch reaching `max_items`
+    is sent right away. Messages go out through `send_queue`, which keeps
+    them in order and counts failed sends.
+    """
+
+    # Telegram allows 100 buttons per keyboard, two per application
+    max_batch = 50
+
+    def __init__(
+        self,
+        send_queue: SendQueue,
+        chat_id: int,
+        thread_id: Optional[int] = None,
+        window: float = 5,
+        max_items: int = 10,
+    ):
+        self._send_queue = send_queue
+        self.chat_id = chat_id
+        self.thread_id = thread_id
+        self.window = window
+        self.max_items = min(max_items, self.max_batch)
+        self._batch: List[_CachedApplication] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.stats = DigestStats()
+
+    @property
+    def depth(self) -> int:
+        return len(self._batch)
+
+    def add(self, applications: Iterable[_CachedApplication]):
+        for application in applications:
+            if application.accepted is not None:  # e.g. rejected by link validation
+                continue
+            self._batch.append(application)
+            if len(self._batch) >= self.max_items:
+                self._schedule_flush()
+        if self._batch and self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.window, self._schedule_flush
+            )
+
+    def _schedule_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._batch:
+            return
+        batch, self._batch = self._batch[: self.max_items], self._batch[self.max_items :]
+        self._send_queue.send(
+            self.chat_id,
+            self.render(batch),
+            message_thread_id=self.thread_id,
+            reply_markup=ApplicationsDigestKeyboard(0, (app.id for app in batch)),
+        )
+        self.stats.messages += 1
+        self.stats.applications += len(batch)
+
+    @staticmethod
+    def render(batch: List[_CachedApplication]) -> str:
+        lines = [f"<b>New applications: {len(batch)}</b>"]
+        for app in batch:
+            line = (
+                f"#{app.id} {html.escape(app.nickname)} · server {app.server}"
+                f" · {app.social.value} · <a href=\"{html.escape(app.link_acc)}\">account</a>"
+            )
+            if app.link_video:
+                line += f" · <a href=\"{html.escape(app.link_video)}\">video</a>"
+            lines.append(line)
+        return "\n".join(lines)
+
+    async def close(self):
+        """Queue whatever is still collected; close the send queue afterwards."""
+        while self._batch:
+            self._schedule_flush()
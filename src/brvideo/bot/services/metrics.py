@@ -0,0 +1,86 @@
+import asyncio
+from typing import Optional
+
+from aiohttp import web
+from loguru import logger
+
+from brvideo.core.metrics import Registry, write_atomic
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsExporter:
+    """Publishes a registry in the Prometheus text format.
+
+    With `port` it is served over HTTP on `path`, for a scraper. With `file`
+    it is written there every `interval` seconds and once more on `close`,
+    for offline runs without one.
+    """
+
+    def __init__(
+        self,
+        registry: Registry,
+        host: str = "127.0.0.1",
+        port: Optional[int] = None,
+        path: str = "/metrics",
+        file: Optional[str] = None,
+        interval: float = 60,
+    ):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.path = path
+        self.file = file
+        self.interval = interval
+        self._runner: Optional[web.AppRunner] = None
+        self._dump_task: Optional[asyncio.Task] = None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=self.registry.render().encode(), headers={"Content-Type": CONTENT_TYPE}
+        )
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get(self.path, self.handle)
+        return app
+
+    async def start(self):
+        if self.port is not None:
+            self._runner = web.AppRunner(self.build_app())
+            await self._runner.setup()
+            await web.TCPSite(self._runner, self.host, self.port).start()
+            logger.info(f"Serving metrics on {self.host}:{self.port}{self.path}")
+        if self.file is not None and self._dump_task is None:
+            self._dump_task = asyncio.create_task(self._dump_loop(), name="metrics-dump")
+
+    async def dump(self):
+        if self.file is None:
+            return
+        # render on the loop, which registers metrics and owns the values the
+        # gauges read; only the file write is handed to a thread
+        try:
+            text = self.registry.render()
+            await asyncio.to_thread(write_atomic, self.file, text)
+        except OSError as e:
+            logger.warning(f"Metrics not written to {self.file}: {e}")
+        except Exception:
+            logger.exception(f"Metrics not written to {self.file}")
+
+    async def _dump_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.dump()
+
+    async def close(self):
+        if self._dump_task is not None:
+            self._dump_task.cancel()
+            try:
+                await self._dump_task
+            except asyncio.CancelledError:
+                pass
+            self._dump_task = None
+            await self.dump()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
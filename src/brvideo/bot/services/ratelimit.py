@@ -0,0 +1,175 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, Union
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from loguru import logger
+
+from brvideo.bot.services.scheduler import released_permit
+
+ChatId = Union[int, str]
+
+
+class TokenBucket:
+    """`rate` tokens per second, up to `capacity` stored. Waiters are served
+    in FIFO order."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def block(self, seconds: float):
+        """Hand out no tokens for `seconds`, e.g. after a 429 `retry_after`."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+    @property
+    def idle(self) -> bool:
+        now = time.monotonic()
+        self._refill(now)
+        return (
+            not self._lock.locked()
+            and self._tokens >= self.capacity
+            and now >= self._blocked_until
+        )
+
+    @property
+    def ready(self) -> bool:
+        """Whether `acquire` would return without waiting."""
+        now = time.monotonic()
+        self._refill(now)
+        return not self._lock.locked() and self._tokens >= 1 and now >= self._blocked_until
+
+    async def acquire(self) -> float:
+        """Take one token; returns the time spent waiting for it."""
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return now - started
+                    wait = (1 - self._tokens) / self.rate
+                await asyncio.sleep(wait)
+
+
+@dataclass
+class RateLimitStats:
+    sent: int = 0
+    throttled: int = 0
+    retried: int = 0
+
+
+class RateLimitMiddleware(BaseRequestMiddleware):
+    """Bot session middleware keeping outbound calls under Telegram flood limits.
+
+    Every method addressed to a chat takes a token from that chat's bucket and
+    then from the global one. Groups get a slower bucket than private chats.
+    A 429 blocks the chat (or the global bucket for chat-less methods) for
+    `retry_after` seconds and the call is retried up to `max_retries` times.
+
+    Handlers answering inside a scheduled update give their scheduler slot
+    back while they wait, so throttled chats cannot starve the others.
+    """
+
+    # idle per-chat buckets are dropped once there are more than this
+    max_chat_buckets = 10_000
+
+    def __init__(
+        self,
+        global_rate: float = 30,
+        chat_rate: float = 1,
+        group_rate: float = 20 / 60,
+        chat_burst: float = 3,
+        max_retries: int = 3,
+    ):
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self._chats: Dict[ChatId, TokenBucket] = {}
+        self._waiting = 0
+        self.stats = RateLimitStats()
+
+    @property
+    def depth(self) -> int:
+        """Requests currently waiting for a token."""
+        return self._waiting
+
+    def _chat_bucket(self, chat_id: ChatId) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self.max_chat_buckets:
+                for key in [k for k, b in self._chats.items() if b.idle]:
+                    del self._chats[key]
+            # private chats have positive ids, groups and channels negative or @username
+            group = not isinstance(chat_id, int) or chat_id < 0
+            rate = self.group_rate if group else self.chat_rate
+            bucket = self._chats[chat_id] = TokenBucket(rate, self.chat_burst)
+        return bucket
+
+    async def _acquire(self, chat_id: ChatId):
+        bucket = self._chat_bucket(chat_id)
+        if bucket.ready and self.global_bucket.ready:
+            await bucket.acquire()
+            await self.global_bucket.acquire()
+            return
+        self._waiting += 1
+        try:
+            async with released_permit():
+                waited = await bucket.acquire()
+                waited += await self.global_bucket.acquire()
+        finally:
+            self._waiting -= 1
+        if waited > 0:
+            self.stats.throttled += 1
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        attempt = 0
+        while True:
+            if chat_id is not None:
+                await self._acquire(chat_id)
+            try:
+                response = await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                self.stats.retried += 1
+                logger.warning(
+                    f"{type(method).__name__} hit flood control, retrying in {e.retry_after}s"
+                )
+                if chat_id is not None:
+                    self._chat_bucket(chat_id).block(e.retry_after)
+                else:
+                    async with released_permit():
+                        await asyncio.sleep(e.retry_after)
+                continue
+            self.stats.sent += 1
+            return response
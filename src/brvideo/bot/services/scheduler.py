@@ -0,0 +1,179 @@
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Coroutine, Dict, Optional, Set
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.dispatcher.middlewares.user_context import EVENT_CONTEXT_KEY
+from aiogram.types import TelegramObject
+from loguru import logger
+
+
+class _ChatSlot:
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        # asyncio.Lock wakes waiters in FIFO order
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class _Permit:
+    """One of the scheduler's concurrency slots, held by a running update."""
+
+    __slots__ = ("semaphore", "held")
+
+    def __init__(self, semaphore: asyncio.Semaphore):
+        self.semaphore = semaphore
+        self.held = False
+
+    async def acquire(self):
+        await self.semaphore.acquire()
+        self.held = True
+
+    def release(self):
+        if self.held:
+            self.held = False
+            self.semaphore.release()
+
+
+_permit: ContextVar[Optional[_Permit]] = ContextVar("update_permit", default=None)
+
+
+@asynccontextmanager
+async def released_permit() -> AsyncIterator[None]:
+    """Hand the running update's concurrency slot back while the block waits
+    (e.g. for a rate limit token) and take it again afterwards. The chat lock
+    stays held, so the chat's updates keep their order. A no-op outside
+    scheduled updates."""
+    permit = _permit.get()
+    if permit is None or not permit.held:
+        yield
+        return
+    permit.release()
+    try:
+        yield
+    finally:
+        await permit.acquire()
+
+
+class UpdateScheduler(BaseMiddleware):
+    """Outer `dp.update` middleware bounding update processing.
+
+    At most `concurrency` handlers run at once. Updates from the same chat
+    run one at a time in arrival order, different chats run in parallel.
+    A handler waiting inside `released_permit` does not count.
+
+    `max_pending` bounds admitted but unfinished updates: `submit` waits for
+    a free slot (webhook mode), polling passes it to aiogram as
+    `tasks_concurrency_limit` so no new updates are fetched meanwhile.
+    """
+
+    def __init__(self, concurrency: int = 16, max_pending: int = 1000):
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self._running = asyncio.Semaphore(concurrency)
+        self._admission = asyncio.Semaphore(max_pending)
+        self._chats: Dict[int, _ChatSlot] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @property
+    def pending(self) -> int:
+        """Updates submitted and not finished yet."""
+        return len(self._tasks)
+
+    @property
+    def busy_chats(self) -> int:
+        return len(self._chats)
+
+    @staticmethod
+    def _chat_key(data: Dict[str, Any]) -> Optional[int]:
+        context = data.get(EVENT_CONTEXT_KEY)
+        if context is None:
+            return None
+        if context.chat is not None:
+            return context.chat.id
+        if context.user is not None:
+            return context.user.id
+        return None
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        key = self._chat_key(data)
+        if key is None:
+            return await self._run(handler, event, data)
+
+        slot = self._chats.get(key)
+        if slot is None:
+            slot = self._chats[key] = _ChatSlot()
+        slot.users += 1
+        try:
+            async with slot.lock:
+                return await self._run(handler, event, data)
+        finally:
+            slot.users -= 1
+            if not slot.users:
+                del self._chats[key]
+
+    async def _run(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        permit = _Permit(self._running)
+        await permit.acquire()
+        token = _permit.set(permit)
+        try:
+            return await handler(event, data)
+        finally:
+            _permit.reset(token)
+            permit.release()
+
+    def install(self, dp: Dispatcher) -> None:
+        """Register on `dp.update` ahead of aiogram's FSM middleware, which
+        reads the chat's state: the read then waits for the chat's earlier
+        updates instead of racing them."""
+        middlewares = dp.update.outer_middleware
+        fsm = dp.fsm if dp.fsm in middlewares else None
+        if fsm is not None:
+            middlewares.unregister(fsm)
+        middlewares(self)
+        if fsm is not None:
+            middlewares(fsm)
+
+    async def submit(self, coro: Coroutine[Any, Any, Any]) -> None:
+        """Run `coro` in the background, waiting while `max_pending` updates
+        are already in flight."""
+        await self._admission.acquire()
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        self._idle.clear()
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        self._admission.release()
+        if not self._tasks:
+            self._idle.set()
+        if not task.cancelled() and task.exception() is not None:
+            logger.opt(exception=task.exception()).error("Update task failed")
+
+    async def join(self) -> None:
+        """Wait until every submitted update has been processed."""
+        await self._idle.wait()
+
+    async def close(self, timeout: float = 30) -> None:
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Cancelling {len(self._tasks)} unprocessed updates")
+            for task in list(self._tasks):
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
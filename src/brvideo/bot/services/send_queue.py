@@ -0,0 +1,104 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.types import InlineKeyboardMarkup
+from loguru import logger
+
+from brvideo.bot.services.ratelimit import ChatId
+
+_Target = Tuple[ChatId, Optional[int]]
+# text and keyboard of one queued message
+_Outgoing = Tuple[str, Optional[InlineKeyboardMarkup]]
+
+
+@dataclass
+class SendQueueStats:
+    queued: int = 0
+    sent: int = 0
+    coalesced: int = 0
+    failed: int = 0
+
+
+class SendQueue:
+    """Fire-and-forget text notifications, one sender task per chat/thread.
+
+    While a send waits on the rate limiter, texts for the same target pile up
+    and go out joined into as few messages as fit into Telegram's limit.
+    Messages with a keyboard are sent on their own, in order.
+    """
+
+    max_length = 4096
+    separator = "\n\n"
+
+    def __init__(self, bot: Bot):
+        self._bot = bot
+        self._pending: Dict[_Target, Deque[_Outgoing]] = {}
+        self._tasks: Dict[_Target, asyncio.Task] = {}
+        self.stats = SendQueueStats()
+
+    @property
+    def depth(self) -> int:
+        """Messages queued and not sent yet."""
+        return sum(len(messages) for messages in self._pending.values())
+
+    def send(
+        self,
+        chat_id: ChatId,
+        text: str,
+        message_thread_id: Optional[int] = None,
+        reply_markup: Optional[InlineKeyboardMarkup] = None,
+    ):
+        target = (chat_id, message_thread_id)
+        self._pending.setdefault(target, deque()).append((text, reply_markup))
+        self.stats.queued += 1
+        if target not in self._tasks:
+            self._tasks[target] = asyncio.create_task(self._drain(target))
+
+    def _take_batch(self, messages: Deque[_Outgoing]) -> _Outgoing:
+        text, markup = messages.popleft()
+        if markup is not None:
+            return text, markup
+        batch, length = [text], len(text)
+        while messages and messages[0][1] is None:
+            following = messages[0][0]
+            if length + len(self.separator) + len(following) > self.max_length:
+                break
+            length += len(self.separator) + len(following)
+            batch.append(messages.popleft()[0])
+        self.stats.coalesced += len(batch) - 1
+        return self.separator.join(batch), None
+
+    async def _drain(self, target: _Target):
+        chat_id, thread_id = target
+        try:
+            while messages := self._pending.get(target):
+                text, markup = self._take_batch(messages)
+                try:
+                    await self._bot.send_message(
+                        chat_id=chat_id,
+                        text=text,
+                        message_thread_id=thread_id,
+                        reply_markup=markup,
+                    )
+                    self.stats.sent += 1
+                except Exception:
+                    self.stats.failed += 1
+                    logger.exception(f"Failed to send queued message to {chat_id}")
+                if not messages:
+                    self._pending.pop(target, None)
+        finally:
+            self._tasks.pop(target, None)
+
+    async def close(self, timeout: float = 30):
+        """Send what is queued, giving up after `timeout` seconds."""
+        if not self._tasks:
+            return
+        _, unfinished = await asyncio.wait(list(self._tasks.values()), timeout=timeout)
+        if unfinished:
+            logger.warning(f"Dropping {self.depth} queued messages")
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*unfinished, return_exceptions=True)
@@ -0,0 +1,44 @@
+from typing import Any, Dict, Mapping, Optional
+
+from aiogram.exceptions import DataNotDictLikeError
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import (
+    BaseStorage,
+    DefaultKeyBuilder,
+    KeyBuilder,
+    StateType,
+    StorageKey,
+)
+
+from brvideo.core.managers.fsm import FSMManager
+
+
+class ManagerStorage(BaseStorage):
+    """FSM storage on top of `FSMManager`: reads come from its in-memory
+    cache, writes reach the database in coalesced batches."""
+
+    def __init__(self, manager: FSMManager, key_builder: Optional[KeyBuilder] = None):
+        self.manager = manager
+        self.key_builder = key_builder or DefaultKeyBuilder()
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        await self.manager.update_record(
+            self.key_builder.build(key),
+            state=state.state if isinstance(state, State) else state,
+        )
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return (await self.manager.get_record(self.key_builder.build(key))).state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not isinstance(data, dict):
+            msg = f"Data must be a dict or dict-like object, got {type(data).__name__}"
+            raise DataNotDictLikeError(msg)
+        await self.manager.update_record(self.key_builder.build(key), data=data.copy())
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        # cached entries are shared, hand out a copy
+        return dict((await self.manager.get_record(self.key_builder.build(key))).data)
+
+    async def close(self) -> None:
+        pass  # flushed by `managers.close`
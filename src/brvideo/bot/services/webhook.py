@@ -0,0 +1,51 @@
+from typing import Any, Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+from aiohttp import web
+
+from brvideo.bot.services.scheduler import UpdateScheduler
+
+
+class QueuedRequestHandler(SimpleRequestHandler):
+    """Webhook handler that answers Telegram immediately and hands updates to
+    an `UpdateScheduler`.
+
+    When the scheduler is full the request waits, which slows Telegram down
+    instead of piling up unbounded background tasks.
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        scheduler: UpdateScheduler,
+        secret_token: Optional[str] = None,
+        drain_timeout: float = 30,
+        **data: Any,
+    ) -> None:
+        super().__init__(
+            dispatcher=dispatcher,
+            bot=bot,
+            handle_in_background=True,
+            secret_token=secret_token,
+            **data,
+        )
+        self.scheduler = scheduler
+        self._drain_timeout = drain_timeout
+
+    async def _handle_request_background(self, bot: Bot, request: web.Request) -> web.Response:
+        try:
+            update = await request.json(loads=bot.session.json_loads)
+        except ValueError:
+            return web.Response(body="Bad Request", status=400)
+        await self.scheduler.submit(self._background_feed_update(bot, update))
+        return web.json_response({}, dumps=bot.session.json_dumps)
+
+    async def join(self) -> None:
+        """Wait until every received update has been processed."""
+        await self.scheduler.join()
+
+    async def close(self) -> None:
+        # the bot session is owned by BotService and closed by `app.run`
+        await self.scheduler.close(self._drain_timeout)
@@ -0,0 +1,8 @@
+from aiogram.fsm.state import State, StatesGroup
+
+
+class ApplicationForm(StatesGroup):
+    nickname = State()
+    server = State()
+    link_acc = State()
+    link_video = State()
@@ -1,8 +1,25 @@
 import os
 from pathlib import Path
-from typing import List, Optional
-from pydantic import model_validator
+from typing import Any, Dict, List, Literal, Optional, Union
+from pydantic import BaseModel, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from tortoise.backends.base.config_generator import expand_db_url
+
+
+class DatabaseSettings(BaseModel):
+    """Pool tuning for postgres connections, set as e.g. `DATABASE__POOL_MAX=20`."""
+
+    POOL_MIN: int = 2
+    POOL_MAX: int = 10
+    # prepared statements kept per connection; 0 behind pgbouncer in transaction mode
+    STATEMENT_CACHE_SIZE: int = 100
+    # seconds; a query, or a wait for a free connection, fails after this long
+    COMMAND_TIMEOUT: Optional[float] = 60
+    ACQUIRE_TIMEOUT: Optional[float] = 10
+    # idle connections above POOL_MIN are closed after this many seconds
+    MAX_INACTIVE_LIFETIME: float = 300
+    # read-only replica for the periodic cache reloads, which tolerate lag
+    REPLICA_URL: Optional[str] = None
 
 
 class Settings(BaseSettings):
@@ -15,8 +32,67 @@ class Settings(BaseSettings):
     TOKEN: str
     OWNERS: List[int]
     DATABASE_URL: str
+    DATABASE: DatabaseSettings = DatabaseSettings()
     APPLICATIONS_CHAT_ID: int
     APPLICATIONS_THREAD_ID: Optional[int] = None
+    # publish cache changes over Postgres LISTEN/NOTIFY so several bot processes stay in sync
+    CACHE_INVALIDATION_BUS: bool = False
+
+    BOT_RUN_MODE: Literal["polling", "webhook"] = "polling"
+    # public base url Telegram posts to; when unset the webhook is not registered
+    # with Telegram, which is how the server is run locally against fake updates
+    WEBHOOK_URL: Optional[str] = None
+    WEBHOOK_PATH: str = "/webhook"
+    # checked against the header Telegram sends with every update; required
+    # with WEBHOOK_URL, as the endpoint is public
+    WEBHOOK_SECRET: Optional[str] = None
+    WEBHOOK_HOST: str = "0.0.0.0"
+    WEBHOOK_PORT: int = 8080
+
+    # handlers running at once; one chat's updates are always handled in order
+    UPDATE_CONCURRENCY: int = 16
+    # updates accepted but not finished before polling/webhook requests wait
+    UPDATE_MAX_PENDING: int = 1000
+
+    # outbound flood limits, messages per second
+    SEND_GLOBAL_RATE: float = 30
+    SEND_CHAT_RATE: float = 1
+    SEND_GROUP_RATE: float = 20 / 60
+
+    # new applications are posted to the review chat in digests of up to N items
+    DIGEST_WINDOW: float = 5
+    DIGEST_MAX_ITEMS: int = 10
+
+    # per-user flood limit: sustained updates per second and burst size
+    THROTTLE_RATE: float = 1
+    THROTTLE_BURST: int = 5
+    THROTTLE_MODE: Literal["drop", "delay"] = "delay"
+    THROTTLE_MAX_DELAY: float = 3
+
+    # application forms untouched for this long are deleted
+    FSM_STATE_TTL: float = 24 * 3600
+
+    LINK_VALIDATION_WORKERS: int = 4
+    LINK_VERDICT_CACHE_SIZE: int = 10_000
+    LINK_VERDICT_TTL: float = 3600
+
+    # callback payloads too long for Telegram are kept in memory this long;
+    # their buttons stop working afterwards and on restart
+    CALLBACK_STORE_SIZE: int = 100_000
+    CALLBACK_STORE_TTL: float = 7 * 24 * 3600
+
+    # write, rotate and compress logs on loguru's background thread; off by
+    # default: loguru pickles every message on the caller's thread to queue
+    # it, which costs the event loop more than the writes it moves away
+    LOG_BACKGROUND: bool = False
+
+    # metrics in the Prometheus text format, off by default: served on
+    # METRICS_HOST:METRICS_PORT/metrics and/or written to METRICS_FILE
+    METRICS_ENABLED: bool = False
+    METRICS_HOST: str = "127.0.0.1"
+    METRICS_PORT: Optional[int] = None
+    METRICS_FILE: Optional[str] = None
+    METRICS_DUMP_INTERVAL: float = 60
 
     @model_validator(mode="before")
     def parse_empty_string_to_none(cls, values):
@@ -25,17 +101,51 @@ class Settings(BaseSettings):
                 values[key] = None
         return values
 
+    @model_validator(mode="after")
+    def require_webhook_secret(self):
+        if self.WEBHOOK_URL and not self.WEBHOOK_SECRET:
+            raise ValueError("WEBHOOK_SECRET must be set when WEBHOOK_URL is")
+        return self
+
 
 settings = Settings()  # type: ignore
 
+# `aerich` runs from the repository root, the bot from `src`
+_package = f"{'' if os.getcwd().endswith('src') else 'src.'}brvideo"
+
+
+def connection_config(url: str, db: DatabaseSettings) -> Union[str, Dict[str, Any]]:
+    """Postgres urls get the instrumented client and pool settings; anything
+    else (sqlite in tests and local runs) is passed through as is."""
+    config = expand_db_url(url)
+    if config["engine"] != "tortoise.backends.asyncpg":
+        return url
+    config["engine"] = f"{_package}.core.db"
+    pool = {
+        "minsize": db.POOL_MIN,
+        "maxsize": db.POOL_MAX,
+        "statement_cache_size": db.STATEMENT_CACHE_SIZE,
+        "command_timeout": db.COMMAND_TIMEOUT,
+        "acquire_timeout": db.ACQUIRE_TIMEOUT,
+        "max_inactive_connection_lifetime": db.MAX_INACTIVE_LIFETIME,
+    }
+    # parameters given in the url's query string win
+    config["credentials"] = {**pool, **config["credentials"]}
+    return config
+
+
 database_config = {
-    "connections": {"default": settings.DATABASE_URL},
+    "connections": {
+        "default": connection_config(settings.DATABASE_URL, settings.DATABASE),
+        **(
+            {"replica": connection_config(settings.DATABASE.REPLICA_URL, settings.DATABASE)}
+            if settings.DATABASE.REPLICA_URL
+            else {}
+        ),
+    },
     "apps": {
         "models": {
-            "models": [
-                f"{'' if os.getcwd().endswith('src') else 'src.'}brvideo.core.models",
-                "aerich.models",
-            ],
+            "models": [f"{_package}.core.models", "aerich.models"],
             "default_connection": "default",
         },
     },
@@ -0,0 +1,132 @@
+"""Tortoise engine: the asyncpg client with pool instrumentation.
+
+Selected by `config.database_config` for postgres urls, as
+``"engine": "brvideo.core.db"``.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+import asyncpg
+from tortoise import connections
+from tortoise.backends.asyncpg.client import AsyncpgDBClient
+from tortoise.backends.base.client import BaseDBAsyncClient
+
+from brvideo.core.config import settings
+from brvideo.core.metrics import registry
+
+REPLICA = "replica"  # connection name of the optional read replica
+
+
+class PoolMetrics:
+    def __init__(self, connection: str):
+        labels = {"connection": connection}
+        self.acquire_wait = registry.histogram(
+            "db_pool_acquire_wait_seconds", "Time waited for a free connection", labels
+        )
+        self.query_latency = registry.histogram(
+            "db_query_seconds", "Query time, including the acquire wait", labels
+        )
+        self.in_use = 0
+        self.max_in_use = 0
+        self.acquire_timeouts = 0
+        registry.gauge(
+            "db_pool_in_use", "Connections taken from the pool", labels, lambda: self.in_use
+        )
+        registry.gauge(
+            "db_pool_max_in_use", "Most connections taken at once", labels,
+            lambda: self.max_in_use,
+        )
+        registry.counter(
+            "db_pool_acquire_timeouts_total", "Acquires that timed out", labels,
+            lambda: self.acquire_timeouts,
+        )
+
+
+# connection name -> metrics, filled as pools are created
+pool_metrics: Dict[str, PoolMetrics] = {}
+
+
+class InstrumentedPool:
+    """Wraps an `asyncpg.Pool`, timing acquires and counting busy connections.
+
+    Tortoise only ever awaits `acquire()` and calls `release()`; everything
+    else is passed through to the pool.
+    """
+
+    def __init__(
+        self, pool: asyncpg.Pool, metrics: PoolMetrics, acquire_timeout: Optional[float] = None
+    ):
+        self._pool = pool
+        self.metrics = metrics
+        self.acquire_timeout = acquire_timeout
+
+    async def acquire(self, *, timeout: Optional[float] = None):
+        started = time.perf_counter()
+        try:
+            connection = await self._pool.acquire(timeout=timeout or self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.metrics.acquire_timeouts += 1
+            raise
+        self.metrics.acquire_wait.observe(time.perf_counter() - started)
+        self.metrics.in_use += 1
+        self.metrics.max_in_use = max(self.metrics.max_in_use, self.metrics.in_use)
+        return connection
+
+    async def release(self, connection, *, timeout: Optional[float] = None):
+        self.metrics.in_use -= 1
+        await self._pool.release(connection, timeout=timeout)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._pool, name)
+
+
+class InstrumentedAsyncpgClient(AsyncpgDBClient):
+    """Accepts `acquire_timeout` (seconds) next to the usual credentials;
+    the rest, e.g. `statement_cache_size`, goes to `asyncpg.create_pool`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        timeout = self.extra.pop("acquire_timeout", None)
+        self.acquire_timeout = float(timeout) if timeout is not None else None
+        name = self.connection_name
+        self.metrics = pool_metrics.setdefault(name, PoolMetrics(name))
+
+    async def create_pool(self, **kwargs) -> asyncpg.Pool:
+        pool = await super().create_pool(**kwargs)
+        instrumented = InstrumentedPool(pool, self.metrics, self.acquire_timeout)
+        return instrumented  # type: ignore[return-value]
+
+    async def _timed(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return await method(*args)
+        finally:
+            self.metrics.query_latency.observe(time.perf_counter() - started)
+
+    async def execute_insert(self, query: str, values: list):
+        return await self._timed(super().execute_insert, query, values)
+
+    async def execute_many(self, query: str, values: list) -> None:
+        return await self._timed(super().execute_many, query, values)
+
+    async def execute_query(self, query: str, values: Optional[list] = None):
+        return await self._timed(super().execute_query, query, values)
+
+    async def execute_query_dict(self, query: str, values: Optional[list] = None):
+        return await self._timed(super().execute_query_dict, query, values)
+
+    async def execute_script(self, query: str) -> None:
+        return await self._timed(super().execute_script, query)
+
+
+client_class = InstrumentedAsyncpgClient
+
+
+def read_connection() -> Optional[BaseDBAsyncClient]:
+    """The replica when one is configured, else None (the default connection),
+    for `.using_db()` on reads that tolerate replication lag."""
+    if settings.DATABASE.REPLICA_URL is None:
+        return None
+    return connections.get(REPLICA)
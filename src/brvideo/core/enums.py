@@ -2,4 +2,13 @@ from enum import Enum
 
 
 class Socials(str, Enum):
-    ...
+    YOUTUBE = "youtube"
+    TIKTOK = "tiktok"
+    VK = "vk"
+    TWITCH = "twitch"
+
+
+class ApplicationStatus(str, Enum):
+    PENDING = "pending"  # Applications.accepted is NULL
+    ACCEPTED = "accepted"
+    REJECTED = "rejected"
@@ -0,0 +1,120 @@
+import asyncio
+import contextvars
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from loguru import logger
+
+
+@dataclass
+class StepTiming:
+    started: float  # seconds since the graph started
+    duration: float
+    failed: bool = False
+
+
+@dataclass
+class _Step:
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    after: Sequence[str]
+
+
+class StepGraph:
+    """Runs named async steps as soon as the steps they depend on are done.
+
+    Independent steps run concurrently, all in one copy of the caller's
+    context, whose variables are applied to the caller afterwards. By default
+    the first failure cancels everything still pending and is re-raised; with
+    `keep_going` (used on shutdown) failures are logged and dependents run
+    anyway.
+    """
+
+    def __init__(self, name: str, keep_going: bool = False):
+        self.name = name
+        self.keep_going = keep_going
+        self.timings: Dict[str, StepTiming] = {}
+        self._steps: Dict[str, _Step] = {}
+
+    def add(
+        self, name: str, run: Callable[[], Awaitable[Any]], after: Sequence[str] = ()
+    ) -> "StepGraph":
+        if name in self._steps:
+            raise ValueError(f"Step {name!r} is already added")
+        self._steps[name] = _Step(name, run, tuple(after))
+        return self
+
+    def _check(self):
+        visiting: List[str] = []
+        done = set()
+
+        def visit(name: str):
+            if name in done:
+                return
+            if name in visiting:
+                cycle = " -> ".join([*visiting, name])
+                raise ValueError(f"Steps depend on each other: {cycle}")
+            if name not in self._steps:
+                raise ValueError(f"Unknown step {name!r} required by {visiting[-1]!r}")
+            visiting.append(name)
+            for dependency in self._steps[name].after:
+                visit(dependency)
+            visiting.pop()
+            done.add(name)
+
+        for name in self._steps:
+            visit(name)
+
+    async def run(self) -> Dict[str, StepTiming]:
+        self._check()
+        origin = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_step(step: _Step):
+            for dependency in step.after:
+                await tasks[dependency]  # with keep_going steps never raise
+            started = time.perf_counter()
+            failed = False
+            try:
+                return await step.run()
+            except Exception:
+                failed = True
+                if not self.keep_going:
+                    raise
+                logger.exception(f"{self.name}: {step.name} failed")
+            finally:
+                self.timings[step.name] = StepTiming(
+                    started - origin, time.perf_counter() - started, failed
+                )
+
+        # steps share one context, so what a step keeps in context variables
+        # (Tortoise keeps its connections in one) is seen by the steps after it
+        # and handed back to the caller
+        context = contextvars.copy_context()
+        for step in self._steps.values():
+            tasks[step.name] = asyncio.create_task(
+                run_step(step), name=step.name, context=context
+            )
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        finally:
+            self.report(time.perf_counter() - origin)
+        for var, value in context.items():
+            var.set(value)
+        return self.timings
+
+    def report(self, total: Optional[float] = None):
+        steps = sorted(self.timings.items(), key=lambda item: item[1].started)
+        phases = ", ".join(
+            f"{name} {timing.duration * 1e3:.0f}ms (+{timing.started * 1e3:.0f})"
+            + (" failed" if timing.failed else "")
+            for name, timing in steps
+        )
+        total_ms = f" in {total * 1e3:.0f}ms" if total is not None else ""
+        logger.info(f"{self.name}{total_ms}: {phases}")
@@ -0,0 +1,200 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import loguru
+
+from brvideo.core.enums import Socials
+
+_HOSTS: Dict[str, Socials] = {
+    "youtube.com": Socials.YOUTUBE,
+    "youtu.be": Socials.YOUTUBE,
+    "tiktok.com": Socials.TIKTOK,
+    "vm.tiktok.com": Socials.TIKTOK,
+    "vk.com": Socials.VK,
+    "vk.ru": Socials.VK,
+    "vkvideo.ru": Socials.VK,
+    "twitch.tv": Socials.TWITCH,
+}
+# query parameters that identify the content, everything else is tracking noise
+_KEPT_PARAMS = {"v", "list", "z", "w"}
+_STRIPPED_SUBDOMAINS = ("www.", "m.", "mobile.")
+
+
+def normalize_link(link: str) -> str:
+    """Canonical form used as cache and duplicate key: https, lowercase host
+    without www/m, no fragment, no tracking parameters, no trailing slash.
+
+    Text that does not parse as a url (e.g. `http://[abc`) is returned
+    stripped; `detect_social` finds no platform in it.
+    """
+    link = link.strip()
+    url = link if "://" in link else "https://" + link
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return link
+    host = (parts.hostname or "").lower()
+    for prefix in _STRIPPED_SUBDOMAINS:
+        if host.startswith(prefix):
+            host = host[len(prefix) :]
+            break
+    query = urlencode(
+        sorted((k, v) for k, v in parse_qsl(parts.query) if k in _KEPT_PARAMS)
+    )
+    return urlunsplit(("https", host, parts.path.rstrip("/"), query, ""))
+
+
+def detect_social(normalized: str) -> Optional[Socials]:
+    try:
+        host = urlsplit(normalized).hostname
+    except ValueError:
+        return None
+    return _HOSTS.get(host or "")
+
+
+@dataclass(frozen=True)
+class LinkVerdict:
+    normalized: str
+    social: Optional[Socials]
+    valid: bool
+    reason: Optional[str] = None
+
+
+class BaseLinkResolver(ABC):
+    """Decides whether a normalized link is acceptable."""
+
+    @abstractmethod
+    async def resolve(self, normalized: str) -> LinkVerdict:
+        pass
+
+
+class OfflineLinkResolver(BaseLinkResolver):
+    """Accepts links to a known platform with a non-empty path, no network."""
+
+    async def resolve(self, normalized: str) -> LinkVerdict:
+        social = detect_social(normalized)
+        if social is None:
+            return LinkVerdict(normalized, None, False, "unsupported platform")
+        if not urlsplit(normalized).path.strip("/"):
+            return LinkVerdict(normalized, social, False, "link points to the site root")
+        return LinkVerdict(normalized, social, True)
+
+
+class VerdictCache:
+    """LRU of normalized link -> verdict, entries expire after `ttl` seconds."""
+
+    def __init__(self, max_entries: int = 10_000, ttl: float = 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, Tuple[float, LinkVerdict]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, normalized: str) -> Optional[LinkVerdict]:
+        item = self._entries.get(normalized)
+        if item is None:
+            return None
+        stored_at, verdict = item
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[normalized]
+            return None
+        self._entries.move_to_end(normalized)
+        return verdict
+
+    def put(self, verdict: LinkVerdict):
+        self._entries[verdict.normalized] = (time.monotonic(), verdict)
+        self._entries.move_to_end(verdict.normalized)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class LinkValidator:
+    """Validates links on a fixed pool of workers.
+
+    `validate` answers from the verdict cache when it can, otherwise queues
+    the link (waiting while the queue is full) and resolves when a worker is
+    done. Concurrent requests for the same link share one resolution.
+    """
+
+    def __init__(
+        self,
+        resolver: Optional[BaseLinkResolver] = None,
+        workers: int = 4,
+        queue_size: int = 1000,
+        cache: Optional[VerdictCache] = None,
+    ):
+        self.resolver = resolver or OfflineLinkResolver()
+        self.cache = cache or VerdictCache()
+        self._workers_count = workers
+        self._queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._workers: List[asyncio.Task] = []
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def _start_workers(self):
+        while len(self._workers) < self._workers_count:
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    async def validate(self, link: str) -> LinkVerdict:
+        normalized = normalize_link(link)
+        verdict = self.cache.get(normalized)
+        if verdict is not None:
+            return verdict
+        future = self._inflight.get(normalized)
+        if future is None:
+            self._start_workers()
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[normalized] = future
+            try:
+                await self._queue.put(normalized)
+            except BaseException:
+                # cancelled while the queue was full: nothing will resolve it
+                del self._inflight[normalized]
+                future.cancel()
+                raise
+        return await asyncio.shield(future)
+
+    def spawn(self, coro) -> asyncio.Task:
+        """Run a coroutine awaiting verdicts in the background, tracked for `close`."""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _worker(self):
+        while True:
+            normalized = await self._queue.get()
+            future = self._inflight[normalized]
+            try:
+                verdict = await self.resolver.resolve(normalized)
+            except Exception as e:
+                loguru.logger.exception(f"Link resolver failed for {normalized}")
+                if not future.done():
+                    future.set_exception(e)
+                    # logged above; waiters that gave up would never retrieve it
+                    future.exception()
+            else:
+                self.cache.put(verdict)
+                if not future.done():
+                    future.set_result(verdict)
+            finally:
+                del self._inflight[normalized]
+                self._queue.task_done()
+
+    async def close(self):
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
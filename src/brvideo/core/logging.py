@@ -1,43 +1,101 @@
 import logging
 import sys
+import threading
+from typing import Optional, TextIO
 
-from aiogram.dispatcher.event.bases import CancelHandler
 from loguru import logger
 
+# loguru's names for the stdlib levels, looked up once instead of per record
+LEVELS = {
+    logging.CRITICAL: "CRITICAL",
+    logging.ERROR: "ERROR",
+    logging.WARNING: "WARNING",
+    logging.INFO: "INFO",
+    logging.DEBUG: "DEBUG",
+}
+
+# the stdlib record being forwarded by `InterceptHandler` on this thread
+_forwarded = threading.local()
+
+
+def _from_stdlib(record):
+    source: Optional[logging.LogRecord] = getattr(_forwarded, "record", None)
+    if source is not None:
+        record["name"] = source.name
+        record["module"] = source.module
+        record["function"] = source.funcName
+        record["line"] = source.lineno
+
 
 class InterceptHandler(logging.Handler):
+    """Forwards stdlib records to loguru.
+
+    The caller's name, function and line are copied from the stdlib record by
+    a patcher instead of walking up the stack to find its frame.
+    """
+
+    def __init__(self, level: int = logging.NOTSET):
+        super().__init__(level)
+        self._logger = logger.patch(_from_stdlib)
+
     def emit(self, record):
+        level = LEVELS.get(record.levelno, record.levelno)
+        log = self._logger if not record.exc_info else self._logger.opt(exception=record.exc_info)
+        _forwarded.record = record
         try:
-            level = logger.level(record.levelname).name
-        except ValueError:
-            level = record.levelno
-
-        logger.opt(depth=6, exception=record.exc_info).log(level, record.getMessage())
+            log.log(level, record.getMessage())
+        finally:
+            _forwarded.record = None
 
 
 class SuppressCancelHandler(logging.Filter):
     def filter(self, record: logging.LogRecord) -> bool:
         if record.exc_info:
+            # aiogram is loaded by whoever logs to `aiogram.event`; importing
+            # it here at module level would make logging setup pull it in
+            from aiogram.dispatcher.event.bases import CancelHandler
+
             exc_type, *_ = record.exc_info
             if exc_type is CancelHandler:
                 return False
         return True
 
 
-def setup_logger(logfile: str | None = "../logs/bot.log", level: str = "DEBUG"):
-    logger.remove()
+def setup_logger(
+    logfile: str | None = "../logs/bot.log",
+    level: str = "DEBUG",
+    background: bool = False,
+    stream: Optional[TextIO] = None,
+):
+    """Log to `stream` (stdout) at `level` and to `logfile` from INFO.
 
-    logger.add(
-        sys.stdout,
-        level=level.upper(),
-    )
+    With `background` sinks only enqueue messages and loguru writes them,
+    rotates and compresses the file on a thread of its own. Enqueuing pickles
+    each message on the caller's thread, which in bursts stalls the event loop
+    more than writing in place does; see benchmarks/bench_logging.py.
+    """
+    logger.remove()
+    level = level.upper()
+    logger.add(stream or sys.stdout, level=level, enqueue=background)
 
+    file_level = "INFO"
     if logfile:
-        logger.add(logfile, rotation="1 day", compression="gz", level="INFO")
+        logger.add(
+            logfile,
+            rotation="1 day",
+            compression="gz",
+            level=file_level,
+            enqueue=background,
+        )
 
-    logging.basicConfig(handlers=[InterceptHandler()], level=0, force=True)
-    logging.getLogger().handlers = [InterceptHandler()]
-    logging.getLogger().setLevel(logging.DEBUG)
+    # stdlib loggers below every sink's level return before building a record
+    min_level = min(
+        logger.level(name).no for name in ([level, file_level] if logfile else [level])
+    )
+    intercept = InterceptHandler(min_level)
+    logging.basicConfig(handlers=[intercept], level=min_level, force=True)
+    logging.getLogger().handlers = [intercept]
+    logging.getLogger().setLevel(min_level)
 
     logging.getLogger("aiogram.event").addFilter(SuppressCancelHandler())
 
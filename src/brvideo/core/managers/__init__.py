@@ -1,16 +1,59 @@
+import asyncio
+from datetime import timedelta
+from typing import Optional
+
+import loguru
+
+from brvideo.core.config import settings
+from brvideo.core.links import LinkValidator, VerdictCache
 from brvideo.core.managers.admins import AdminManager
+from brvideo.core.managers.applications import ApplicationManager
+from brvideo.core.managers.fsm import FSMManager
+from brvideo.core.managers.base import BaseInvalidationBus, BaseManager
 
 to_init = [
     admins := AdminManager(),
+    applications := ApplicationManager(),
+    fsm := FSMManager(),
 ]
 
 
-async def initialize():
-    for manager in to_init:
-        await manager.initialize()
+def configure():
+    """Apply settings to the managers; call before initializing them."""
+    fsm.cache.state_ttl = timedelta(seconds=settings.FSM_STATE_TTL)
+    applications.cache.validator = LinkValidator(
+        workers=settings.LINK_VALIDATION_WORKERS,
+        cache=VerdictCache(
+            max_entries=settings.LINK_VERDICT_CACHE_SIZE, ttl=settings.LINK_VERDICT_TTL
+        ),
+    )
+
+
+async def initialize_manager(manager: BaseManager, bus: Optional[BaseInvalidationBus] = None):
+    if bus is not None:  # subscribe first so nothing published during warm-up is missed
+        await manager.attach_bus(bus)
+    await manager.initialize()
+
+
+async def initialize(bus: Optional[BaseInvalidationBus] = None):
+    """Warm every manager's cache; managers do not depend on each other, so
+    they load concurrently."""
+    configure()
+    await asyncio.gather(*(initialize_manager(manager, bus) for manager in to_init))
+
+
+async def close_manager(manager: BaseManager):
+    await manager.sync()
+    await manager.close()
 
 
 async def close():
-    for manager in to_init:
-        await manager.sync()
-        await manager.close()
+    """Flush every manager; must run before the db connections are closed."""
+    results = await asyncio.gather(
+        *(close_manager(manager) for manager in to_init), return_exceptions=True
+    )
+    for manager, result in zip(to_init, results):
+        if isinstance(result, Exception):
+            loguru.logger.opt(exception=result).error(
+                f"Failed to close {type(manager).__name__}"
+            )
@@ -1,8 +1,7 @@
-import copy
-from typing import Dict, List, Optional
-
-import loguru
+from datetime import datetime
+from typing import ClassVar, Dict, List, Optional
 
+from brvideo.core.db import read_connection
 from brvideo.core.managers.base import (
     BaseCachedModel,
     BaseCacheManager,
@@ -27,85 +26,47 @@ class AdminRepository(BaseRepository):
     async def all() -> List[Admins]:
         return await Admins.all()
 
+    @staticmethod
+    async def get_many(ids: List[int]) -> List[Admins]:
+        return await Admins.filter(id__in=ids)
 
-class AdminCacheManager(BaseCacheManager):
-    repo: AdminRepository
-    _cache: Dict[int, _CachedAdmin]
+    @staticmethod
+    async def changed_since(cursor: Optional[datetime]) -> List[Admins]:
+        # may read a lagging replica: rows it has not caught up with yet are
+        # still newer than the cursor and arrive with a later reload
+        query = Admins.all() if cursor is None else Admins.filter(updated_at__gte=cursor)
+        return await query.using_db(read_connection())
 
-    async def sync(self, batch_size: int = 1000):
-        async with self._lock:
-            if not self._dirty:
-                return
-            dirty_snapshot = set(self._dirty)
-            payloads = {
-                tg: copy.deepcopy(self._cache[tg])
-                for tg in dirty_snapshot
-                if tg in self._cache
-            }
-
-        if not payloads:
-            return
 
-        items = list(payloads.items())
-        try:
-            for i in range(0, len(items), batch_size):
-                batch = items[i : i + batch_size]
-                ids = [id for id, _ in batch]
-
-                existing_rows = await Admins.filter(id__in=ids)
-                existing_map = {row.id: row for row in existing_rows}
-
-                to_update = []
-                to_create = []
-                for tg, cached in batch:
-                    if tg in existing_map:
-                        row = existing_map[tg]
-                        dirty = False
-                        for field in _CachedAdmin.model_fields.keys():
-                            val = getattr(cached, field)
-                            row_val = getattr(
-                                row, field, getattr(row, f"{field}", None)
-                            )
-                            if row_val != val:
-                                setattr(row, field, val)
-                                dirty = True
-                        if dirty:
-                            to_update.append(row)
-                    else:
-                        to_create.append(_CachedAdmin.from_model(cached))
-
-                if to_update:
-                    await Admins.bulk_update(
-                        to_update,
-                        fields=_CachedAdmin.model_fields.keys(),
-                        batch_size=batch_size,
-                    )
-                if to_create:
-                    await Admins.bulk_create(to_create, batch_size=batch_size)
-
-        except Exception:
-            loguru.logger.exception("User sync failed")
-            return
+class AdminCacheManager(BaseCacheManager[int]):
+    unique_indexes = ("tg_id",)
+    db_model = Admins
+    cached_model = _CachedAdmin
+    cursor_field = "updated_at"
+    # every n-th reload reads the whole table, dropping admins deleted elsewhere
+    full_reload_every: ClassVar[int] = 10
 
-        async with self._lock:
-            for tg, old_val in payloads.items():
-                cur = self._cache.get(tg)
-                if cur is None:
-                    self._dirty.discard(tg)
-                    continue
-                if cur.__dict__ == old_val.__dict__:
-                    self._dirty.discard(tg)
+    repo: AdminRepository
+    _cache: Dict[int, _CachedAdmin]
+    _reloads = 0
 
     async def load_initial_data(self):
         if not self.repo:
             return
         rows = await self.repo.all()
         async with self._lock:
-            for row in rows:
-                try:
-                    self._cache[row.id] = _CachedAdmin.from_model(row)
-                except TypeError:
-                    loguru.logger.exception("Error loading Admins into cache")
+            self._merge_rows(rows)
+
+    async def reload_from_db(self):
+        self._reloads += 1
+        if self._reloads % self.full_reload_every == 0:
+            await self.reload_all()
+        else:
+            await self.reload_changed()
+
+    async def resync(self):
+        # deletions are missed by incremental reloads
+        await self.reload_all()
 
     async def add_admin(self, tg_id: int, nickname: str) -> _CachedAdmin:
         row, _ = await self.repo.ensure_admin(tg_id=tg_id, nickname=nickname)
@@ -114,36 +75,27 @@ class AdminCacheManager(BaseCacheManager):
             if row.id in self._cache:
                 return self._cache[row.id]
             self._cache[admin.id] = admin
-            self._dirty.add(admin.id)
+            self._mark_dirty(admin.id)
         return admin
 
     async def del_admin(self, tg_id: int) -> Optional[_CachedAdmin]:
         async with self._lock:
-            admin = next(
-                (admin for admin in self._cache.values() if admin.tg_id == tg_id),
-                None,
-            )
+            admin = self.get_by("tg_id", tg_id)
             if admin:
                 self._cache.pop(admin.id)
-                self._dirty.add(admin.id)
+                self._mark_dirty(admin.id)
         return admin
 
     async def edit_admin(self, tg_id: int, **fields) -> Optional[_CachedAdmin]:
         row, _ = await self.repo.ensure_admin(tg_id=tg_id, defaults=fields)
-        admin = _CachedAdmin.from_model(row)
+        admin = _CachedAdmin.from_model(row).model_copy(update=fields)
         async with self._lock:
-            for field, val in fields.items():
-                setattr(admin, field, val)
             self._cache[admin.id] = admin
-            self._dirty.add(admin.id)
+            self._mark_dirty(admin.id)
         return admin
 
     async def is_admin(self, tg_id: int) -> bool:
-        async with self._lock:
-            return next(
-                (True for admin in self._cache.values() if admin.tg_id == tg_id),
-                False,
-            )
+        return self.get_by("tg_id", tg_id) is not None
 
 
 class AdminManager(BaseManager):
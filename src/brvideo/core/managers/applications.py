@@ -0,0 +1,494 @@
+import asyncio
+import uuid
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+
+import loguru
+from tortoise.expressions import Q
+
+from brvideo.core.db import read_connection
+from brvideo.core.enums import ApplicationStatus, Socials
+from brvideo.core.links import LinkValidator, normalize_link
+from brvideo.core.managers.base import (
+    BaseCachedModel,
+    BaseCacheManager,
+    BaseManager,
+    BaseRepository,
+)
+from brvideo.core.models import Applications
+
+
+class _CachedApplication(BaseCachedModel):
+    id: int
+    uid: uuid.UUID
+    tg_id: Optional[int]
+    nickname: str
+    server: int
+    social: Socials
+    date: datetime
+    link_acc: str
+    link_video: Optional[str]
+    accepted: Optional[bool]
+    reason: Optional[str]
+
+
+# keyset pagination position: listings are ordered by (date, id)
+PageCursor = Tuple[datetime, int]
+
+_STATUS_FILTERS: Dict[ApplicationStatus, Dict[str, Any]] = {
+    ApplicationStatus.PENDING: {"accepted__isnull": True},
+    ApplicationStatus.ACCEPTED: {"accepted": True},
+    ApplicationStatus.REJECTED: {"accepted": False},
+}
+
+
+class PendingIndex:
+    """In-memory review queue: pending applications sorted by (date, id),
+    with one sorted bucket per server and per social."""
+
+    def __init__(self):
+        self._entries: Dict[int, _CachedApplication] = {}
+        self._buckets: Dict[Tuple[str, Any], List[PageCursor]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, app_id: int) -> bool:
+        return app_id in self._entries
+
+    @staticmethod
+    def _bucket_keys(entry: _CachedApplication) -> Tuple[Tuple[str, Any], ...]:
+        return (("all", None), ("server", entry.server), ("social", entry.social))
+
+    def add(self, entry: _CachedApplication):
+        self.discard(entry.id)
+        self._entries[entry.id] = entry
+        for key in self._bucket_keys(entry):
+            insort(self._buckets.setdefault(key, []), (entry.date, entry.id))
+
+    def discard(self, app_id: int):
+        entry = self._entries.pop(app_id, None)
+        if entry is None:
+            return
+        position = (entry.date, entry.id)
+        for key in self._bucket_keys(entry):
+            bucket = self._buckets[key]
+            del bucket[bisect_left(bucket, position)]
+            if not bucket:
+                del self._buckets[key]
+
+    def page(
+        self,
+        server: Optional[int] = None,
+        social: Optional[Socials] = None,
+        after: Optional[PageCursor] = None,
+        limit: int = 50,
+    ) -> List[_CachedApplication]:
+        candidates = [("all", None)]
+        if server is not None:
+            candidates.append(("server", server))
+        if social is not None:
+            candidates.append(("social", social))
+        # walk the smallest matching bucket, check the other filter per entry
+        bucket = min(
+            (self._buckets.get(key, []) for key in candidates[1:] or candidates), key=len
+        )
+
+        result = []
+        start = bisect_right(bucket, after) if after is not None else 0
+        for i in range(start, len(bucket)):
+            entry = self._entries[bucket[i][1]]
+            if (server is None or entry.server == server) and (
+                social is None or entry.social == social
+            ):
+                result.append(entry)
+                if len(result) == limit:
+                    break
+        return result
+
+
+class DuplicateIndex:
+    """Pending and accepted applications by normalized account link together
+    with nickname + server, and by normalized video link, for O(1)
+    resubmission checks. Rejected applications are dropped, so a rejected
+    player can apply again.
+
+    Only 64-bit hashes of the keys are stored, which keeps a million
+    applications at a few hundred bytes each.
+    """
+
+    def __init__(self):
+        self._accounts: Dict[int, uuid.UUID] = {}
+        self._videos: Dict[int, uuid.UUID] = {}
+
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+    @staticmethod
+    def _account_key(link_acc: str, nickname: str, server: int) -> int:
+        return hash((normalize_link(link_acc), nickname.casefold(), server))
+
+    @staticmethod
+    def _video_key(link_video: Optional[str]) -> Optional[int]:
+        return hash(normalize_link(link_video)) if link_video else None
+
+    def add(
+        self,
+        uid: uuid.UUID,
+        link_acc: str,
+        nickname: str,
+        server: int,
+        link_video: Optional[str] = None,
+    ):
+        self._accounts.setdefault(self._account_key(link_acc, nickname, server), uid)
+        video = self._video_key(link_video)
+        if video is not None:
+            self._videos.setdefault(video, uid)
+
+    def discard(
+        self,
+        uid: uuid.UUID,
+        link_acc: str,
+        nickname: str,
+        server: int,
+        link_video: Optional[str] = None,
+    ):
+        """Forget `uid`'s keys; keys held by another application are kept."""
+        account = self._account_key(link_acc, nickname, server)
+        if self._accounts.get(account) == uid:
+            del self._accounts[account]
+        video = self._video_key(link_video)
+        if video is not None and self._videos.get(video) == uid:
+            del self._videos[video]
+
+    def find(
+        self,
+        link_acc: str,
+        nickname: str,
+        server: int,
+        link_video: Optional[str] = None,
+    ) -> Optional[uuid.UUID]:
+        """uid of an earlier application for the same account and player,
+        or with the same video."""
+        found = self._accounts.get(self._account_key(link_acc, nickname, server))
+        video = self._video_key(link_video)
+        if found is None and video is not None:
+            found = self._videos.get(video)
+        return found
+
+
+class ApplicationRepository(BaseRepository):
+    @staticmethod
+    async def create_many(drafts: List[Dict[str, Any]]) -> List[Applications]:
+        """Insert `drafts` with one bulk insert and read the rows back by uid."""
+        await Applications.bulk_create(
+            [Applications(**draft) for draft in drafts], batch_size=len(drafts)
+        )
+        return await Applications.filter(uid__in=[draft["uid"] for draft in drafts])
+
+    @staticmethod
+    async def get_many(ids: List[int]) -> List[Applications]:
+        return await Applications.filter(id__in=ids)
+
+    @staticmethod
+    async def get_by_uid(uid: uuid.UUID) -> Optional[Applications]:
+        return await Applications.get_or_none(uid=uid)
+
+    @staticmethod
+    async def pending() -> List[Applications]:
+        return await Applications.filter(accepted__isnull=True)
+
+    @staticmethod
+    async def list_page(
+        status: ApplicationStatus,
+        server: Optional[int] = None,
+        social: Optional[Socials] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        after: Optional[PageCursor] = None,
+        limit: int = 50,
+    ) -> List[Applications]:
+        """One keyset page ordered by (date, id), served by the composite
+        (accepted, [server|social,] date, id) indexes."""
+        query = Applications.filter(**_STATUS_FILTERS[status])
+        if server is not None:
+            query = query.filter(server=server)
+        if social is not None:
+            query = query.filter(social=social)
+        if since is not None:
+            query = query.filter(date__gte=since)
+        if until is not None:
+            query = query.filter(date__lt=until)
+        if after is not None:
+            date, app_id = after
+            # the bare `date >=` bound lets the index seek instead of scanning the OR
+            query = query.filter(
+                Q(date__gte=date), Q(date__gt=date) | Q(id__gt=app_id)
+            )
+        return await query.order_by("date", "id").limit(limit)
+
+    @staticmethod
+    async def duplicate_keys() -> List[Tuple[uuid.UUID, str, str, int, Optional[str]]]:
+        """Keys of the applications that still block a resubmission."""
+        query = Applications.filter(Q(accepted__isnull=True) | Q(accepted=True))
+        return await query.values_list("uid", "link_acc", "nickname", "server", "link_video")
+
+    @staticmethod
+    async def latest_cursor() -> Optional[datetime]:
+        row = await Applications.all().order_by("-updated_at").first()
+        return row.updated_at if row else None
+
+    @staticmethod
+    async def changed_since(cursor: Optional[datetime]) -> List[Applications]:
+        # may read a lagging replica: rows it has not caught up with yet are
+        # still newer than the cursor and arrive with a later reload
+        query = Applications.all()
+        if cursor is not None:
+            query = query.filter(updated_at__gte=cursor)
+        return await query.using_db(read_connection())
+
+
+class ApplicationCacheManager(BaseCacheManager[int]):
+    unique_indexes = ("uid",)
+    db_model = Applications
+    cached_model = _CachedApplication
+    cursor_field = "updated_at"
+    max_entries = 10_000
+
+    # new applications are written in one bulk insert once this many are buffered
+    flush_threshold = 100
+
+    repo: ApplicationRepository
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._new: List[Dict[str, Any]] = []
+        self._flush_lock = asyncio.Lock()
+        # uids being inserted by `flush_new`, and rejections that arrived for
+        # them meanwhile; applied once the rows are merged
+        self._flushing: Set[uuid.UUID] = set()
+        self._late_rejections: Dict[uuid.UUID, str] = {}
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self.pending = PendingIndex()
+        self.duplicates = DuplicateIndex()
+        self._created_listeners: List[Callable[[List[_CachedApplication]], Any]] = []
+        # when set, submitted links are checked in the background and
+        # applications with a bad link are rejected automatically
+        self.validator: Optional[LinkValidator] = None
+
+    async def load_initial_data(self):
+        # the table is unbounded: start the reload cursor at the newest row,
+        # warm only the review queue and let `fetch` load the rest on demand
+        self._cursor = await self.repo.latest_cursor()
+        for row in await self.repo.duplicate_keys():
+            self.duplicates.add(*row)
+        rows = await self.repo.pending()
+        async with self._lock:
+            self._merge_rows(rows, advance_cursor=False)
+
+    def _entry_stored(self, entry: _CachedApplication):  # type: ignore[override]
+        # also covers rows written by other processes (reloads, invalidations)
+        self._index_duplicate(entry)
+        if entry.accepted is None:
+            self.pending.add(entry)
+        else:
+            self.pending.discard(entry.id)
+
+    def _entry_dropped(self, key: int):
+        self.pending.discard(key)
+
+    def _index_duplicate(self, application: Union[_CachedApplication, Dict[str, Any]]):
+        """Index a pending or accepted application (or buffered draft), drop
+        a rejected one."""
+        if isinstance(application, dict):
+            draft = application
+            keys = (draft["uid"], draft["link_acc"], draft["nickname"], draft["server"])
+            video, accepted = draft.get("link_video"), draft.get("accepted")
+        else:
+            keys = (
+                application.uid,
+                application.link_acc,
+                application.nickname,
+                application.server,
+            )
+            video, accepted = application.link_video, application.accepted
+        if accepted is False:
+            self.duplicates.discard(*keys, video)
+        else:
+            self.duplicates.add(*keys, video)
+
+    def list_pending(
+        self,
+        server: Optional[int] = None,
+        social: Optional[Socials] = None,
+        after: Optional[PageCursor] = None,
+        limit: int = 50,
+    ) -> List[_CachedApplication]:
+        """Review queue page from memory, no db round-trip."""
+        return self.pending.page(server=server, social=social, after=after, limit=limit)
+
+    async def list_applications(
+        self, status: ApplicationStatus, **filters
+    ) -> List[_CachedApplication]:
+        """Keyset page from the db, see `ApplicationRepository.list_page`."""
+        rows = await self.repo.list_page(status, **filters)
+        return [_CachedApplication.from_model(row) for row in rows]
+
+    async def reload_from_db(self):
+        await self.reload_changed()
+
+    async def submit(self, **fields) -> tuple[uuid.UUID, bool]:
+        """Buffer a new application; it is inserted by the next flush.
+
+        Returns the application uid (its id is assigned by the database) and
+        whether it was created. A resubmission of a pending or accepted
+        application (same account link, nickname and server, or same video
+        link) is not buffered, the earlier uid is returned.
+        """
+        keys = (
+            fields["link_acc"],
+            fields["nickname"],
+            fields["server"],
+            fields.get("link_video"),
+        )
+        existing = self.duplicates.find(*keys)
+        if existing is not None:
+            return existing, False
+
+        draft = {"uid": uuid.uuid4(), **fields}
+        self.duplicates.add(draft["uid"], *keys)
+        self._new.append(draft)
+        if self.validator is not None:
+            self.validator.spawn(self._validate_links(draft))
+        if len(self._new) >= self.flush_threshold and not self._flush_lock.locked():
+            task = asyncio.create_task(self.flush_new())
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+        return draft["uid"], True
+
+    async def _validate_links(self, draft: Dict[str, Any]):
+        links = [draft["link_acc"]]
+        if draft.get("link_video"):
+            links.append(draft["link_video"])
+        validator = self.validator
+        assert validator is not None
+        try:
+            verdicts = await asyncio.gather(*(validator.validate(link) for link in links))
+        except Exception:
+            return  # resolver failures are logged by the validator, leave it to reviewers
+        invalid = next((v for v in verdicts if not v.valid), None)
+        if invalid is None:
+            return
+        reason = f"{invalid.normalized}: {invalid.reason}"
+        if any(pending is draft for pending in self._new):
+            draft.update(accepted=False, reason=reason)
+            self._index_duplicate(draft)
+            return
+        if draft["uid"] in self._flushing:
+            self._late_rejections[draft["uid"]] = reason
+            return
+        application = self.get_by("uid", draft["uid"])
+        if application is None:  # evicted from the bounded cache
+            row = await self.repo.get_by_uid(draft["uid"])
+            application = await self.fetch(row.id) if row is not None else None
+        if application is not None and application.accepted is None:
+            await self.decide(application.id, False, reason)
+
+    def on_created(self, callback: Callable[[List[_CachedApplication]], Any]):
+        """Call `callback` with every batch of applications once they are inserted."""
+        self._created_listeners.append(callback)
+
+    async def flush_new(self):
+        async with self._flush_lock:
+            if not self._new:
+                return
+            drafts, self._new = self._new, []
+            self._flushing = {draft["uid"] for draft in drafts}
+            try:
+                rows = await self.repo.create_many(drafts)
+            except Exception:
+                loguru.logger.exception("Applications flush failed")
+                for draft in drafts:
+                    reason = self._late_rejections.pop(draft["uid"], None)
+                    if reason is not None:
+                        draft.update(accepted=False, reason=reason)
+                        self._index_duplicate(draft)
+                self._flushing = set()
+                self._new[:0] = drafts
+                return
+            async with self._lock:
+                self._merge_rows(rows, advance_cursor=False)
+                for row in rows:
+                    reason = self._late_rejections.pop(row.uid, None)
+                    if reason is not None and row.accepted is None:
+                        self._record_decision(
+                            row.id, False, reason, _CachedApplication.from_model(row)
+                        )
+                self._flushing = set()
+                # ids follow insertion order, the read-back does not
+                created = [
+                    self._cache.get(row.id) or _CachedApplication.from_model(row)
+                    for row in sorted(rows, key=lambda row: row.id)
+                ]
+
+        for callback in self._created_listeners:
+            try:
+                callback(created)
+            except Exception:
+                loguru.logger.exception("Application created listener failed")
+
+    async def decide(
+        self, app_id: int, accepted: bool, reason: Optional[str] = None
+    ) -> Optional[_CachedApplication]:
+        """Record a review decision; decisions are written in batches by `sync`."""
+        application = await self.fetch(app_id)
+        if application is None:
+            return None
+        async with self._lock:
+            return self._record_decision(app_id, accepted, reason, application)
+
+    def _record_decision(
+        self,
+        app_id: int,
+        accepted: bool,
+        reason: Optional[str],
+        application: Optional[_CachedApplication] = None,
+    ) -> _CachedApplication:
+        """Call while holding `self._lock`, with the entry cached or given."""
+        current = self._cache.get(app_id, application)
+        decided = current.model_copy(update={"accepted": accepted, "reason": reason})
+        self._cache[app_id] = decided
+        self._mark_dirty(app_id)
+        self.pending.discard(app_id)
+        self._index_duplicate(decided)
+        return decided
+
+    async def sync(self, batch_size: int = 1000):
+        await self.flush_new()
+        await super().sync(batch_size)
+
+
+class ApplicationManager(BaseManager):
+    repo: ApplicationRepository
+    cache: ApplicationCacheManager
+
+    def __init__(self):
+        super().__init__(
+            repo_cls=ApplicationRepository,
+            cache_cls=ApplicationCacheManager,
+            model=_CachedApplication,
+        )
+
+        self.submit = self.cache.submit
+        self.decide = self.cache.decide
+        self.get = self.cache.fetch
+        self.list_pending = self.cache.list_pending
+        self.list_applications = self.cache.list_applications
+        self.on_created = self.cache.on_created
+
+    async def close(self):
+        # finish pending validations first so their rejections are synced
+        if self.cache.validator is not None:
+            await self.cache.validator.close()
+        await super().close()
@@ -1,11 +1,24 @@
 from brvideo.core.managers.base.cache import BaseCacheManager
 from brvideo.core.managers.base.cached_model import BaseCachedModel
+from brvideo.core.managers.base.indexed_cache import IndexedCache
+from brvideo.core.managers.base.invalidation import (
+    BaseInvalidationBus,
+    MemoryInvalidationBus,
+    PostgresInvalidationBus,
+)
 from brvideo.core.managers.base.manager import BaseManager
 from brvideo.core.managers.base.repository import BaseRepository
+from brvideo.core.managers.base.sync_writer import BaseSyncWriter, UpsertSyncWriter
 
 __ALL__ = [
     BaseCacheManager,
     BaseManager,
     BaseRepository,
     BaseCachedModel,
+    IndexedCache,
+    BaseSyncWriter,
+    UpsertSyncWriter,
+    BaseInvalidationBus,
+    MemoryInvalidationBus,
+    PostgresInvalidationBus,
 ]
@@ -1,25 +1,118 @@
 import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Optional, Set
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import (
+    Any,
+    ClassVar,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+import loguru
+from tortoise.models import Model
 
 from brvideo.core.managers.base.cached_model import BaseCachedModel
+from brvideo.core.managers.base.indexed_cache import IndexedCache
+from brvideo.core.managers.base.invalidation import BaseInvalidationBus
 from brvideo.core.managers.base.repository import BaseRepository
+from brvideo.core.managers.base.sync_writer import BaseSyncWriter, UpsertSyncWriter
+from brvideo.core.metrics import registry
+
+# key type of a manager's cache, the primary key of its rows
+KeyT = TypeVar("KeyT", int, str)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class CacheMetrics:
+    """Sync, reload and invalidation metrics of one cache manager; only
+    created while metrics are enabled."""
+
+    def __init__(self, cache: "BaseCacheManager"):
+        labels = {"manager": type(cache).__name__}
+        self.sync_duration = registry.histogram(
+            "cache_sync_seconds", "Time to flush dirty entries", labels
+        )
+        self.synced = registry.counter(
+            "cache_synced_entries_total", "Entries written or deleted by syncs", labels
+        )
+        self.sync_failures = registry.counter("cache_sync_failures_total", "Failed syncs", labels)
+        self.reload_duration = registry.histogram(
+            "cache_reload_seconds", "Time of a periodic reload", labels
+        )
+        self.reloaded_rows = registry.counter(
+            "cache_reloaded_rows_total", "Changed rows read by reloads", labels
+        )
+        self.invalidated = registry.counter(
+            "cache_invalidated_keys_total", "Keys re-read after a peer changed them", labels
+        )
+        registry.gauge("cache_entries", "Cached entries", labels, lambda: len(cache._cache))
+        registry.gauge(
+            "cache_dirty", "Entries changed and not synced yet", labels, lambda: len(cache._dirty)
+        )
+        registry.stats("cache", cache.stats, labels)
 
 
-class BaseCacheManager(ABC):
+class BaseCacheManager(ABC, Generic[KeyT]):
+    unique_indexes: ClassVar[Tuple[str, ...]] = ()
+    multi_indexes: ClassVar[Tuple[str, ...]] = ()
+
+    # when both are set, `sync` defaults to an `UpsertSyncWriter` over them
+    db_model: ClassVar[Optional[type[Model]]] = None
+    cached_model: ClassVar[Optional[type[BaseCachedModel]]] = None
+    # column that grows on every write (e.g. `updated_at`), enables `reload_changed`
+    cursor_field: ClassVar[Optional[str]] = None
+    # `reload_changed` re-reads this far behind the cursor: the column is
+    # stamped before commit (and by clocks that may disagree), so a row can
+    # become visible with a value older than rows merged before it
+    cursor_overlap: ClassVar[timedelta] = timedelta(minutes=1)
+
+    # bounded mode: keep at most `max_entries` (LRU) and/or drop entries older
+    # than `entry_ttl` seconds; misses are loaded through `fetch`. Dirty
+    # entries are pinned until synced.
+    max_entries: ClassVar[Optional[int]] = None
+    entry_ttl: ClassVar[Optional[float]] = None
+
     def __init__(
         self,
         lock: asyncio.Lock,
-        cache: Dict[int, BaseCachedModel],
+        cache: IndexedCache,
         repo: Optional[BaseRepository] = None,
         sync_interval: int = 10,
         reload_interval: int = 30,
+        sync_writer: Optional[BaseSyncWriter] = None,
     ):
         self.repo = repo
+        if sync_writer is None and self.db_model and self.cached_model:
+            sync_writer = UpsertSyncWriter(
+                self.db_model, self.cached_model.model_fields.keys()
+            )
+        self.sync_writer = sync_writer
 
         self._cache = cache
-        self._dirty: Set[int] = set()
+        self._dirty: Set[KeyT] = set()
+        # key -> revision of its latest unsynced change, see `_mark_dirty`
+        self._versions: Dict[KeyT, int] = {}
+        self._revision = 0
+        self._cursor: Any = None
         self._lock = lock
+        self.bus: Optional[BaseInvalidationBus] = None
+        self.stats = CacheStats()
+        self.metrics = CacheMetrics(self) if registry.enabled else None
 
         self._sync_interval = float(sync_interval)
         self._reload_interval = float(reload_interval)
@@ -28,6 +121,10 @@ class BaseCacheManager(ABC):
         self._reload_task: Optional[asyncio.Task] = None
         self._stopping = False
 
+    @classmethod
+    def bounded(cls) -> bool:
+        return cls.max_entries is not None or cls.entry_ttl is not None
+
     @abstractmethod
     async def load_initial_data(self):
         """Load data into `self._cache` from `self.repo`."""
@@ -46,7 +143,7 @@ class BaseCacheManager(ABC):
 
         if self._should_run_reload():
             self._reload_task = asyncio.create_task(
-                self._task_loop(self._reload_interval, self.reload_from_db),
+                self._task_loop(self._reload_interval, self._reload),
                 name=f"{self.__class__.__name__}-reload",
             )
 
@@ -55,16 +152,277 @@ class BaseCacheManager(ABC):
         subclass_method = getattr(self, "reload_from_db", None)
         return subclass_method is not None and subclass_method is not base_method
 
+    async def _reload(self):
+        started = time.perf_counter()
+        await self.reload_from_db()
+        if self.metrics is not None:
+            self.metrics.reload_duration.observe(time.perf_counter() - started)
+
     async def _task_loop(self, interval_seconds: float, coro):
         await asyncio.sleep(0.1)
         while not self._stopping:
             await asyncio.sleep(interval_seconds)
             await coro()
 
-    @abstractmethod
-    async def sync(self):
+    def _mark_dirty(self, key: KeyT):
+        """Record a change to `key`. Call while holding `self._lock`.
+
+        Revisions come from one manager-wide counter, so a revision seen by an
+        in-flight sync is never reused even after the key is cleared.
+        """
+        self._revision += 1
+        self._versions[key] = self._revision
+        self._dirty.add(key)
+
+    def _dirty_versions(self) -> Dict[KeyT, int]:
+        """Snapshot of dirty keys and their revisions. Call while holding `self._lock`."""
+        return {key: self._versions.get(key, 0) for key in self._dirty}
+
+    def _clear_synced(self, versions: Dict[KeyT, int], keys: Iterable[KeyT]):
+        """Clear dirty `keys` unchanged since `versions` was taken. Call while holding `self._lock`."""
+        for key in keys:
+            if self._versions.get(key, 0) == versions[key]:
+                self._dirty.discard(key)
+                self._versions.pop(key, None)
+        self._enforce_bounds()
+
+    def _expired(self, key: KeyT) -> bool:
+        stamps = self._cache.stamps
+        return (
+            self.entry_ttl is not None
+            and stamps is not None
+            and key in stamps
+            and key not in self._dirty
+            and time.monotonic() - stamps[key] > self.entry_ttl
+        )
+
+    def _evict(self, key: KeyT):
+        self._cache.pop(key)
+        self.stats.evictions += 1
+
+    def _enforce_bounds(self, sweep_expired: bool = False):
+        """Evict unpinned entries beyond `max_entries`, least recently used
+        first, and with `sweep_expired` every entry past `entry_ttl`."""
+        stamps = self._cache.stamps
+        if stamps is None:
+            return
+        if sweep_expired and self.entry_ttl is not None:
+            deadline = time.monotonic() - self.entry_ttl
+            for key in [k for k, t in stamps.items() if t < deadline]:
+                if key not in self._dirty:
+                    self._evict(key)
+        if self.max_entries is None:
+            return
+        excess = len(self._cache) - self.max_entries
+        if excess <= 0:
+            return
+        for key in list(stamps):
+            if key in self._dirty:
+                continue
+            self._evict(key)
+            excess -= 1
+            if excess == 0:
+                break
+
+    def _merge_rows(self, rows: Iterable[Any], advance_cursor: bool = True):
+        """Apply db rows to the cache and advance the cursor. Call while holding `self._lock`.
+
+        Dirty keys are skipped: their local version is newer than the db one.
+        """
+        assert self.cached_model is not None
+        for row in rows:
+            if advance_cursor and self.cursor_field:
+                cursor = getattr(row, self.cursor_field, None)
+                if cursor is not None and (self._cursor is None or cursor > self._cursor):
+                    self._cursor = cursor
+            if row.id in self._dirty:
+                continue
+            try:
+                entry = self.cached_model.from_model(row)
+            except TypeError:
+                loguru.logger.exception(
+                    f"Error loading {self.cached_model.__name__} into cache"
+                )
+                continue
+            if self._cache.get(row.id) != entry:
+                self._cache[row.id] = entry
+                self._entry_stored(entry)
+        self._enforce_bounds()
+
+    def _entry_stored(self, entry: BaseCachedModel):
+        """Hook: a db version of `entry` was merged. Evictions do not call
+        `_entry_dropped`, so structures kept here outlive bounded caches."""
+        pass
+
+    def _entry_dropped(self, key: KeyT):
+        """Hook: `key` was found deleted from the db."""
         pass
 
+    async def reload_changed(self):
+        """Merge rows changed since the last seen cursor, so cost follows churn.
+
+        Rows are fetched from `cursor_overlap` behind the cursor: rows
+        committed late or stamped by a lagging clock are re-read rather than
+        missed. Deleted rows leave nothing to fetch and are only dropped by
+        `reload_all`.
+        """
+        since = None if self._cursor is None else self._cursor - self.cursor_overlap
+        try:
+            rows = await self.repo.changed_since(since)  # type: ignore[union-attr]
+        except Exception:
+            loguru.logger.exception(f"{self.__class__.__name__} reload failed")
+            return
+        if self.metrics is not None:
+            self.metrics.reloaded_rows.inc(len(rows))
+        async with self._lock:
+            self._merge_rows(rows)
+
+    async def reload_all(self):
+        """Merge every db row and drop cached keys deleted from the db.
+
+        Reads the whole table through `repo.all`, meant for small ones.
+        """
+        async with self._lock:
+            # keys clean now were synced before the read below starts
+            known = set(self._cache.keys()) - self._dirty
+        try:
+            rows = await self.repo.all()  # type: ignore[union-attr]
+        except Exception:
+            loguru.logger.exception(f"{self.__class__.__name__} full reload failed")
+            return
+        if self.metrics is not None:
+            self.metrics.reloaded_rows.inc(len(rows))
+        async with self._lock:
+            self._merge_rows(rows)
+            found = {row.id for row in rows}
+            for key in known - found:
+                if key not in self._dirty:
+                    self._cache.pop(key, None)
+                    self._entry_dropped(key)
+
+    @property
+    def channel(self) -> str:
+        assert self.db_model is not None
+        return f"cache_{self.db_model._meta.db_table}"
+
+    async def attach_bus(self, bus: BaseInvalidationBus):
+        """Publish synced keys to `bus` and apply keys published by peers."""
+        self.bus = bus
+        bus.on_reconnect(self.resync)
+        await bus.subscribe(self.channel, self.apply_invalidation)
+
+    async def resync(self):
+        """Catch up on changes whose invalidations were lost, e.g. while the
+        bus was disconnected: merge rows changed since the cursor or, without
+        one, drop clean entries of a bounded cache to be fetched again."""
+        if self.cursor_field is not None:
+            await self.reload_changed()
+        elif self.bounded():
+            async with self._lock:
+                for key in list(self._cache.keys()):
+                    if key not in self._dirty:
+                        self._cache.pop(key, None)
+
+    async def apply_invalidation(self, keys: List[KeyT]):
+        """Re-read `keys` changed by a peer; keys gone from the db are evicted.
+
+        The reload cursor is left alone, as these rows arrive out of order.
+        """
+        try:
+            rows = await self.repo.get_many(keys)  # type: ignore[union-attr]
+        except Exception:
+            loguru.logger.exception(f"{self.__class__.__name__} invalidation failed")
+            return
+        if self.metrics is not None:
+            self.metrics.invalidated.inc(len(keys))
+        async with self._lock:
+            self._merge_rows(rows, advance_cursor=False)
+            found = {row.id for row in rows}
+            for key in keys:
+                if key not in found and key not in self._dirty:
+                    self._cache.pop(key, None)
+                    self._entry_dropped(key)
+
+    async def _publish(self, keys: List[KeyT]):
+        if self.bus is None:
+            return
+        try:
+            await self.bus.publish(self.channel, keys)
+        except Exception:
+            loguru.logger.exception(f"{self.__class__.__name__} invalidation publish failed")
+
+    # Read API: plain synchronous lookups, safe to call from handlers without
+    # awaiting `self._lock`. Writers still serialize on the lock.
+
+    def get(self, key: KeyT) -> Optional[BaseCachedModel]:
+        entry = self._cache.get(key)
+        if self._cache.stamps is None:
+            return entry
+        if entry is None or self._expired(key):
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        self._cache.touch(key)
+        return entry
+
+    async def fetch(self, key: KeyT) -> Optional[BaseCachedModel]:
+        """`get` that loads a missing or expired entry through `repo.get_many`."""
+        entry = self.get(key)
+        if entry is not None or self.repo is None:
+            return entry
+        rows = await self.repo.get_many([key])  # type: ignore[attr-defined]
+        async with self._lock:
+            if key not in self._dirty:
+                self._cache.pop(key, None)  # expired copy, re-stamped by the merge
+            self._merge_rows(rows, advance_cursor=False)
+            return self._cache.get(key)
+
+    def get_by(self, field: str, value: Any) -> Optional[BaseCachedModel]:
+        return self._cache.get_by(field, value)
+
+    def filter_by(self, field: str, value: Any) -> Tuple[BaseCachedModel, ...]:
+        return self._cache.filter_by(field, value)
+
+    def snapshot(self) -> Mapping[KeyT, BaseCachedModel]:
+        """Immutable view of the cache, stable across awaits."""
+        return self._cache.snapshot()
+
+    async def sync(self, batch_size: int = 1000):
+        """Flush dirty entries through `self.sync_writer`, one write per batch.
+
+        Dirty keys that are no longer cached are deleted from the db.
+        """
+        if self.sync_writer is None:
+            return
+        async with self._lock:
+            if self.entry_ttl is not None:
+                self._enforce_bounds(sweep_expired=True)
+            if not self._dirty:
+                return
+            versions = self._dirty_versions()
+            entries = {key: self._cache.get(key) for key in versions}
+
+        keys = list(entries)
+        started = time.perf_counter()
+        try:
+            for i in range(0, len(keys), batch_size):
+                batch = keys[i : i + batch_size]
+                await self.sync_writer.write(
+                    [entries[key] for key in batch if entries[key] is not None],
+                    [key for key in batch if entries[key] is None],
+                )
+                async with self._lock:
+                    self._clear_synced(versions, batch)
+                if self.metrics is not None:
+                    self.metrics.synced.inc(len(batch))
+                await self._publish(batch)
+        except Exception:
+            loguru.logger.exception(f"{self.__class__.__name__} sync failed")
+            if self.metrics is not None:
+                self.metrics.sync_failures.inc()
+        if self.metrics is not None:
+            self.metrics.sync_duration.observe(time.perf_counter() - started)
+
     async def reload_from_db(self):
         """Optional method to override cache with db data periodically"""
         pass
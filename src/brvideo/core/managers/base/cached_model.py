@@ -1,12 +1,17 @@
-from typing import Any, Type, TypeVar
+from typing import Any, Type, TypeVar, Union
 
 from pydantic import BaseModel, ValidationError
 
 ModelT = TypeVar("ModelT", bound="BaseCachedModel")
 
+# primary key of a cached row: an integer id, or a string such as an FSM key
+CacheKey = Union[int, str]
+
 
 class BaseCachedModel(BaseModel):
-    model_config = {"arbitrary_types_allowed": True}
+    # frozen: cached entries are shared with snapshots and in-flight syncs,
+    # so changes are made by replacing the entry (`model_copy(update=...)`)
+    model_config = {"arbitrary_types_allowed": True, "frozen": True}
 
     @classmethod
     def from_model(cls: Type[ModelT], model: Any) -> ModelT:
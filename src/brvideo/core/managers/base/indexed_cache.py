@@ -0,0 +1,131 @@
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from brvideo.core.managers.base.cached_model import BaseCachedModel, CacheKey
+
+
+class IndexedCache(dict):
+    """Cache dict that keeps secondary field indexes in sync with every mutation.
+
+    Unique indexes map a field value to the single entry holding it, multi
+    indexes map a field value to all entries holding it (keyed by cache key).
+
+    `snapshot()` hands out a read-only copy that is rebuilt lazily after a
+    mutation, so readers never observe a half-applied write and never need
+    the manager lock.
+
+    With `track_access`, `stamps` keeps keys in least-recently-used order
+    (see `touch`) mapped to the time each entry was stored, for bounded caches.
+    """
+
+    def __init__(
+        self,
+        unique: Iterable[str] = (),
+        multi: Iterable[str] = (),
+        track_access: bool = False,
+    ):
+        super().__init__()
+        self.stamps: Optional[OrderedDict[CacheKey, float]] = (
+            OrderedDict() if track_access else None
+        )
+        self._unique: Dict[str, Dict[Any, BaseCachedModel]] = {f: {} for f in unique}
+        self._multi: Dict[str, Dict[Any, Dict[CacheKey, BaseCachedModel]]] = {
+            f: {} for f in multi
+        }
+        self._snapshot: Optional[Mapping[CacheKey, BaseCachedModel]] = None
+
+    def _index(self, key: CacheKey, value: BaseCachedModel):
+        for field, index in self._unique.items():
+            index[getattr(value, field)] = value
+        for field, index in self._multi.items():
+            index.setdefault(getattr(value, field), {})[key] = value
+
+    def _unindex(self, key: CacheKey, value: BaseCachedModel):
+        for field, index in self._unique.items():
+            field_value = getattr(value, field)
+            if index.get(field_value) is value:
+                del index[field_value]
+        for field, index in self._multi.items():
+            field_value = getattr(value, field)
+            bucket = index.get(field_value)
+            if bucket is not None and bucket.get(key) is value:
+                del bucket[key]
+                if not bucket:
+                    del index[field_value]
+
+    def __setitem__(self, key: CacheKey, value: BaseCachedModel):
+        self._snapshot = None
+        old = dict.get(self, key)
+        if old is not None:
+            self._unindex(key, old)
+        super().__setitem__(key, value)
+        self._index(key, value)
+        if self.stamps is not None:
+            self.stamps[key] = time.monotonic()
+            self.stamps.move_to_end(key)
+
+    def __delitem__(self, key: CacheKey):
+        self._snapshot = None
+        self._unindex(key, self[key])
+        super().__delitem__(key)
+        if self.stamps is not None:
+            del self.stamps[key]
+
+    def pop(self, key: CacheKey, *default):
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        self._snapshot = None
+        value = super().pop(key)
+        self._unindex(key, value)
+        if self.stamps is not None:
+            del self.stamps[key]
+        return value
+
+    def popitem(self) -> Tuple[CacheKey, BaseCachedModel]:
+        self._snapshot = None
+        key, value = super().popitem()
+        self._unindex(key, value)
+        if self.stamps is not None:
+            del self.stamps[key]
+        return key, value
+
+    def setdefault(self, key: CacheKey, default: BaseCachedModel):  # type: ignore[override]
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self):
+        self._snapshot = None
+        super().clear()
+        for index in (*self._unique.values(), *self._multi.values()):
+            index.clear()
+        if self.stamps is not None:
+            self.stamps.clear()
+
+    def touch(self, key: CacheKey):
+        """Mark `key` as most recently used."""
+        if self.stamps is not None and key in self.stamps:
+            self.stamps.move_to_end(key)
+
+    def get_by(self, field: str, value: Any) -> Optional[BaseCachedModel]:
+        return self._unique[field].get(value)
+
+    def filter_by(self, field: str, value: Any) -> Tuple[BaseCachedModel, ...]:
+        return tuple(self._multi[field].get(value, {}).values())
+
+    def snapshot(self) -> Mapping[CacheKey, BaseCachedModel]:
+        if self._snapshot is None:
+            self._snapshot = MappingProxyType(dict(self))
+        return self._snapshot
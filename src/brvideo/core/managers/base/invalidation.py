@@ -0,0 +1,198 @@
+import asyncio
+import json
+import uuid
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Set
+
+import asyncpg
+import loguru
+
+from brvideo.core.managers.base.cached_model import CacheKey
+
+InvalidationCallback = Callable[[List[CacheKey]], Awaitable[None]]
+ReconnectCallback = Callable[[], Awaitable[None]]
+
+
+class BaseInvalidationBus(ABC):
+    """Carries changed cache keys between processes sharing one database.
+
+    A bus never delivers a message back to the process that published it.
+    Messages published while a peer is disconnected are lost to it: a bus
+    that reconnects calls the `on_reconnect` callbacks afterwards, so
+    subscribers can catch up from the database.
+    """
+
+    def __init__(self):
+        self._reconnect_callbacks: List[ReconnectCallback] = []
+
+    def on_reconnect(self, callback: ReconnectCallback):
+        self._reconnect_callbacks.append(callback)
+
+    async def _reconnected(self):
+        for callback in self._reconnect_callbacks:
+            try:
+                await callback()
+            except Exception:
+                loguru.logger.exception("Invalidation bus reconnect callback failed")
+
+    @abstractmethod
+    async def publish(self, channel: str, keys: Sequence[CacheKey]):
+        pass
+
+    @abstractmethod
+    async def subscribe(self, channel: str, callback: InvalidationCallback):
+        pass
+
+    async def close(self):
+        pass
+
+
+class MemoryInvalidationBus(BaseInvalidationBus):
+    """In-process bus for tests: every instance is one peer, peers sharing
+    the same `peers` list receive each other's messages."""
+
+    def __init__(self, peers: Optional[List["MemoryInvalidationBus"]] = None):
+        super().__init__()
+        self._peers = peers if peers is not None else []
+        self._peers.append(self)
+        self._callbacks: Dict[str, List[InvalidationCallback]] = {}
+
+    async def publish(self, channel: str, keys: Sequence[CacheKey]):
+        for peer in self._peers:
+            if peer is self:
+                continue
+            for callback in peer._callbacks.get(channel, ()):
+                await callback(list(keys))
+
+    async def subscribe(self, channel: str, callback: InvalidationCallback):
+        self._callbacks.setdefault(channel, []).append(callback)
+
+    async def close(self):
+        if self in self._peers:
+            self._peers.remove(self)
+
+
+class PostgresInvalidationBus(BaseInvalidationBus):
+    """LISTEN/NOTIFY bus on a dedicated asyncpg connection.
+
+    A lost connection is re-opened in the background, listening on every
+    subscribed channel again. A connection that dies without closing (e.g.
+    a dropped network path) is found by pinging it every `health_interval`
+    seconds.
+    """
+
+    # NOTIFY payloads are capped at 8000 bytes
+    chunk_size = 500
+    health_interval = 30.0
+    # reconnect attempts back off from the first delay to the second
+    reconnect_delays = (1.0, 30.0)
+
+    def __init__(self, dsn: str):
+        super().__init__()
+        # tortoise urls use `postgres://` or `asyncpg://`, asyncpg wants postgresql://
+        self._dsn = "postgresql://" + dsn.split("://", 1)[1]
+        self._origin = uuid.uuid4().hex
+        self._conn: Optional[asyncpg.Connection] = None
+        self._conn_lock = asyncio.Lock()
+        self._callbacks: Dict[str, List[InvalidationCallback]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._closing = False
+        self._health_task: Optional[asyncio.Task] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+
+    async def _connection(self) -> asyncpg.Connection:
+        async with self._conn_lock:
+            if self._conn is None or self._conn.is_closed():
+                conn = await asyncpg.connect(self._dsn)
+                try:
+                    for channel in self._callbacks:
+                        await conn.add_listener(channel, self._on_notify)
+                except BaseException:
+                    conn.terminate()
+                    raise
+                conn.add_termination_listener(self._on_termination)
+                self._conn = conn
+                if self._health_task is None:
+                    self._health_task = asyncio.create_task(
+                        self._health_loop(), name="invalidation-bus-health"
+                    )
+            return self._conn
+
+    def _on_termination(self, connection):
+        if not self._closing:
+            loguru.logger.warning("Invalidation bus connection lost, reconnecting")
+            self._schedule_reconnect()
+
+    def _schedule_reconnect(self):
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.create_task(
+                self._reconnect(), name="invalidation-bus-reconnect"
+            )
+
+    async def _reconnect(self):
+        delay, max_delay = self.reconnect_delays
+        while not self._closing:
+            try:
+                await self._connection()
+            except Exception as e:
+                loguru.logger.warning(f"Invalidation bus reconnect failed, retry in {delay}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, max_delay)
+                continue
+            loguru.logger.info("Invalidation bus reconnected")
+            await self._reconnected()
+            return
+
+    async def _health_loop(self):
+        while not self._closing:
+            await asyncio.sleep(self.health_interval)
+            conn = self._conn
+            if conn is None or conn.is_closed():
+                self._schedule_reconnect()
+                continue
+            try:
+                async with self._conn_lock:
+                    await conn.execute("SELECT 1", timeout=self.health_interval)
+            except Exception as e:
+                loguru.logger.warning(f"Invalidation bus connection unresponsive: {e}")
+                conn.terminate()  # runs `_on_termination`
+
+    async def publish(self, channel: str, keys: Sequence[CacheKey]):
+        keys = list(keys)
+        conn = await self._connection()
+        for i in range(0, len(keys), self.chunk_size):
+            payload = json.dumps(
+                {"origin": self._origin, "keys": keys[i : i + self.chunk_size]}
+            )
+            async with self._conn_lock:
+                await conn.execute("SELECT pg_notify($1, $2)", channel, payload)
+
+    async def subscribe(self, channel: str, callback: InvalidationCallback):
+        self._callbacks.setdefault(channel, []).append(callback)
+        conn = await self._connection()
+        async with self._conn_lock:
+            await conn.add_listener(channel, self._on_notify)  # no-op if already listening
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            loguru.logger.warning(f"Malformed invalidation on {channel}: {payload!r}")
+            return
+        if message.get("origin") == self._origin:
+            return
+        for callback in self._callbacks.get(channel, ()):
+            task = asyncio.create_task(callback(message["keys"]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def close(self):
+        self._closing = True
+        for task in (self._health_task, self._reconnect_task):
+            if task is not None:
+                task.cancel()
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+        self._conn = None
+        for task in self._tasks:
+            task.cancel()
@@ -1,10 +1,12 @@
-import asyncio
 from abc import ABC
-from typing import Dict, Optional
+from typing import Optional
 
 from brvideo.core.managers.base import BaseCachedModel
 from brvideo.core.managers.base.cache import BaseCacheManager
+from brvideo.core.managers.base.indexed_cache import IndexedCache
+from brvideo.core.managers.base.invalidation import BaseInvalidationBus
 from brvideo.core.managers.base.repository import BaseRepository
+from brvideo.core.metrics import registry
 
 
 class BaseManager(ABC):
@@ -14,8 +16,22 @@ class BaseManager(ABC):
         cache_cls: Optional[type[BaseCacheManager]] = None,
         model: Optional[type[BaseCachedModel]] = None,
     ):
-        self._lock = asyncio.Lock()
-        self._cache: Dict[int, BaseCachedModel] = {}
+        # shared by the cache and the repository; times contended acquires
+        # while metrics are enabled
+        self._lock = registry.lock(
+            "cache_lock",
+            "Time waited for a contended manager lock",
+            {"manager": (cache_cls or type(self)).__name__},
+        )
+        self._cache = (
+            IndexedCache(
+                unique=cache_cls.unique_indexes,
+                multi=cache_cls.multi_indexes,
+                track_access=cache_cls.bounded(),
+            )
+            if cache_cls
+            else IndexedCache()
+        )
         self.model = model
         self.repo = repo_cls(self._lock) if repo_cls else None
         self.cache = cache_cls(self._lock, self._cache, self.repo) if cache_cls else None
@@ -32,6 +48,10 @@ class BaseManager(ABC):
         if self.cache is not None:
             await self.cache.initialize()
 
+    async def attach_bus(self, bus: BaseInvalidationBus):
+        if self.cache is not None and self.cache.db_model is not None:
+            await self.cache.attach_bus(bus)
+
 
 
 class BaseEmptyManager(ABC): ...
@@ -0,0 +1,50 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, Sequence
+
+from tortoise.models import Model
+
+from brvideo.core.managers.base.cached_model import BaseCachedModel, CacheKey
+
+
+class BaseSyncWriter(ABC):
+    """Persists one batch of dirty cache entries for `BaseCacheManager.sync`."""
+
+    @abstractmethod
+    async def write(self, upserts: Sequence[BaseCachedModel], deletes: Sequence[CacheKey]):
+        """Write `upserts` and delete the rows with primary keys in `deletes`."""
+        pass
+
+
+class UpsertSyncWriter(BaseSyncWriter):
+    """Writes a batch as a single `INSERT ... ON CONFLICT (pk) DO UPDATE`.
+
+    Tortoise renders the same statement for asyncpg/Postgres and SQLite.
+    Deletions go out as one `DELETE ... WHERE pk IN (...)`.
+    """
+
+    def __init__(self, model: type[Model], fields: Iterable[str]):
+        self.model = model
+        self.pk = model._meta.pk_attr
+        self.fields = list(fields)
+        # auto_now columns (e.g. the `updated_at` reload cursor) are stamped
+        # on insert by Tortoise and must be refreshed on conflict as well
+        auto_now = [
+            name
+            for name, field in model._meta.fields_map.items()
+            if getattr(field, "auto_now", False) and name not in self.fields
+        ]
+        self.update_fields = [f for f in self.fields if f != self.pk] + auto_now
+
+    async def write(self, upserts: Sequence[BaseCachedModel], deletes: Sequence[CacheKey]):
+        if upserts:
+            await self.model.bulk_create(
+                [
+                    self.model(**{f: getattr(entry, f) for f in self.fields})
+                    for entry in upserts
+                ],
+                batch_size=len(upserts),
+                on_conflict=[self.pk],
+                update_fields=self.update_fields,
+            )
+        if deletes:
+            await self.model.filter(**{f"{self.pk}__in": list(deletes)}).delete()
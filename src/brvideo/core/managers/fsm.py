@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, cast
+
+import loguru
+
+from brvideo.core.managers.base import (
+    BaseCachedModel,
+    BaseCacheManager,
+    BaseManager,
+    BaseRepository,
+    UpsertSyncWriter,
+)
+from brvideo.core.managers.base.cached_model import CacheKey
+from brvideo.core.models import FSMStates
+
+
+class _CachedFSMState(BaseCachedModel):
+    id: str
+    state: Optional[str] = None
+    data: Dict[str, Any] = {}
+
+    @property
+    def empty(self) -> bool:
+        return self.state is None and not self.data
+
+
+class FSMStateRepository(BaseRepository):
+    @staticmethod
+    async def get_many(ids: List[str]) -> List[FSMStates]:
+        return await FSMStates.filter(id__in=ids)
+
+    @staticmethod
+    async def stale_keys(before: datetime) -> List[str]:
+        return await FSMStates.filter(updated_at__lt=before).values_list(  # type: ignore[return-value]
+            "id", flat=True
+        )
+
+    @staticmethod
+    async def delete_stale(ids: List[str], before: datetime):
+        # re-check the age: a key touched since `stale_keys` survives
+        await FSMStates.filter(id__in=ids, updated_at__lt=before).delete()
+
+
+class FSMSyncWriter(UpsertSyncWriter):
+    """Cleared states (no state, no data) are deleted instead of stored."""
+
+    async def write(self, upserts: Sequence[BaseCachedModel], deletes: Sequence[CacheKey]):
+        states = cast(Sequence[_CachedFSMState], upserts)
+        await super().write(
+            [entry for entry in states if not entry.empty],
+            [*deletes, *(entry.id for entry in states if entry.empty)],
+        )
+
+
+class FSMCacheManager(BaseCacheManager[str]):
+    """Hot FSM states in memory, written back in batches.
+
+    Every transition only marks the key dirty, so a burst of transitions in
+    one conversation costs one upsert at the next sync. Keys without a stored
+    state are cached as empty entries, so idle users cost no queries.
+
+    Entries are re-read after `entry_ttl` seconds, so a conversation moving
+    between bot processes picks up the state another process wrote (within
+    its `sync_interval`); the invalidation bus, when attached, does it sooner.
+    """
+
+    db_model = FSMStates
+    cached_model = _CachedFSMState
+    max_entries = 50_000
+    entry_ttl = 5
+
+    # forms untouched for this long are deleted by `reload_from_db`
+    state_ttl = timedelta(days=1)
+
+    repo: FSMStateRepository
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("sync_interval", 2)
+        kwargs.setdefault("reload_interval", 600)
+        kwargs.setdefault(
+            "sync_writer", FSMSyncWriter(FSMStates, _CachedFSMState.model_fields.keys())
+        )
+        super().__init__(*args, **kwargs)
+
+    async def load_initial_data(self):
+        pass  # states are loaded on first use
+
+    async def get_record(self, key: str) -> _CachedFSMState:
+        entry = await self.fetch(key)
+        if entry is None:
+            async with self._lock:
+                entry = self._cache.setdefault(key, _CachedFSMState(id=key))
+                self._enforce_bounds()
+        return cast(_CachedFSMState, entry)
+
+    async def update_record(self, key: str, **fields) -> _CachedFSMState:
+        current = await self.get_record(key)
+        async with self._lock:
+            current = self._cache.get(key, current)
+            record = current.model_copy(update=fields)
+            if record != current:
+                self._cache[key] = record
+                self._mark_dirty(key)
+        return record
+
+    async def reload_from_db(self):
+        await self.cleanup_stale()
+
+    async def cleanup_stale(self):
+        """Delete forms abandoned for longer than `state_ttl`."""
+        before = datetime.now(timezone.utc) - self.state_ttl
+        try:
+            keys = await self.repo.stale_keys(before)
+            if not keys:
+                return
+            await self.repo.delete_stale(keys, before)
+        except Exception:
+            loguru.logger.exception("FSM states cleanup failed")
+            return
+        async with self._lock:
+            for key in keys:
+                if key not in self._dirty:
+                    self._cache.pop(key, None)
+        await self._publish(keys)
+
+
+class FSMManager(BaseManager):
+    repo: FSMStateRepository
+    cache: FSMCacheManager
+
+    def __init__(self):
+        super().__init__(
+            repo_cls=FSMStateRepository,
+            cache_cls=FSMCacheManager,
+            model=_CachedFSMState,
+        )
+
+        self.get_record = self.cache.get_record
+        self.update_record = self.cache.update_record
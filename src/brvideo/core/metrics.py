@@ -0,0 +1,248 @@
+import asyncio
+import bisect
+import dataclasses
+import math
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from brvideo.core.config import settings
+
+# seconds; fits db queries and handler run times alike
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Counter:
+    """A value that only goes up. With `read` the value is taken from it on
+    collection instead, e.g. from an existing stats object."""
+
+    kind = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        description: str = "",
+        labels: Optional[Dict[str, str]] = None,
+        read: Optional[Callable[[], float]] = None,
+    ):
+        self.name = name
+        self.description = description
+        self.labels = labels or {}
+        self._read = read
+        self._value = 0.0
+
+    def inc(self, amount: float = 1):
+        self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._read() if self._read is not None else self._value
+
+
+class Gauge(Counter):
+    """A value that goes up and down, set directly or read on collection."""
+
+    kind = "gauge"
+
+    def set(self, value: float):
+        self._value = value
+
+
+class Histogram:
+    """Observations counted into fixed buckets, Prometheus style: bucket `i`
+    counts values `<= buckets[i]`, the last one everything above."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str = "",
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        labels: Optional[Dict[str, str]] = None,
+    ):
+        self.name = name
+        self.description = description
+        self.labels = labels or {}
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the `q`-th observation; `inf`
+        when it falls above the last bucket, 0 without observations."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+Metric = Union[Counter, Gauge, Histogram]
+
+
+class TimedLock(asyncio.Lock):
+    """`asyncio.Lock` recording how long contended acquires waited.
+
+    Uncontended acquires only cost a check and a counter increment."""
+
+    def __init__(self, wait: Histogram):
+        super().__init__()
+        self.wait = wait
+        self.acquires = 0
+
+    async def acquire(self) -> bool:
+        self.acquires += 1
+        if not self.locked():
+            return await super().acquire()
+        started = time.perf_counter()
+        try:
+            return await super().acquire()
+        finally:
+            self.wait.observe(time.perf_counter() - started)
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class Registry:
+    """Metrics by name and labels, rendered in the Prometheus text format.
+
+    Registering is always allowed; `enabled` decides whether the costlier
+    hooks (handler timing, cache timings, lock waits) are installed at all,
+    so a disabled registry costs nothing on hot paths.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._metrics: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Metric] = {}
+
+    def __len__(self) -> int:
+        return len(self._metrics)
+
+    def register(self, metric: Metric) -> Metric:
+        """Add `metric`, replacing one with the same name and labels."""
+        self._metrics[(metric.name, tuple(sorted(metric.labels.items())))] = metric
+        return metric
+
+    def counter(
+        self,
+        name: str,
+        description: str = "",
+        labels: Optional[Dict[str, str]] = None,
+        read: Optional[Callable[[], float]] = None,
+    ) -> Counter:
+        counter = Counter(name, description, labels, read)
+        return self.register(counter)  # type: ignore[return-value]
+
+    def gauge(
+        self,
+        name: str,
+        description: str = "",
+        labels: Optional[Dict[str, str]] = None,
+        read: Optional[Callable[[], float]] = None,
+    ) -> Gauge:
+        gauge = Gauge(name, description, labels, read)
+        return self.register(gauge)  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        description: str = "",
+        labels: Optional[Dict[str, str]] = None,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        histogram = Histogram(name, description, buckets, labels)
+        return self.register(histogram)  # type: ignore[return-value]
+
+    def stats(self, prefix: str, stats: Any, labels: Optional[Dict[str, str]] = None):
+        """Expose every field of a stats dataclass (e.g. `CacheStats`) as a
+        `<prefix>_<field>_total` counter read from it on collection."""
+        for field in dataclasses.fields(stats):
+            self.counter(
+                f"{prefix}_{field.name}_total",
+                labels=labels,
+                read=lambda name=field.name: getattr(stats, name),
+            )
+
+    def lock(
+        self, name: str, description: str = "", labels: Optional[Dict[str, str]] = None
+    ) -> asyncio.Lock:
+        """A plain lock when disabled, else a `TimedLock` counting acquires as
+        `<name>_acquires_total` and timing contended ones as `<name>_wait_seconds`."""
+        if not self.enabled:
+            return asyncio.Lock()
+        lock = TimedLock(self.histogram(f"{name}_wait_seconds", description, labels))
+        self.counter(f"{name}_acquires_total", labels=labels, read=lambda: lock.acquires)
+        return lock
+
+    def collect(self) -> List[Metric]:
+        return list(self._metrics.values())
+
+    def render(self) -> str:
+        by_name: Dict[str, List[Metric]] = {}
+        for metric in self._metrics.values():
+            by_name.setdefault(metric.name, []).append(metric)
+
+        lines = []
+        for name, metrics in by_name.items():
+            if metrics[0].description:
+                lines.append(f"# HELP {name} {metrics[0].description}")
+            lines.append(f"# TYPE {name} {metrics[0].kind}")
+            for metric in metrics:
+                if isinstance(metric, Histogram):
+                    cumulative = 0
+                    for bound, count in zip((*metric.buckets, math.inf), metric.counts):
+                        cumulative += count
+                        labels = _format_labels({**metric.labels, "le": _format_value(bound)})
+                        lines.append(f"{name}_bucket{labels} {cumulative}")
+                    labels = _format_labels(metric.labels)
+                    lines.append(f"{name}_sum{labels} {_format_value(metric.sum)}")
+                    lines.append(f"{name}_count{labels} {metric.count}")
+                else:
+                    lines.append(
+                        f"{name}{_format_labels(metric.labels)} {_format_value(metric.value)}"
+                    )
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: Union[str, Path]):
+        """Write `render()` to `path`, replacing it atomically."""
+        write_atomic(path, self.render())
+
+
+def write_atomic(path: Union[str, Path], text: str):
+    """Write `text` to `path` through a temporary file, so readers never see
+    a partial file. Blocking: run it off the event loop."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text)
+    tmp.replace(path)
+
+
+registry = Registry(enabled=settings.METRICS_ENABLED)
@@ -1,4 +1,9 @@
+import uuid
+from pathlib import Path
+
+import loguru
 from tortoise import Tortoise, fields
+from tortoise.exceptions import OperationalError
 from tortoise.models import Model
 
 try:
@@ -8,32 +13,76 @@ except ImportError:  # `aerich init` and `aerich init-db` must be run from root,
 
 class Applications(Model):
     id = fields.IntField(primary_key=True)
+    # generated client-side so rows written by a bulk insert can be read back
+    uid = fields.UUIDField(unique=True, default=uuid.uuid4)
+    tg_id = fields.BigIntField(null=True)  # submitter
     nickname = fields.CharField(max_length=50)
     server = fields.IntField()
     social = fields.CharEnumField(enum_type=enums.Socials, max_length=255)
     date = fields.DatetimeField(auto_now_add=True)
     link_acc = fields.TextField()
-    accepted = fields.BooleanField()
+    link_video = fields.TextField(null=True)
+    accepted = fields.BooleanField(null=True, default=None)  # NULL while pending review
     reason = fields.TextField(null=True)
+    updated_at = fields.DatetimeField(auto_now=True, db_index=True)
 
     class Meta:
         table = "applications"
+        # review listings filter on status (+ server or social) and page by (date, id)
+        indexes = (
+            ("accepted", "date", "id"),
+            ("accepted", "server", "date", "id"),
+            ("accepted", "social", "date", "id"),
+        )
 
 
 class Admins(Model):
     id = fields.IntField(primary_key=True)
     nickname = fields.CharField(max_length=50)
     tg_id = fields.BigIntField()
+    updated_at = fields.DatetimeField(auto_now=True, db_index=True)
 
     class Meta:
         table = "admins"
 
 
+class FSMStates(Model):
+    id = fields.CharField(max_length=255, primary_key=True)  # aiogram storage key
+    state = fields.CharField(max_length=255, null=True)
+    data = fields.JSONField(default=dict)
+    updated_at = fields.DatetimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        table = "fsm_states"
+
+
+# aerich's `location`, relative to the repository root
+MIGRATIONS_DIR = Path(__file__).resolve().parents[3] / "migrations" / "models"
+
+
+async def migrations_applied(migrations_dir: Path = MIGRATIONS_DIR) -> bool:
+    """Whether aerich recorded every migration file as applied; False when
+    there are no migrations to compare against."""
+    from aerich.models import Aerich
+
+    files = {path.name for path in migrations_dir.glob("*.py") if path.name[0].isdigit()}
+    if not files:
+        return False
+    try:
+        applied = await Aerich.filter(app="models").values_list("version", flat=True)
+    except OperationalError:  # no aerich table yet
+        return False
+    return files <= set(applied)
+
+
 async def init():
     from brvideo.core.config import database_config
 
     await Tortoise.init(database_config)
-    await Tortoise.generate_schemas()
+    if await migrations_applied():
+        loguru.logger.debug("Migrations are up to date, schema generation skipped")
+    else:
+        await Tortoise.generate_schemas()
 
 
 async def close():
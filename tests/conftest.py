@@ -5,6 +5,7 @@ from pathlib import Path
 os.environ.setdefault("TOKEN", "fake-token-for-tests")
 os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
 os.environ.setdefault("APPLICATIONS_CHAT_ID", "1")
+os.environ.setdefault("OWNERS", "[]")
 
 ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
@@ -1,4 +1,6 @@
 import asyncio
+from datetime import timedelta
+
 from tortoise import Tortoise
 
 from brvideo.core.managers.admins import AdminManager
@@ -34,3 +36,116 @@ def test_integration_add_edit_sync():
         await Tortoise.close_connections()
 
     asyncio.run(_run())
+
+
+def test_integration_delete_propagates_on_sync():
+    async def _run():
+        await Tortoise.init(
+            db_url="sqlite://:memory:", modules={"models": ["brvideo.core.models"]}
+        )
+        await Tortoise.generate_schemas()
+
+        mgr = AdminManager()
+        await mgr.add_admin(tg_id=1, nickname="keep")
+        await mgr.add_admin(tg_id=2, nickname="drop")
+        await mgr.del_admin(tg_id=2)
+        await mgr.cache.sync()
+
+        assert await Admins.filter(tg_id=2).exists() is False
+        assert (await Admins.get(tg_id=1)).nickname == "keep"
+        assert not mgr.cache._dirty
+
+        await Tortoise.close_connections()
+
+    asyncio.run(_run())
+
+
+def test_integration_reload_changed_merges_only_new_rows():
+    async def _run():
+        await Tortoise.init(
+            db_url="sqlite://:memory:", modules={"models": ["brvideo.core.models"]}
+        )
+        await Tortoise.generate_schemas()
+
+        await Admins.create(nickname="a", tg_id=1)
+        local = await Admins.create(nickname="b", tg_id=2)
+
+        mgr = AdminManager()
+        await mgr.cache.load_initial_data()
+        cursor = mgr.cache._cursor
+        assert cursor is not None
+
+        # another process adds an admin and renames one we have edited locally
+        await Admins.create(nickname="c", tg_id=3)
+        await mgr.edit_admin(tg_id=2, nickname="b-local")
+        await Admins.filter(id=local.id).update(nickname="b-remote")
+
+        await mgr.cache.reload_changed()
+
+        assert await mgr.is_admin(3)
+        assert mgr.cache.get_by("tg_id", 2).nickname == "b-local"  # dirty entry kept
+        assert mgr.cache._cursor >= cursor
+
+        # the local edit wins once synced, and bumps the row past the cursor
+        await mgr.cache.sync()
+        row = await Admins.get(tg_id=2)
+        assert row.nickname == "b-local"
+        assert row.updated_at >= mgr.cache._cursor
+
+        await Tortoise.close_connections()
+
+    asyncio.run(_run())
+
+
+def test_integration_reload_changed_reads_rows_committed_late():
+    async def _run():
+        await Tortoise.init(
+            db_url="sqlite://:memory:", modules={"models": ["brvideo.core.models"]}
+        )
+        await Tortoise.generate_schemas()
+
+        await Admins.create(nickname="a", tg_id=1)
+        mgr = AdminManager()
+        await mgr.cache.load_initial_data()
+        cursor = mgr.cache._cursor
+
+        # stamped before the newest row we merged, but only committed now
+        late = await Admins.create(nickname="late", tg_id=2)
+        await Admins.filter(id=late.id).update(updated_at=cursor - timedelta(seconds=5))
+        await mgr.cache.reload_changed()
+
+        assert await mgr.is_admin(2)
+        assert mgr.cache._cursor == cursor
+
+        await Tortoise.close_connections()
+
+    asyncio.run(_run())
+
+
+def test_integration_full_reload_drops_deleted_admins():
+    async def _run():
+        await Tortoise.init(
+            db_url="sqlite://:memory:", modules={"models": ["brvideo.core.models"]}
+        )
+        await Tortoise.generate_schemas()
+
+        await Admins.create(nickname="a", tg_id=1)
+        await Admins.create(nickname="b", tg_id=2)
+        mgr = AdminManager()
+        await mgr.cache.load_initial_data()
+        await mgr.add_admin(tg_id=3, nickname="new")
+
+        # another process removes an admin: incremental reloads cannot see it
+        await Admins.filter(tg_id=2).delete()
+        for _ in range(mgr.cache.full_reload_every - 1):
+            await mgr.cache.reload_from_db()
+        assert await mgr.is_admin(2)
+
+        await mgr.cache.reload_from_db()
+        assert not await mgr.is_admin(2)
+        assert await mgr.is_admin(1)
+        assert await mgr.is_admin(3)
+
+        await Tortoise.close_connections()
+
+    asyncio.run(_run())
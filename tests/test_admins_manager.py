@@ -3,6 +3,7 @@ from types import SimpleNamespace
 
 
 from brvideo.core.managers.admins import AdminManager, _CachedAdmin
+from brvideo.core.managers.base import BaseSyncWriter
 
 
 def make_row(id: int, nickname: str, tg_id: int) -> SimpleNamespace:
@@ -111,168 +112,74 @@ def test_is_admin_true_and_false():
     assert asyncio.run(mgr.cache.is_admin(1111)) is False
 
 
-def test_sync_updates_and_creates(monkeypatch):
-    mgr = AdminManager()
-
-    # Prepare two cached items in cache keyed by DB id
-    mgr._cache.clear()
-    a = _CachedAdmin.model_validate({"id": 1, "nickname": "Alice", "tg_id": 100})
-    b = _CachedAdmin.model_validate({"id": 2, "nickname": "Bob", "tg_id": 200})
-    mgr._cache[1] = a
-    mgr._cache[2] = b
-    mgr.cache._dirty.update({1, 2})
-
-    # Admins.filter will report that only id 1 exists in DB and has old nickname
-    existing_row = make_row(1, "OldAlice", 100)
-
-    async def fake_filter(**kwargs):
-        # return only existing rows
-        return [existing_row]
-
-    bulk_updated = {}
+class FakeWriter(BaseSyncWriter):
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.calls: list[tuple[list[int], list[int]]] = []
 
-    async def fake_bulk_update(rows, fields=None, batch_size=None):
-        # record that we attempted to update
-        bulk_updated["updated"] = [r.id for r in rows]
+    async def write(self, upserts, deletes):
+        if self.fail:
+            raise RuntimeError("boom")
+        self.calls.append(([u.id for u in upserts], list(deletes)))
 
-    bulk_created = {}
 
-    async def fake_bulk_create(items, batch_size=None):
-        bulk_created["created_count"] = len(items)
-
-    # Patch the Admins methods used in sync
-    import sys
-
-    admins_mod = sys.modules["brvideo.core.managers.admins"]
+def test_sync_upserts_dirty_entries():
+    mgr = AdminManager()
+    writer = mgr.cache.sync_writer = FakeWriter()
 
-    monkeypatch.setattr(
-        admins_mod,
-        "Admins",
-        SimpleNamespace(
-            filter=fake_filter,
-            bulk_update=fake_bulk_update,
-            bulk_create=fake_bulk_create,
-        ),
-        raising=False,
-    )
+    mgr._cache.clear()
+    mgr._cache[1] = _CachedAdmin.model_validate({"id": 1, "nickname": "Alice", "tg_id": 100})
+    mgr._cache[2] = _CachedAdmin.model_validate({"id": 2, "nickname": "Bob", "tg_id": 200})
+    mgr.cache._dirty.update({1, 2})
 
-    # Run sync
     asyncio.run(mgr.cache.sync(batch_size=10))
 
-    # After sync, bulk_update should have been called for id 1 and bulk_create for id 2
-    assert bulk_updated.get("updated") == [1]
-    assert bulk_created.get("created_count") == 1
-    # Dirty set should be cleared for those ids
+    # one write for the whole batch, both entries upserted
+    assert len(writer.calls) == 1
+    assert sorted(writer.calls[0][0]) == [1, 2]
+    assert writer.calls[0][1] == []
     assert 1 not in mgr.cache._dirty
     assert 2 not in mgr.cache._dirty
 
 
-def test_sync_handles_exception_and_keeps_dirty(monkeypatch):
+def test_sync_handles_exception_and_keeps_dirty():
     mgr = AdminManager()
+    mgr.cache.sync_writer = FakeWriter(fail=True)
 
     mgr._cache.clear()
-    c = _CachedAdmin.model_validate({"id": 11, "nickname": "C", "tg_id": 11})
-    mgr._cache[11] = c
+    mgr._cache[11] = _CachedAdmin.model_validate({"id": 11, "nickname": "C", "tg_id": 11})
     mgr.cache._dirty.add(11)
 
-    async def fake_filter(**kwargs):
-        raise RuntimeError("boom")
-
-    import sys
-
-    admins_mod = sys.modules["brvideo.core.managers.admins"]
-    monkeypatch.setattr(
-        admins_mod, "Admins", SimpleNamespace(filter=fake_filter), raising=False
-    )
-
     # Should not raise, but dirty should remain
     asyncio.run(mgr.cache.sync())
     assert 11 in mgr.cache._dirty
 
 
-def test_sync_early_return_when_dirty_empty(monkeypatch):
+def test_sync_early_return_when_dirty_empty():
     mgr = AdminManager()
+    writer = mgr.cache.sync_writer = FakeWriter()
 
-    # Ensure dirty is empty
     mgr.cache._dirty.clear()
-
-    # Patch Admins.filter to raise if called
-    import sys
-
-    admins_mod = sys.modules["brvideo.core.managers.admins"]
-
-    async def bad_filter(**kwargs):
-        raise AssertionError("Admins.filter should not be called when dirty is empty")
-
-    monkeypatch.setattr(
-        admins_mod, "Admins", SimpleNamespace(filter=bad_filter), raising=False
-    )
-
-    # Should return cleanly
     asyncio.run(mgr.cache.sync())
+    assert writer.calls == []
 
 
-def test_sync_payloads_empty_if_cache_missing_ids(monkeypatch):
+def test_sync_deletes_dirty_ids_missing_from_cache():
     mgr = AdminManager()
+    writer = mgr.cache.sync_writer = FakeWriter()
 
-    # Put an id into dirty that is not in the cache
+    # a dirty id that is not cached anymore was deleted (see del_admin)
     mgr.cache._dirty.clear()
     mgr.cache._dirty.add(9999)
 
-    import sys
-
-    admins_mod = sys.modules["brvideo.core.managers.admins"]
-
-    async def bad_filter(**kwargs):
-        raise AssertionError("Admins.filter should not be called when payloads empty")
-
-    monkeypatch.setattr(
-        admins_mod, "Admins", SimpleNamespace(filter=bad_filter), raising=False
-    )
-
     asyncio.run(mgr.cache.sync())
-    # dirty should remain since nothing changed
-    assert 9999 in mgr.cache._dirty
+    assert writer.calls == [([], [9999])]
+    assert 9999 not in mgr.cache._dirty
 
 
-def test_sync_no_updates_when_rows_match(monkeypatch):
-    mgr = AdminManager()
-
-    mgr._cache.clear()
-    a = _CachedAdmin.model_validate({"id": 1, "nickname": "Same", "tg_id": 10})
-    mgr._cache[1] = a
-    mgr.cache._dirty.add(1)
-
-    existing_row = make_row(1, "Same", 10)
-
-    async def fake_filter(**kwargs):
-        return [existing_row]
-
-    # bulk operations should not be called
-    async def fail_update(*args, **kwargs):
-        raise AssertionError("bulk_update should not be called when nothing changed")
-
-    async def fail_create(*args, **kwargs):
-        raise AssertionError("bulk_create should not be called when nothing changed")
-
-    import sys
-
-    admins_mod = sys.modules["brvideo.core.managers.admins"]
-    monkeypatch.setattr(
-        admins_mod,
-        "Admins",
-        SimpleNamespace(
-            filter=fake_filter, bulk_update=fail_update, bulk_create=fail_create
-        ),
-        raising=False,
-    )
-
-    asyncio.run(mgr.cache.sync())
-    assert 1 not in mgr.cache._dirty
-
-
-def test_sync_batch_splitting(monkeypatch):
+def test_sync_batch_splitting():
     mgr = AdminManager()
+    writer = mgr.cache.sync_writer = FakeWriter()
 
     mgr._cache.clear()
     # three items to force two batches when batch_size=2
@@ -282,43 +189,52 @@ def test_sync_batch_splitting(monkeypatch):
         )
     mgr.cache._dirty.update({1, 2, 3})
 
-    # make filter return rows for 1 and 3; make id=1 have different nickname so it will be updated
-    existing_rows = [make_row(1, "old_n1", 10), make_row(3, "n3", 30)]
+    asyncio.run(mgr.cache.sync(batch_size=2))
 
-    async def fake_filter(**kwargs):
-        return [r for r in existing_rows if r.id in kwargs.get("id__in", [])]
+    assert [len(upserts) for upserts, _ in writer.calls] == [2, 1]
+    assert sorted(i for upserts, _ in writer.calls for i in upserts) == [1, 2, 3]
+    assert not mgr.cache._dirty
 
-    bulk_updates = []
 
-    async def fake_bulk_update(rows, fields=None, batch_size=None):
-        bulk_updates.append([r.id for r in rows])
+def test_is_admin_does_not_wait_for_lock():
+    mgr = AdminManager()
+    mgr._cache[5] = _CachedAdmin.model_validate({"id": 5, "nickname": "x", "tg_id": 55})
 
-    bulk_creates = []
+    async def _run():
+        async with mgr._lock:  # a writer (e.g. sync) holds the lock
+            return await asyncio.wait_for(mgr.cache.is_admin(55), timeout=0.1)
 
-    async def fake_bulk_create(items, batch_size=None):
-        # items are pydantic models in current implementation; record their ids
-        bulk_creates.append([getattr(i, "id", None) for i in items])
+    assert asyncio.run(_run()) is True
 
-    import sys
 
-    admins_mod = sys.modules["brvideo.core.managers.admins"]
-    monkeypatch.setattr(
-        admins_mod,
-        "Admins",
-        SimpleNamespace(
-            filter=fake_filter,
-            bulk_update=fake_bulk_update,
-            bulk_create=fake_bulk_create,
-        ),
-        raising=False,
-    )
+def test_sync_keeps_entries_changed_while_writing():
+    mgr = AdminManager()
 
-    asyncio.run(mgr.cache.sync(batch_size=2))
+    class EditingWriter(BaseSyncWriter):
+        async def write(self, upserts, deletes):
+            # the entry is edited while the batch is in flight
+            async with mgr._lock:
+                mgr._cache[1] = mgr._cache[1].model_copy(update={"nickname": "v2"})
+                mgr.cache._mark_dirty(1)
 
-    # Expect at least one update and one create across batches
-    assert any(1 in batch for batch in bulk_updates)
-    assert (
-        any(2 in batch for batch in bulk_creates)
-        or any(3 in batch for batch in bulk_creates)
-        or bulk_creates
-    )
+    mgr.cache.sync_writer = EditingWriter()
+
+    async def _run():
+        async with mgr._lock:
+            mgr._cache[1] = _CachedAdmin.model_validate(
+                {"id": 1, "nickname": "v1", "tg_id": 10}
+            )
+            mgr.cache._mark_dirty(1)
+        await mgr.cache.sync()
+
+    asyncio.run(_run())
+    assert 1 in mgr.cache._dirty
+
+
+def test_cached_admin_is_frozen():
+    import pytest
+    from pydantic import ValidationError
+
+    admin = _CachedAdmin.model_validate({"id": 1, "nickname": "x", "tg_id": 1})
+    with pytest.raises(ValidationError):
+        admin.nickname = "y"
@@ -0,0 +1,214 @@
+import asyncio
+
+from tortoise import Tortoise
+
+from brvideo.core.enums import ApplicationStatus, Socials
+from brvideo.core.managers.applications import ApplicationManager
+from brvideo.core.models import Applications
+
+
+def submission(i: int) -> dict:
+    return {
+        "tg_id": 1000 + i,
+        "nickname": f"Nick_{i}",
+        "server": 1,
+        "social": Socials.YOUTUBE,
+        "link_acc": f"https://youtube.com/@nick{i}",
+    }
+
+
+async def init_db():
+    await Tortoise.init(
+        db_url="sqlite://:memory:", modules={"models": ["brvideo.core.models"]}
+    )
+    await Tortoise.generate_schemas()
+
+
+def test_submissions_are_buffered_until_flush():
+    async def _run():
+        await init_db()
+        mgr = ApplicationManager()
+
+        for i in range(3):
+            await mgr.submit(**submission(i))
+        assert await Applications.all().count() == 0
+
+        await mgr.sync()
+        rows = await Applications.all()
+        assert sorted(r.nickname for r in rows) == ["Nick_0", "Nick_1", "Nick_2"]
+        # flushed rows are cached with their db ids
+        assert all(mgr.cache.get(r.id) is not None for r in rows)
+
+        await Tortoise.close_connections()
+
+    asyncio.run(_run())
+
+
+def test_threshold_triggers_bulk_insert():
+    async def _run():
+        await init_db()
+        mgr = ApplicationManager()
+        mgr.cache.flush_threshold = 5
+
+        inserts = []
+        create_many = mgr.repo.create_many
+
+        async def counting_create_many(drafts):
+            inserts.append(len(drafts))
+            return await create_many(drafts)
+
+        mgr.cache.repo.create_many = counting_create_many  # type: ignore[method-assign]
+
+        for i in range(5):
+            await mgr.submit(**submission(i))
+        await asyncio.gather(*mgr.cache._flush_tasks)
+
+        assert inserts == [5]
+        assert await Applications.all().count() == 5
+
+        await Tortoise.close_connections()
+
+    asyncio.run(_run())
+
+
+def test_decisions_are_batched_and_close_flushes():
+    async def _run():
+        await init_db()
+        mgr = ApplicationManager()
+
+        for i in range(3):
+            await mgr.submit(**submission(i))
+        await mgr.cache.flush_new()
+        ids = [r.id for r in await Applications.all().order_by("id")]
+
+        writes = []
+        write = mgr.cache.sync_writer.write
+
+        async def counting_write(upserts, deletes):
+            writes.append(len(upserts))
+            await write(upserts, deletes)
+
+        mgr.cache.sync_writer.write = counting_write  # type: ignore[method-assign]
+
+        await mgr.decide(ids[0], accepted=True)
+        await mgr.decide(ids[1], accepted=False, reason="bad video")
+        await mgr.submit(**submission(3))
+
+        # shutdown path: close() must persist both decisions and the new submission
+        await mgr.close()
+
+        assert writes == [2]
+        assert (await Applications.get(id=ids[0])).accepted is True
+        assert (await Applications.get(id=ids[1])).reason == "bad video"
+        assert await Applications.filter(nickname="Nick_3").exists()
+
+        await Tortoise.close_connections()
+
+    asyncio.run(_run())
+
+
+def test_pending_queue_and_keyset_listing():
+    async def _run():
+        await init_db()
+        for i in range(6):
+            await Applications.create(
+                **{**submission(i), "server": i % 2, "social": Socials.TIKTOK if i < 3 else Socials.VK}
+            )
+        decided = await Applications.create(**submission(99), accepted=True)
+
+        mgr = ApplicationManager()
+        await mgr.cache.load_initial_data()
+        assert len(mgr.cache.pending) == 6
+        assert decided.id not in mgr.cache.pending
+
+        # in-memory pages walk (date, id) order without gaps or repeats
+        seen, after = [], None
+        while page := mgr.list_pending(limit=4, after=after):
+            seen += [a.id for a in page]
+            after = (page[-1].date, page[-1].id)
+        db_order = [r.id for r in await Applications.filter(accepted__isnull=True).order_by("date", "id")]
+        assert seen == db_order
+
+        memory = [a.id for a in mgr.list_pending(server=1, social=Socials.VK)]
+        db = [
+            a.id
+            for a in await mgr.list_applications(
+                ApplicationStatus.PENDING, server=1, social=Socials.VK
+            )
+        ]
+        assert memory == db and memory
+
+        # a decision leaves the queue immediately
+        await mgr.decide(db_order[0], accepted=False, reason="dup")
+        assert db_order[0] not in [a.id for a in mgr.list_pending()]
+
+        rejected = await mgr.list_applications(ApplicationStatus.REJECTED)
+        assert rejected == []  # not synced yet
+        await mgr.sync()
+        rejected = await mgr.list_applications(ApplicationStatus.REJECTED)
+        assert [a.id for a in rejected] == [db_order[0]]
+
+        await Tortoise.close_connections()
+
+    asyncio.run(_run())
+
+
+def test_resubmissions_are_caught_before_writing():
+    async def _run():
+        await init_db()
+        await Applications.create(**submission(0))
+
+        mgr = ApplicationManager()
+        await mgr.cache.load_initial_data()
+        existing = await Applications.get(nickname="Nick_0")
+
+        # same account link spelled differently, same player on the same server
+        uid, created = await mgr.submit(
+            **{
+                **submission(1),
+                "nickname": "nick_0",
+                "link_acc": "www.YouTube.com/@nick0/?utm_source=tg",
+            }
+        )
+        assert (uid, created) == (existing.uid, False)
+        # the same account link alone is not a resubmission
+        other, created = await mgr.submit(**{**submission(2), "link_acc": existing.link_acc})
+        assert created and other != existing.uid
+
+        uid, created = await mgr.submit(**submission(3), link_video="youtu.be/v3")
+        assert created
+        # still buffered, yet a repeat of its video link is caught
+        again, created = await mgr.submit(**submission(4), link_video="https://youtu.be/v3")
+        assert (again, created) == (uid, False)
+
+        await mgr.sync()
+        assert await Applications.all().count() == 3
+
+        # a rejected application no longer blocks the player
+        rejected = await Applications.get(uid=uid)
+        await mgr.decide(rejected.id, False, "wrong account")
+        again, created = await mgr.submit(**submission(3), link_video="youtu.be/v3")
+        assert created and again != uid
+
+        await Tortoise.close_connections()
+
+    asyncio.run(_run())
+
+
+def test_rejected_applications_are_not_indexed_at_startup():
+    async def _run():
+        await init_db()
+        await Applications.create(**submission(0), accepted=False)
+        await Applications.create(**submission(1), accepted=True)
+
+        mgr = ApplicationManager()
+        await mgr.cache.load_initial_data()
+        assert len(mgr.cache.duplicates) == 1
+        _, created = await mgr.submit(**submission(0))
+        assert created
+        _, created = await mgr.submit(**submission(1))
+        assert not created
+
+        await Tortoise.close_connections()
+
+    asyncio.run(_run())
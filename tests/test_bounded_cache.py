@@ -0,0 +1,79 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from brvideo.core.managers.admins import AdminCacheManager, AdminRepository, _CachedAdmin
+from brvideo.core.managers.base import BaseManager
+
+
+class BoundedAdminCache(AdminCacheManager):
+    max_entries = 2
+    entry_ttl = 60.0
+
+
+class FakeRepo(AdminRepository):
+    def __init__(self, lock, rows):
+        super().__init__(lock)
+        self.rows = {row.id: row for row in rows}
+        self.loads: list[list[int]] = []
+
+    async def get_many(self, ids):
+        self.loads.append(list(ids))
+        return [self.rows[i] for i in ids if i in self.rows]
+
+
+def make_manager(n_rows: int = 5):
+    mgr = BaseManager(cache_cls=BoundedAdminCache)
+    rows = [SimpleNamespace(id=i, nickname=f"n{i}", tg_id=i * 10) for i in range(1, n_rows + 1)]
+    mgr.cache.repo = FakeRepo(mgr._lock, rows)
+    return mgr
+
+
+def test_read_through_and_lru_eviction():
+    mgr = make_manager()
+    cache = mgr.cache
+
+    async def _run():
+        assert (await cache.fetch(1)).nickname == "n1"
+        await cache.fetch(2)
+        await cache.fetch(1)  # hit, 1 becomes most recently used
+        await cache.fetch(3)  # evicts 2, the least recently used
+
+    asyncio.run(_run())
+    assert set(mgr._cache) == {1, 3}
+    assert mgr._cache.get_by("tg_id", 20) is None  # indexes follow evictions
+    assert cache.repo.loads == [[1], [2], [3]]
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.evictions) == (1, 3, 1)
+
+
+def test_dirty_entries_are_pinned_until_synced():
+    mgr = make_manager()
+    cache = mgr.cache
+    cache.sync_writer = None
+
+    async def _run():
+        async with mgr._lock:
+            for i in (1, 2, 3):
+                mgr._cache[i] = _CachedAdmin.model_validate({"id": i, "nickname": "d", "tg_id": i})
+                cache._mark_dirty(i)
+        await cache.fetch(4)  # over capacity, but nothing unpinned to evict except 4 itself
+        assert {1, 2, 3} <= set(mgr._cache)
+
+        async with mgr._lock:
+            cache._clear_synced({1: cache._versions[1], 2: cache._versions[2]}, [1, 2])
+
+    asyncio.run(_run())
+    assert 3 in mgr._cache  # still dirty
+    assert len(mgr._cache) == 2
+
+
+def test_expired_entries_are_reloaded():
+    mgr = make_manager()
+    cache = mgr.cache
+
+    asyncio.run(cache.fetch(1))
+    mgr._cache.stamps[1] = time.monotonic() - 3600  # loaded an hour ago
+    cache.repo.rows[1] = SimpleNamespace(id=1, nickname="fresh", tg_id=10)
+
+    assert cache.get(1) is None
+    assert asyncio.run(cache.fetch(1)).nickname == "fresh"
@@ -0,0 +1,98 @@
+import asyncio
+import uuid
+from typing import Optional
+
+import pytest
+from aiogram.types import CallbackQuery, User
+
+from brvideo.bot.keyboards.base import MagicKeyboard
+from brvideo.bot.keyboards.callbackdata import ApplicationDecision
+from brvideo.bot.keyboards.codec import CallbackPayloadStore, CompactCallbackData
+from brvideo.core.enums import Socials
+
+
+class Review(CompactCallbackData, prefix="rv"):
+    app_id: int
+    reviewer_id: int
+    action: str
+    social: Socials
+    reason: Optional[str] = None
+    ref: Optional[uuid.UUID] = None
+
+
+class Owned(CompactCallbackData, prefix="own"):
+    item: int
+    initiator_id: int = 0
+
+
+def test_roundtrip():
+    data = Review(
+        app_id=123456, reviewer_id=-(10**12), action="accept", social=Socials.TIKTOK,
+        ref=uuid.uuid4(),
+    )
+    packed = data.pack()
+    assert packed.startswith("rv.") and len(packed) <= 64
+    assert Review.unpack(packed) == data
+
+
+def test_decision_is_short_and_old_buttons_still_parse():
+    packed = ApplicationDecision(app_id=2**31, accepted=True).pack()
+    assert len(packed) < len(f"app:{2**31}:1")
+    assert ApplicationDecision.unpack("app:12:1") == ApplicationDecision(app_id=12, accepted=True)
+
+
+def test_long_payloads_go_through_the_store(monkeypatch):
+    store = CallbackPayloadStore(max_entries=10, ttl=60)
+    monkeypatch.setattr(Review, "store", store)
+    data = Review(app_id=1, reviewer_id=2, action="reject", social=Socials.VK, reason="ü" * 100)
+    packed = data.pack()
+    assert packed.startswith("rv~") and len(packed) <= 64
+    assert data.pack() == packed and len(store) == 1  # same payload, same key
+    assert Review.unpack(packed) == data
+
+    store.ttl = -1
+    data.pack()  # refreshed with an already elapsed expiry
+    with pytest.raises(ValueError):
+        Review.unpack(packed)
+
+
+@pytest.mark.parametrize(
+    "value", ["rv.", "rv.AAAA", "rv.!!", "rv~missing", "other.AA", "rv", "rv.gICAgICA"]
+)
+def test_malformed_data_is_a_value_error(value):
+    with pytest.raises(ValueError):
+        Review.unpack(value)
+
+
+def test_filter_skips_foreign_data():
+    user = User(id=1, is_bot=False, first_name="u")
+
+    async def _run(data: str):
+        query = CallbackQuery(id="1", from_user=user, chat_instance="c", data=data)
+        return await ApplicationDecision.filter()(query)
+
+    assert asyncio.run(_run("rv.AAAA")) is False
+    packed = ApplicationDecision(app_id=5, accepted=False).pack()
+    assert asyncio.run(_run(packed)) == {
+        "callback_data": ApplicationDecision(app_id=5, accepted=False)
+    }
+
+
+class OwnedKeyboard(MagicKeyboard):
+    def __init__(self, items: tuple):
+        for item in items:
+            self.row(self.cb(str(item), Owned(item=item)))
+        long = Review(app_id=1, reviewer_id=1, action="x" * 60, social=Socials.VK)
+        self.row(self.cb("Long", long))
+
+
+def test_compact_data_in_cached_keyboards(monkeypatch):
+    store = CallbackPayloadStore()
+    monkeypatch.setattr(Review, "store", store)
+    markup = OwnedKeyboard(77, (1, 2))
+    owned = Owned.unpack(markup.inline_keyboard[1][0].callback_data)
+    assert owned == Owned(item=2, initiator_id=77)
+    # stored payloads are put again on every render so they never outlive the template
+    store._entries.clear()
+    markup = OwnedKeyboard(78, (1, 2))
+    assert Review.unpack(markup.inline_keyboard[2][0].callback_data).action == "x" * 60
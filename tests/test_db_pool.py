@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from brvideo.core.config import DatabaseSettings, connection_config
+from brvideo.core.db import (
+    InstrumentedAsyncpgClient,
+    InstrumentedPool,
+    PoolMetrics,
+    read_connection,
+)
+from brvideo.core.metrics import Histogram
+
+
+class FakePool:
+    """Stands in for `asyncpg.Pool`: `size` connections, `acquire` waits."""
+
+    def __init__(self, size: int):
+        self._free = asyncio.Semaphore(size)
+        self.released = []
+
+    async def acquire(self, *, timeout=None):
+        await asyncio.wait_for(self._free.acquire(), timeout)
+        return object()
+
+    async def release(self, connection, *, timeout=None):
+        self.released.append(connection)
+        self._free.release()
+
+    def get_size(self):
+        return 2
+
+
+def test_postgres_urls_get_pool_settings():
+    db = DatabaseSettings(POOL_MAX=20, STATEMENT_CACHE_SIZE=0)
+    assert connection_config("sqlite://:memory:", db) == "sqlite://:memory:"
+
+    config = connection_config("postgres://u:p@db:5432/bot?minsize=4", db)
+    assert config["engine"].endswith("brvideo.core.db")
+    credentials = config["credentials"]
+    assert credentials["maxsize"] == 20 and credentials["statement_cache_size"] == 0
+    assert credentials["minsize"] == "4"  # the url wins
+    assert credentials["acquire_timeout"] == 10
+
+
+def test_client_keeps_acquire_timeout_out_of_create_pool():
+    client = InstrumentedAsyncpgClient(
+        connection_name="test-client", host="db", user="u", password="p", database="bot",
+        acquire_timeout=2.5, statement_cache_size=0,
+    )
+    assert client.acquire_timeout == 2.5
+    assert client.extra["statement_cache_size"] == 0
+    assert "acquire_timeout" not in client.extra
+    assert read_connection() is None  # no replica configured
+
+
+def test_pool_counts_busy_connections_and_waits():
+    async def _run():
+        metrics = PoolMetrics("test")
+        fake = FakePool(2)
+        pool = InstrumentedPool(fake, metrics, acquire_timeout=0.05)  # type: ignore[arg-type]
+
+        first, second = await pool.acquire(), await pool.acquire()
+        assert metrics.in_use == 2
+
+        waiting = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0.02)
+        await pool.release(first)
+        third = await waiting
+        assert metrics.acquire_wait.count == 3
+        assert metrics.acquire_wait.sum >= 0.02
+
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.acquire()
+        assert metrics.acquire_timeouts == 1
+
+        await pool.release(second)
+        await pool.release(third)
+        assert (metrics.in_use, metrics.max_in_use) == (0, 2)
+        assert pool.get_size() == 2  # everything else goes to the pool
+
+    asyncio.run(_run())
+
+
+def test_histogram_buckets():
+    histogram = Histogram("h", buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.75) == 1
+    assert histogram.quantile(1) == float("inf")
+    assert Histogram("empty").quantile(0.5) == 0
@@ -0,0 +1,136 @@
+import asyncio
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+from tortoise import Tortoise
+
+from brvideo.bot.handlers.applications import decide_application
+from brvideo.bot.keyboards.callbackdata import ApplicationDecision
+from brvideo.bot.services.digest import ApplicationDigest
+from brvideo.bot.services.send_queue import SendQueue
+from brvideo.core import managers
+from brvideo.core.config import settings
+from brvideo.core.enums import Socials
+from brvideo.core.managers.applications import ApplicationManager, _CachedApplication
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, **kwargs):
+        self.sent.append(kwargs)
+
+
+def submission(i: int) -> dict:
+    return {
+        "tg_id": 1000 + i,
+        "nickname": f"Nick<{i}>",
+        "server": 1,
+        "social": Socials.TIKTOK,
+        "link_acc": f"https://tiktok.com/@nick{i}",
+    }
+
+
+def test_new_applications_are_posted_in_digests():
+    async def _run():
+        await Tortoise.init(
+            db_url="sqlite://:memory:", modules={"models": ["brvideo.core.models"]}
+        )
+        await Tortoise.generate_schemas()
+        bot = FakeBot()
+        queue = SendQueue(bot)  # type: ignore[arg-type]
+        digest = ApplicationDigest(queue, chat_id=-100, thread_id=7, window=0.05, max_items=10)
+        mgr = ApplicationManager()
+        mgr.on_created(digest.add)
+
+        for i in range(25):
+            await mgr.submit(**submission(i))
+        await mgr.sync()
+        await asyncio.sleep(0.01)
+        # two full batches go out at once, the rest waits for the window
+        assert len(bot.sent) == 2
+        assert digest.depth == 5
+        await asyncio.sleep(0.1)
+        assert len(bot.sent) == 3
+        assert digest.stats.applications == 25
+        assert queue.stats.sent == 3 and queue.stats.coalesced == 0
+
+        first = bot.sent[0]
+        assert first["chat_id"] == -100 and first["message_thread_id"] == 7
+        assert "Nick&lt;0&gt;" in first["text"]
+        buttons = [b for row in first["reply_markup"].inline_keyboard for b in row]
+        assert len(buttons) == 20
+        decision = ApplicationDecision.unpack(buttons[1].callback_data)
+        assert decision.accepted is False
+        assert (await mgr.get(decision.app_id)).nickname == "Nick<0>"
+
+        await Tortoise.close_connections()
+
+    asyncio.run(_run())
+
+
+def test_close_sends_partial_batch():
+    async def _run():
+        bot = FakeBot()
+        queue = SendQueue(bot)  # type: ignore[arg-type]
+        digest = ApplicationDigest(queue, chat_id=1, window=60)
+        digest.add(
+            [
+                _CachedApplication(
+                    id=i,
+                    uid=uuid.uuid4(),
+                    date=datetime.now(),
+                    accepted=None,
+                    reason=None,
+                    link_video="https://youtu.be/v&1" if i == 1 else None,
+                    **submission(i),
+                )
+                for i in range(3)
+            ]
+        )
+        assert bot.sent == []
+        await digest.close()
+        await queue.close()
+        assert len(bot.sent) == 1
+        assert digest.depth == 0
+        lines = bot.sent[0]["text"].splitlines()
+        assert '<a href="https://youtu.be/v&amp;1">video</a>' in lines[2]
+        assert "video" not in lines[1] and "video" not in lines[3]
+
+    asyncio.run(_run())
+
+
+def test_second_decision_is_refused(monkeypatch):
+    answers = []
+
+    async def answer(text, show_alert=False):
+        answers.append((text, show_alert))
+
+    async def _run():
+        await Tortoise.init(
+            db_url="sqlite://:memory:", modules={"models": ["brvideo.core.models"]}
+        )
+        await Tortoise.generate_schemas()
+        mgr = ApplicationManager()
+        monkeypatch.setattr(managers, "applications", mgr)
+        monkeypatch.setattr(settings, "OWNERS", [5])
+        await mgr.submit(**submission(0))
+        await mgr.sync()
+        app_id = mgr.list_pending()[0].id
+
+        query = SimpleNamespace(from_user=SimpleNamespace(id=5), answer=answer)
+        for accepted in (True, False):
+            decision = ApplicationDecision(app_id=app_id, accepted=accepted)
+            await decide_application(query, decision)  # type: ignore[arg-type]
+        assert (await mgr.get(app_id)).accepted is True
+
+        await Tortoise.close_connections()
+        return app_id
+
+    app_id = asyncio.run(_run())
+    assert answers == [
+        (f"Application #{app_id} accepted", False),
+        (f"Application #{app_id} is already accepted", True),
+    ]
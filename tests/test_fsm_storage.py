@@ -0,0 +1,262 @@
+import asyncio
+from datetime import timedelta
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.methods import SendMessage
+from aiogram.types import Message, Update
+from tortoise import Tortoise
+
+from brvideo.bot.handlers import application_form
+from brvideo.bot.services.scheduler import UpdateScheduler
+from brvideo.bot.services.storage import ManagerStorage
+from brvideo.bot.states import ApplicationForm
+from brvideo.core import managers
+from brvideo.core.managers.fsm import FSMManager
+from brvideo.core.models import Applications, FSMStates
+
+KEY = StorageKey(bot_id=42, chat_id=7, user_id=7)
+
+
+async def init_db():
+    await Tortoise.init(
+        db_url="sqlite://:memory:", modules={"models": ["brvideo.core.models"]}
+    )
+    await Tortoise.generate_schemas()
+
+
+def test_transitions_are_coalesced_into_one_write():
+    async def _run():
+        await init_db()
+        mgr = FSMManager()
+        storage = ManagerStorage(mgr)
+
+        writes = []
+        write = mgr.cache.sync_writer.write
+
+        async def counting_write(upserts, deletes):
+            writes.append((len(upserts), len(deletes)))
+            await write(upserts, deletes)
+
+        mgr.cache.sync_writer.write = counting_write  # type: ignore[method-assign]
+
+        for step in ApplicationForm.__states__:
+            await storage.set_state(KEY, step)
+            await storage.update_data(KEY, {step.state: True})
+        await mgr.sync()
+
+        assert writes == [(1, 0)]
+        row = await FSMStates.get()
+        assert row.state == ApplicationForm.link_video.state
+        assert len(row.data) == 4
+
+        # a fresh process picks the form up from the db
+        restarted = ManagerStorage(FSMManager())
+        assert await restarted.get_state(KEY) == ApplicationForm.link_video.state
+        assert (await restarted.get_data(KEY)) == row.data
+
+        await storage.set_state(KEY, None)
+        await storage.set_data(KEY, {})
+        await mgr.sync()
+        assert len(writes) == 2  # clearing both fields is one delete
+        assert not await FSMStates.exists()
+
+        await Tortoise.close_connections()
+
+    asyncio.run(_run())
+
+
+def test_idle_users_are_cached_without_queries():
+    async def _run():
+        await init_db()
+        mgr = FSMManager()
+        storage = ManagerStorage(mgr)
+
+        queries = []
+        get_many = mgr.cache.repo.get_many
+
+        async def counting_get_many(ids):
+            queries.append(ids)
+            return await get_many(ids)
+
+        mgr.cache.repo.get_many = counting_get_many  # type: ignore[method-assign]
+
+        for _ in range(5):
+            assert await storage.get_state(KEY) is None
+            assert await storage.get_data(KEY) == {}
+        assert len(queries) == 1
+
+        data = await storage.get_data(KEY)
+        data["mutated"] = True
+        assert await storage.get_data(KEY) == {}
+
+        await Tortoise.close_connections()
+
+    asyncio.run(_run())
+
+
+def test_other_processes_see_a_state_once_their_entry_expires():
+    async def _run():
+        await init_db()
+        first, second = FSMManager(), FSMManager()
+        assert await ManagerStorage(second).get_state(KEY) is None  # cached as empty
+
+        await ManagerStorage(first).set_state(KEY, ApplicationForm.server)
+        await first.sync()
+        second.cache.entry_ttl = 0.05  # type: ignore[misc]
+        await asyncio.sleep(0.1)
+        assert await ManagerStorage(second).get_state(KEY) == ApplicationForm.server.state
+
+        await Tortoise.close_connections()
+
+    asyncio.run(_run())
+
+
+def test_abandoned_forms_are_cleaned_up():
+    async def _run():
+        await init_db()
+        mgr = FSMManager()
+        storage = ManagerStorage(mgr)
+        await storage.set_state(KEY, ApplicationForm.server)
+        await mgr.sync()
+
+        mgr.cache.state_ttl = timedelta(seconds=-1)
+        await mgr.cache.reload_from_db()
+        assert not await FSMStates.exists()
+        assert mgr.cache.get("fsm:7:7") is None
+
+        await Tortoise.close_connections()
+
+    asyncio.run(_run())
+
+
+class ReplySession(BaseSession):
+    """Answers sendMessage locally and records the texts."""
+
+    def __init__(self):
+        super().__init__()
+        self.texts = []
+
+    async def make_request(self, bot, method, timeout=None):
+        assert isinstance(method, SendMessage)
+        self.texts.append(method.text)
+        return Message.model_validate(
+            {"message_id": 1, "date": 0, "chat": {"id": method.chat_id, "type": "private"}}
+        )
+
+    async def stream_content(self, *args, **kwargs):
+        raise NotImplementedError
+        yield b""
+
+    async def close(self):
+        pass
+
+
+ANSWERS = ["/apply", "Nick_Name", "12", "youtube.com/@nick", "youtu.be/abc"]
+
+
+def _form_update(i: int, text: str) -> Update:
+    return Update.model_validate(
+        {
+            "update_id": i,
+            "message": {
+                "message_id": i,
+                "date": 0,
+                "chat": {"id": 7, "type": "private"},
+                "from": {"id": 7, "is_bot": False, "first_name": "u"},
+                "text": text,
+            },
+        }
+    )
+
+
+def test_application_form_submits_through_the_storage():
+    async def _run():
+        await init_db()
+        fsm = FSMManager()
+        dp = Dispatcher(storage=ManagerStorage(fsm))
+        dp.include_router(application_form.router)
+        session = ReplySession()
+        bot = Bot("42:TEST", session=session)
+
+        for i, text in enumerate(ANSWERS):
+            await dp.feed_update(bot, _form_update(i, text))
+        assert session.texts[-1] == "Application sent for review."
+
+        await managers.applications.sync()
+        row = await Applications.get()
+        assert (row.nickname, row.server, row.social.value) == ("Nick_Name", 12, "youtube")
+        assert row.link_video == "youtu.be/abc"
+        assert (await fsm.get_record("fsm:7:7")).empty
+
+        await Tortoise.close_connections()
+
+    try:
+        asyncio.run(_run())
+    finally:
+        # the module router is shared with the bot's root router, detach it
+        # so `BotService.initialize` can still include it
+        application_form.router._parent_router = None
+
+
+def test_form_steps_sent_at_once_see_the_previous_step():
+    async def _run():
+        await init_db()
+        dp = Dispatcher(storage=ManagerStorage(FSMManager()))
+        UpdateScheduler(concurrency=4).install(dp)
+        dp.include_router(application_form.router)
+        session = ReplySession()
+        bot = Bot("42:TEST", session=session)
+
+        # each step's state is read only after the previous step set it;
+        # another player than in the test above, the managers are shared
+        answers = ["/apply", "Other_Nick", "3", "tiktok.com/@other", "tiktok.com/@other/video/1"]
+        await asyncio.gather(
+            *(dp.feed_update(bot, _form_update(i, text)) for i, text in enumerate(answers))
+        )
+        assert session.texts == [
+            "Your in-game nickname:",
+            "Server number:",
+            "Link to your channel or account:",
+            "Link to the video:",
+            "Application sent for review.",
+        ]
+
+        await Tortoise.close_connections()
+
+    try:
+        asyncio.run(_run())
+    finally:
+        application_form.router._parent_router = None
+
+
+def test_form_survives_a_failed_submit(monkeypatch):
+    async def failing_submit(**fields):
+        raise ConnectionError("db is down")
+
+    async def _run():
+        await init_db()
+        fsm = FSMManager()
+        dp = Dispatcher(storage=ManagerStorage(fsm))
+        dp.include_router(application_form.router)
+        bot = Bot("42:TEST", session=ReplySession())
+
+        answers = ["/apply", "Third_Nick", "5", "vk.com/third"]
+        for i, text in enumerate(answers):
+            await dp.feed_update(bot, _form_update(i, text))
+        monkeypatch.setattr(managers.applications, "submit", failing_submit)
+        try:
+            await dp.feed_update(bot, _form_update(9, "vk.com/video-1_2"))
+        except ConnectionError:
+            pass
+        record = await fsm.get_record("fsm:7:7")
+        assert record.state == ApplicationForm.link_video.state
+        assert record.data["nickname"] == "Third_Nick"
+
+        await Tortoise.close_connections()
+
+    try:
+        asyncio.run(_run())
+    finally:
+        application_form.router._parent_router = None
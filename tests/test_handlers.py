@@ -0,0 +1,48 @@
+import json
+import os
+
+from brvideo.bot import handlers
+from brvideo.bot.handlers import application_form, primary
+
+
+def test_routers_come_from_package_modules(tmp_path, monkeypatch):
+    monkeypatch.setattr(handlers, "MANIFEST_PATH", tmp_path / "routers.json")
+    routers = handlers.find_routers()
+    assert routers[0] is primary.router  # primary handlers run first
+    # the same module objects a regular import gives, not second copies
+    assert application_form.router in routers
+    assert "applications" in json.loads((tmp_path / "routers.json").read_text())["modules"]
+
+
+def test_manifest_is_reused_until_a_handler_changes(tmp_path, monkeypatch):
+    path = tmp_path / "routers.json"
+    manifest = handlers.load_manifest(path)
+
+    def rebuild(folder):
+        rebuilds.append(folder)
+        return manifest
+
+    rebuilds = []
+    monkeypatch.setattr(handlers, "build_manifest", rebuild)
+    assert handlers.load_manifest(path) == manifest
+    assert rebuilds == []
+
+    stale = {**manifest, "mtimes": {**manifest["mtimes"], "start.py": 0}}
+    path.write_text(json.dumps(stale))
+    handlers.load_manifest(path)
+    path.write_text("{broken")
+    handlers.load_manifest(path)
+    assert len(rebuilds) == 2
+
+
+def test_snapshot_notices_added_files(tmp_path):
+    (tmp_path / "a.py").write_text("")
+    (tmp_path / "nested").mkdir()
+    mtimes = handlers._snapshot(tmp_path)
+    assert sorted(mtimes) == [".", "a.py", "nested"]
+    assert handlers._is_current(mtimes, tmp_path)
+
+    (tmp_path / "nested" / "b.py").write_text("")
+    os.utime(tmp_path / "nested", ns=(0, 0))
+    assert not handlers._is_current(mtimes, tmp_path)
+    assert handlers._module_names(handlers._snapshot(tmp_path)) == ["a", "nested.b"]
@@ -0,0 +1,69 @@
+from brvideo.core.managers.admins import _CachedAdmin
+from brvideo.core.managers.base import IndexedCache
+
+
+def make_admin(id: int, tg_id: int, nickname: str = "n") -> _CachedAdmin:
+    return _CachedAdmin.model_validate({"id": id, "nickname": nickname, "tg_id": tg_id})
+
+
+def test_unique_index_follows_set_replace_and_pop():
+    cache = IndexedCache(unique=("tg_id",))
+    a = make_admin(1, 100)
+    cache[1] = a
+    assert cache.get_by("tg_id", 100) is a
+
+    # replacing the entry under the same key moves the index to the new value
+    b = make_admin(1, 200)
+    cache[1] = b
+    assert cache.get_by("tg_id", 100) is None
+    assert cache.get_by("tg_id", 200) is b
+
+    cache.pop(1)
+    assert cache.get_by("tg_id", 200) is None
+    assert cache.pop(1, None) is None
+
+
+def test_unique_index_is_not_dropped_by_stale_entry():
+    cache = IndexedCache(unique=("tg_id",))
+    cache[1] = make_admin(1, 100)
+    newer = make_admin(2, 100)
+    cache[2] = newer
+
+    # removing the older holder of tg_id=100 must not unindex the newer one
+    del cache[1]
+    assert cache.get_by("tg_id", 100) is newer
+
+
+def test_multi_index_and_bulk_mutations():
+    cache = IndexedCache(unique=("tg_id",), multi=("nickname",))
+    cache.update({1: make_admin(1, 10, "x"), 2: make_admin(2, 20, "x")})
+    cache.setdefault(3, make_admin(3, 30, "y"))
+
+    assert {a.id for a in cache.filter_by("nickname", "x")} == {1, 2}
+    assert cache.filter_by("nickname", "z") == ()
+
+    cache.popitem()
+    assert cache.filter_by("nickname", "y") == ()
+
+    cache.clear()
+    assert cache.get_by("tg_id", 10) is None
+    assert cache.filter_by("nickname", "x") == ()
+
+
+def test_snapshot_is_stable_until_next_mutation():
+    cache = IndexedCache(unique=("tg_id",))
+    cache[1] = make_admin(1, 10)
+
+    snap = cache.snapshot()
+    assert cache.snapshot() is snap  # reused while nothing changes
+
+    cache[2] = make_admin(2, 20)
+    assert 2 not in snap  # old snapshot is untouched by writes
+    assert 2 in cache.snapshot()
+
+    try:
+        snap[3] = make_admin(3, 30)  # type: ignore[index]
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("snapshot must be read-only")
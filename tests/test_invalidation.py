@@ -0,0 +1,149 @@
+import asyncio
+
+from tortoise import Tortoise
+
+from brvideo.core.managers.admins import AdminManager
+from brvideo.core.managers.base import MemoryInvalidationBus, PostgresInvalidationBus
+from brvideo.core.managers.base import invalidation
+from brvideo.core.models import Admins
+
+
+def test_peers_apply_published_changes_and_deletions():
+    async def _run():
+        await Tortoise.init(
+            db_url="sqlite://:memory:", modules={"models": ["brvideo.core.models"]}
+        )
+        await Tortoise.generate_schemas()
+
+        peers: list[MemoryInvalidationBus] = []
+        a, b = AdminManager(), AdminManager()
+        await a.attach_bus(MemoryInvalidationBus(peers))
+        await b.attach_bus(MemoryInvalidationBus(peers))
+
+        # worker A adds an admin; B learns about it on A's sync, not on a reload
+        await a.add_admin(tg_id=1, nickname="first")
+        assert not await b.is_admin(1)
+        await a.cache.sync()
+        assert await b.is_admin(1)
+
+        # deletions travel the same way
+        await a.del_admin(tg_id=1)
+        await a.cache.sync()
+        assert not await Admins.filter(tg_id=1).exists()
+        assert not await b.is_admin(1)
+
+        await Tortoise.close_connections()
+
+    asyncio.run(_run())
+
+
+def test_invalidation_keeps_local_dirty_entries():
+    async def _run():
+        await Tortoise.init(
+            db_url="sqlite://:memory:", modules={"models": ["brvideo.core.models"]}
+        )
+        await Tortoise.generate_schemas()
+
+        row = await Admins.create(nickname="db", tg_id=5)
+        mgr = AdminManager()
+        await mgr.edit_admin(tg_id=5, nickname="local")
+
+        await mgr.cache.apply_invalidation([row.id])
+        assert mgr.cache.get(row.id).nickname == "local"
+
+        await Tortoise.close_connections()
+
+    asyncio.run(_run())
+
+
+def test_reconnected_peers_catch_up_from_the_db():
+    async def _run():
+        await Tortoise.init(
+            db_url="sqlite://:memory:", modules={"models": ["brvideo.core.models"]}
+        )
+        await Tortoise.generate_schemas()
+
+        await Admins.create(nickname="gone", tg_id=1)
+        mgr = AdminManager()
+        bus = MemoryInvalidationBus()
+        await mgr.cache.load_initial_data()
+        await mgr.attach_bus(bus)
+
+        # changed by a peer while this bus was disconnected: nothing arrives
+        await Admins.filter(tg_id=1).delete()
+        await Admins.create(nickname="new", tg_id=2)
+
+        await bus._reconnected()
+        assert not await mgr.is_admin(1)
+        assert await mgr.is_admin(2)
+
+        await Tortoise.close_connections()
+
+    asyncio.run(_run())
+
+
+class _Connection:
+    def __init__(self, healthy: bool = True):
+        self.healthy = healthy
+        self.channels: set[str] = set()
+        self.closed = False
+        self._on_termination = []
+
+    async def add_listener(self, channel, callback):
+        self.channels.add(channel)
+
+    def add_termination_listener(self, callback):
+        self._on_termination.append(callback)
+
+    async def execute(self, query, *args, timeout=None):
+        if not self.healthy:
+            raise TimeoutError
+
+    def is_closed(self):
+        return self.closed
+
+    def terminate(self):
+        self.closed = True
+        for callback in self._on_termination:
+            asyncio.get_running_loop().call_soon(callback, self)
+
+    async def close(self):
+        self.closed = True
+
+
+def test_postgres_bus_reconnects_and_listens_again(monkeypatch):
+    connections = [_Connection(), _Connection(healthy=False), _Connection()]
+    pending = iter(connections)
+
+    async def connect(dsn):
+        return next(pending)
+
+    monkeypatch.setattr(invalidation.asyncpg, "connect", connect)
+
+    async def _run():
+        bus = PostgresInvalidationBus("postgres://localhost/db")
+        bus.health_interval = 0.01
+        reconnects = []
+
+        async def on_reconnect():
+            reconnects.append(bus._conn)
+
+        async def on_keys(keys):
+            pass
+
+        bus.on_reconnect(on_reconnect)
+        await bus.subscribe("cache_admins", on_keys)
+
+        # the server drops the connection
+        connections[0].terminate()
+        # the new one stops answering: found by the health check
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if len(reconnects) == 2:
+                break
+        await bus.close()
+        return reconnects
+
+    reconnects = asyncio.run(_run())
+    assert reconnects == connections[1:]
+    assert all(conn.channels == {"cache_admins"} for conn in connections)
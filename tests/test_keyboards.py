@@ -0,0 +1,79 @@
+from aiogram.filters.callback_data import CallbackData
+
+from brvideo.bot.keyboards.base import MagicKeyboard, _template_key
+from brvideo.bot.keyboards.keyboards import ApplicationsDigestKeyboard
+
+
+class Pick(CallbackData, prefix="pick"):
+    item: int
+    initiator_id: int = 0
+    action: str = "go"
+
+
+class PickKeyboard(MagicKeyboard):
+    def __init__(self, items: tuple, back: str = "menu"):
+        for item in items:
+            self.row(self.cb(f"#{item}", Pick(item=item)))
+        self.row(self.cb("Back", back), self.url("Help", "https://example.com"))
+
+
+class EagerPickKeyboard(PickKeyboard):
+    cache_templates = False
+
+
+class StaticKeyboard(MagicKeyboard):
+    def __init__(self):
+        self.row(self.cb("A", "a"), self.cb("B", "b"))
+
+
+def test_template_render_matches_a_fresh_build():
+    for initiator in (1, 42, 10**12):
+        cached = PickKeyboard(initiator, (1, 2, 3), back="home")
+        fresh = EagerPickKeyboard(initiator, (1, 2, 3), back="home")
+        assert cached == fresh
+        data = Pick.unpack(cached.inline_keyboard[1][0].callback_data)
+        assert (data.item, data.initiator_id, data.action) == (2, initiator, "go")
+
+
+def test_static_keyboards_are_memoized():
+    assert StaticKeyboard(1) is StaticKeyboard(2)
+    # layouts depending on different arguments are cached separately
+    assert PickKeyboard(1, (1,)) != PickKeyboard(1, (2,))
+
+
+class ValueKeyboard(MagicKeyboard):
+    def __init__(self, *values, last=None):
+        self.row(*(self.cb(repr(value), "v") for value in (*values, last)))
+
+
+def test_equal_values_of_different_types_are_cached_apart():
+    def labels(keyboard):
+        return [button.text for button in keyboard.inline_keyboard[0]]
+
+    assert [labels(ValueKeyboard(1, (value,))) for value in (1, True, 1.0)] == [
+        ["(1,)", "None"],
+        ["(True,)", "None"],
+        ["(1.0,)", "None"],
+    ]
+    assert labels(ValueKeyboard(1, last=1)) == ["1"]
+    assert labels(ValueKeyboard(1, last=True)) == ["True"]
+
+
+def test_unhashable_arguments_are_built_every_time():
+    first = ApplicationsDigestKeyboard(0, (i for i in (1, 2)))
+    second = ApplicationsDigestKeyboard(0, (i for i in (3,)))
+    assert len(first.inline_keyboard) == 2 and len(second.inline_keyboard) == 1
+
+
+def test_template_cache_is_bounded():
+    templates = MagicKeyboard._templates
+    size = PickKeyboard.template_cache_size
+    try:
+        PickKeyboard.template_cache_size = 3
+        templates.clear()
+        for i in range(10):
+            PickKeyboard(1, (i,))
+        assert len(templates) == 3
+        assert _template_key(PickKeyboard, ((9,),), {}) in templates
+    finally:
+        PickKeyboard.template_cache_size = size
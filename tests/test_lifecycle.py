@@ -0,0 +1,120 @@
+import asyncio
+import contextvars
+
+import pytest
+from tortoise import Tortoise
+
+from brvideo.core import models
+from brvideo.core.lifecycle import StepGraph
+
+
+def test_independent_steps_run_concurrently():
+    async def _run():
+        order = []
+
+        def step(name: str, delay: float):
+            async def run():
+                order.append(f"{name}+")
+                await asyncio.sleep(delay)
+                order.append(f"{name}-")
+
+            return run
+
+        graph = StepGraph("test")
+        graph.add("db", step("db", 0.05))
+        graph.add("import", step("import", 0.05))
+        graph.add("cache", step("cache", 0), after=["db"])
+        graph.add("bot", step("bot", 0), after=["import", "cache"])
+        timings = await graph.run()
+
+        assert order[:2] == ["db+", "import+"]
+        assert order.index("cache+") > order.index("db-")
+        assert order[-2:] == ["bot+", "bot-"]
+        # the two slow steps overlapped
+        assert timings["bot"].started < 0.09
+        assert set(timings) == {"db", "import", "cache", "bot"}
+
+    asyncio.run(_run())
+
+
+def test_failures_cancel_startup_but_not_shutdown():
+    async def _run():
+        ran = []
+
+        async def boom():
+            raise RuntimeError("boom")
+
+        async def slow():
+            await asyncio.sleep(10)
+
+        async def record():
+            ran.append(True)
+
+        startup = StepGraph("startup")
+        startup.add("boom", boom).add("slow", slow).add("after", record, after=["boom"])
+        with pytest.raises(RuntimeError):
+            await startup.run()
+        assert ran == [] and startup.timings["boom"].failed
+
+        shutdown = StepGraph("shutdown", keep_going=True)
+        shutdown.add("boom", boom).add("after", record, after=["boom"])
+        await shutdown.run()
+        assert ran == [True]
+
+    asyncio.run(_run())
+
+
+connection = contextvars.ContextVar("connection", default=None)
+
+
+def test_context_set_by_a_step_is_shared():
+    async def _run():
+        seen = []
+
+        async def connect():
+            connection.set("db")  # like Tortoise.init on tortoise >= 1.0
+
+        async def warm_up():
+            seen.append(connection.get())
+
+        graph = StepGraph("test").add("db", connect).add("cache", warm_up, after=["db"])
+        await graph.run()
+        assert seen == ["db"]
+        assert connection.get() == "db"
+
+    asyncio.run(_run())
+
+
+def test_bad_graphs_are_rejected():
+    async def noop():
+        pass
+
+    graph = StepGraph("test").add("a", noop, after=["b"]).add("b", noop, after=["a"])
+    with pytest.raises(ValueError, match="depend on each other"):
+        asyncio.run(graph.run())
+    with pytest.raises(ValueError, match="Unknown step"):
+        asyncio.run(StepGraph("test").add("a", noop, after=["missing"]).run())
+
+
+def test_schema_generation_skipped_only_for_applied_migrations(tmp_path):
+    async def _run():
+        await Tortoise.init(
+            db_url="sqlite://:memory:",
+            modules={"models": ["brvideo.core.models", "aerich.models"]},
+        )
+        from aerich.models import Aerich
+
+        assert not await models.migrations_applied(tmp_path)  # no migrations
+        (tmp_path / "0_20250101000000_init.py").write_text("")
+        assert not await models.migrations_applied(tmp_path)  # no aerich table
+
+        await Tortoise.generate_schemas()
+        assert not await models.migrations_applied(tmp_path)
+        await Aerich.create(version="0_20250101000000_init.py", app="models", content={})
+        assert await models.migrations_applied(tmp_path)
+
+        (tmp_path / "1_20250201000000_update.py").write_text("")
+        assert not await models.migrations_applied(tmp_path)
+        await Tortoise.close_connections()
+
+    asyncio.run(_run())
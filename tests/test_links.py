@@ -0,0 +1,192 @@
+import asyncio
+import uuid
+
+from tortoise import Tortoise
+
+from brvideo.core.enums import Socials
+from brvideo.core.links import (
+    BaseLinkResolver,
+    LinkValidator,
+    LinkVerdict,
+    VerdictCache,
+    detect_social,
+    normalize_link,
+)
+from brvideo.core.managers.applications import ApplicationManager, DuplicateIndex
+from brvideo.core.models import Applications
+
+
+class StubResolver(BaseLinkResolver):
+    """Accepts every link except those containing `bad`, counting calls."""
+
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+
+    async def resolve(self, normalized: str) -> LinkVerdict:
+        self.calls.append(normalized)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        if "bad" in normalized:
+            return LinkVerdict(normalized, detect_social(normalized), False, "stub says no")
+        return LinkVerdict(normalized, detect_social(normalized), True)
+
+
+def test_normalize_link():
+    assert normalize_link(" WWW.YouTube.com/watch?v=abc&utm_source=x#t=1 ") == (
+        "https://youtube.com/watch?v=abc"
+    )
+    assert normalize_link("http://m.tiktok.com/@nick/") == "https://tiktok.com/@nick"
+    assert detect_social(normalize_link("twitch.tv/nick")) is Socials.TWITCH
+    assert detect_social(normalize_link("example.com/nick")) is None
+
+
+def test_malformed_links_do_not_raise():
+    for text in ("https://[::1", "youtube.com/@x[", "[abc]:99999"):
+        detect_social(normalize_link(text))
+    assert normalize_link(" http://[abc ") == "http://[abc"
+    assert detect_social(normalize_link("http://[abc")) is None
+
+    async def _run():
+        validator = LinkValidator(workers=1)
+        verdict = await validator.validate("http://[abc")
+        assert not verdict.valid and verdict.reason == "unsupported platform"
+        await validator.close()
+
+    asyncio.run(_run())
+
+    index = DuplicateIndex()
+    index.add(uuid.uuid4(), "http://[abc", "nick", 1, link_video="https://[::1")
+    assert index.find("http://[abc", "nick", 1) is not None
+
+
+def test_validator_caches_and_shares_inflight_resolutions():
+    async def _run():
+        resolver = StubResolver()
+        validator = LinkValidator(resolver, workers=2)
+
+        links = [f"https://youtube.com/@n{i % 5}?utm=1" for i in range(20)]
+        verdicts = await asyncio.gather(*(validator.validate(link) for link in links))
+        assert all(v.valid for v in verdicts)
+        assert len(resolver.calls) == 5  # one per distinct normalized link
+        assert resolver.max_active == 2
+
+        await validator.validate("youtube.com/@n0")
+        assert len(resolver.calls) == 5
+        await validator.close()
+
+    asyncio.run(_run())
+
+
+def test_verdict_cache_lru_and_ttl():
+    cache = VerdictCache(max_entries=2, ttl=60)
+    a, b, c = (LinkVerdict(f"https://vk.com/{x}", Socials.VK, True) for x in "abc")
+    cache.put(a)
+    cache.put(b)
+    assert cache.get(a.normalized) == a  # a is now most recent
+    cache.put(c)
+    assert cache.get(b.normalized) is None
+    assert len(cache) == 2
+
+    cache.ttl = -1
+    assert cache.get(a.normalized) is None
+
+
+def test_manager_rejects_bad_links_in_background():
+    async def _run():
+        await Tortoise.init(
+            db_url="sqlite://:memory:", modules={"models": ["brvideo.core.models"]}
+        )
+        await Tortoise.generate_schemas()
+        mgr = ApplicationManager()
+        mgr.cache.validator = LinkValidator(StubResolver(delay=0.05))
+
+        common = {"server": 1, "social": Socials.YOUTUBE}
+        # verdict arrives while the draft is still buffered
+        await mgr.submit(nickname="a", link_acc="youtube.com/@bad_a", **common)
+        await asyncio.sleep(0.1)
+        # verdict arrives after the draft was written
+        await mgr.submit(nickname="b", link_acc="youtube.com/@bad_b", **common)
+        await mgr.submit(
+            nickname="c", link_acc="youtube.com/@ok", link_video="youtu.be/xyz", **common
+        )
+        await mgr.sync()
+
+        await mgr.close()
+        rows = {row.nickname: row for row in await Applications.all()}
+        assert rows["a"].accepted is False and "stub says no" in rows["a"].reason
+        assert rows["b"].accepted is False
+        assert rows["c"].accepted is None and rows["c"].link_video == "youtu.be/xyz"
+        assert len(mgr.list_pending()) == 1
+        # the rejected players may apply again
+        assert mgr.cache.duplicates.find("youtube.com/@bad_a", "a", 1) is None
+        assert mgr.cache.duplicates.find("youtube.com/@bad_b", "b", 1) is None
+        assert len(mgr.cache.duplicates) == 1
+
+        await Tortoise.close_connections()
+
+    asyncio.run(_run())
+
+
+def test_validate_cancelled_on_full_queue_leaves_nothing_inflight():
+    async def _run():
+        validator = LinkValidator(StubResolver(delay=0.05), workers=1, queue_size=1)
+        first = asyncio.create_task(validator.validate("vk.com/a"))
+        await asyncio.sleep(0)  # the worker takes `a`, `b` fills the queue
+        second = asyncio.create_task(validator.validate("vk.com/b"))
+        blocked = asyncio.create_task(validator.validate("vk.com/c"))
+        await asyncio.sleep(0.01)
+        blocked.cancel()
+        await asyncio.gather(blocked, return_exceptions=True)
+        assert normalize_link("vk.com/c") not in validator._inflight
+
+        await asyncio.gather(first, second)
+        verdict = await asyncio.wait_for(validator.validate("vk.com/c"), 1)
+        assert verdict.valid
+        await validator.close()
+
+    asyncio.run(_run())
+
+
+def test_manager_rejects_bad_links_flushing_or_evicted():
+    async def _run():
+        await Tortoise.init(
+            db_url="sqlite://:memory:", modules={"models": ["brvideo.core.models"]}
+        )
+        await Tortoise.generate_schemas()
+        mgr = ApplicationManager()
+        mgr.cache.validator = LinkValidator(StubResolver(delay=0.05))
+        repo = mgr.cache.repo
+        create_many = repo.create_many
+
+        async def slow_create_many(drafts):
+            await asyncio.sleep(0.1)
+            return await create_many(drafts)
+
+        common = {"server": 1, "social": Socials.YOUTUBE}
+        # verdict arrives while the insert is in flight
+        repo.create_many = slow_create_many
+        await mgr.submit(nickname="a", link_acc="youtube.com/@bad_a", **common)
+        await mgr.cache.flush_new()
+        repo.create_many = create_many
+
+        # verdict arrives after the entry left the cache
+        mgr.cache.validator.resolver.delay = 0.1
+        uid, _ = await mgr.submit(nickname="b", link_acc="youtube.com/@bad_b", **common)
+        await mgr.cache.flush_new()
+        async with mgr.cache._lock:
+            mgr.cache._cache.pop(mgr.cache.get_by("uid", uid).id)
+        await mgr.close()
+
+        rows = {row.nickname: row for row in await Applications.all()}
+        assert rows["a"].accepted is False and "stub says no" in rows["a"].reason
+        assert rows["b"].accepted is False
+        assert not mgr.cache._flushing and not mgr.cache._late_rejections
+
+        await Tortoise.close_connections()
+
+    asyncio.run(_run())
@@ -0,0 +1,78 @@
+import io
+import logging
+import sys
+import threading
+
+from loguru import logger
+
+from brvideo.core.logging import InterceptHandler, setup_logger
+
+
+def _restore_logging():
+    logger.remove()
+    logger.add(sys.stderr)
+    logging.basicConfig(handlers=[], level=logging.WARNING, force=True)
+
+
+def test_intercepted_records_keep_their_origin():
+    records = []
+    sink = logger.add(lambda message: records.append(message.record), level="DEBUG")
+    stdlib = logging.getLogger("tests.intercept")
+    stdlib.propagate = False
+    stdlib.addHandler(InterceptHandler())
+    try:
+        stdlib.warning("disk %s full", "/tmp")
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            stdlib.exception("failed")
+    finally:
+        logger.remove(sink)
+        stdlib.handlers.clear()
+
+    warning, error = records
+    assert (warning["name"], warning["level"].name) == ("tests.intercept", "WARNING")
+    assert warning["function"] == "test_intercepted_records_keep_their_origin"
+    assert warning["message"] == "disk /tmp full"
+    assert error["level"].name == "ERROR" and error["exception"].type is ValueError
+
+
+def test_background_sinks_write_off_the_calling_thread(tmp_path):
+    class Stream(io.StringIO):
+        threads = set()
+
+        def write(self, message):
+            self.threads.add(threading.current_thread())
+            return super().write(message)
+
+    stream = Stream()
+    try:
+        setup_logger(
+            logfile=str(tmp_path / "bot.log"), level="INFO", background=True, stream=stream
+        )
+        for i in range(2000):
+            logger.info(f"record {i}")
+        logger.remove()  # waits for the queued messages to be written
+    finally:
+        _restore_logging()
+
+    assert threading.current_thread() not in Stream.threads
+    lines = stream.getvalue().splitlines()
+    assert [line.rsplit(" ", 1)[1] for line in lines] == [str(i) for i in range(2000)]
+    assert len((tmp_path / "bot.log").read_text().splitlines()) == 2000
+
+
+def test_setup_gates_stdlib_levels(tmp_path):
+    stream = io.StringIO()
+    try:
+        setup_logger(logfile=str(tmp_path / "bot.log"), level="WARNING", stream=stream)
+        lib = logging.getLogger("tests.lib")
+        assert not lib.isEnabledFor(logging.DEBUG)  # returns before building a record
+        lib.info("to the file only")
+        lib.warning("everywhere")
+        logger.remove()
+        assert "to the file only" not in stream.getvalue()
+        assert "tests.lib" in stream.getvalue() and "everywhere" in stream.getvalue()
+        assert "to the file only" in (tmp_path / "bot.log").read_text()
+    finally:
+        _restore_logging()
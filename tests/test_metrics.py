@@ -0,0 +1,192 @@
+import asyncio
+import threading
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.types import Message, Update
+from aiohttp.test_utils import TestClient, TestServer
+
+from brvideo.bot.middlewares.metrics import HandlerMetricsMiddleware
+from brvideo.bot.services.metrics import MetricsExporter
+from brvideo.core import metrics
+from brvideo.core.managers.admins import AdminCacheManager, _CachedAdmin
+from brvideo.core.managers.base import BaseManager, BaseSyncWriter
+from brvideo.core.metrics import Registry, TimedLock
+
+
+@dataclass
+class _Stats:
+    sent: int = 0
+    failed: int = 0
+
+
+class _Writer(BaseSyncWriter):
+    async def write(self, upserts, deletes):
+        await asyncio.sleep(0.01)
+
+
+def test_render_prometheus_text():
+    registry = Registry()
+    registry.counter("events_total", "Events seen", {"kind": 'a"b'}).inc(3)
+    registry.gauge("depth", read=lambda: 1.5)
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+    for value in (0.05, 0.5, 2):
+        histogram.observe(value)
+    stats = _Stats(sent=2)
+    registry.stats("queue", stats, {"name": "main"})
+    stats.failed += 1  # read on collection
+
+    assert registry.render().splitlines() == [
+        "# HELP events_total Events seen",
+        "# TYPE events_total counter",
+        'events_total{kind="a\\"b"} 3',
+        "# TYPE depth gauge",
+        "depth 1.5",
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1"} 2',
+        'latency_seconds_bucket{le="+Inf"} 3',
+        "latency_seconds_sum 2.55",
+        "latency_seconds_count 3",
+        "# TYPE queue_sent_total counter",
+        'queue_sent_total{name="main"} 2',
+        "# TYPE queue_failed_total counter",
+        'queue_failed_total{name="main"} 1',
+    ]
+
+
+def test_disabled_registry_hands_out_plain_locks():
+    assert type(Registry().lock("pool")) is asyncio.Lock
+    assert len(Registry()) == 0
+
+    registry = Registry(enabled=True)
+    lock = registry.lock("pool")
+    assert isinstance(lock, TimedLock)
+
+    async def _run():
+        async with lock:
+            waiter = asyncio.create_task(lock.acquire())
+            await asyncio.sleep(0.02)
+        await waiter
+        lock.release()
+
+    asyncio.run(_run())
+    assert lock.wait.count == 1 and lock.wait.sum >= 0.02  # only the contended acquire
+    assert "pool_acquires_total 2" in registry.render()
+
+
+def test_cache_manager_timings(monkeypatch):
+    registry = metrics.registry
+    monkeypatch.setattr(registry, "enabled", True)
+
+    mgr = BaseManager(cache_cls=AdminCacheManager)
+    cache = mgr.cache
+    cache.sync_writer = _Writer()
+    cache.repo = SimpleNamespace(changed_since=_changed_since)
+
+    async def _run():
+        async with mgr._lock:
+            for i in (1, 2):
+                mgr._cache[i] = _CachedAdmin.model_validate({"id": i, "nickname": "n", "tg_id": i})
+                cache._mark_dirty(i)
+        assert "cache_dirty{manager=\"AdminCacheManager\"} 2" in registry.render()
+        await cache.sync()
+        await cache._reload()
+
+    asyncio.run(_run())
+    assert cache.metrics.sync_duration.count == 1
+    assert cache.metrics.sync_duration.sum >= 0.01
+    assert cache.metrics.synced.value == 2
+    assert cache.metrics.reload_duration.count == 1
+    assert cache.metrics.reloaded_rows.value == 3
+    text = registry.render()
+    assert 'cache_dirty{manager="AdminCacheManager"} 0' in text
+    assert 'cache_lock_acquires_total{manager="AdminCacheManager"}' in text
+    assert 'cache_lock_wait_seconds_count{manager="AdminCacheManager"}' in text
+
+
+async def _changed_since(cursor):
+    return [SimpleNamespace(id=i, nickname="n", tg_id=i) for i in (1, 2, 3)]
+
+
+def test_handlers_are_timed_and_served():
+    async def _run():
+        registry = Registry(enabled=True)
+        router = Router()
+
+        @router.message()
+        async def greet(message: Message):
+            if message.text == "boom":
+                raise RuntimeError("boom")
+
+        dp = Dispatcher()
+        dp.message.middleware(HandlerMetricsMiddleware(registry))
+        dp.include_router(Router()).include_router(router)
+        bot = Bot("42:TEST")
+        for update_id, text in ((1, "hi"), (2, "boom")):
+            update = {
+                "update_id": update_id,
+                "message": {
+                    "message_id": update_id, "date": 0, "text": text,
+                    "chat": {"id": 1, "type": "private"},
+                    "from": {"id": 1, "is_bot": False, "first_name": "u"},
+                },
+            }
+            try:
+                await dp.feed_update(bot, Update.model_validate(update))
+            except RuntimeError:
+                pass
+        await bot.session.close()
+
+        exporter = MetricsExporter(registry)
+        async with TestClient(TestServer(exporter.build_app())) as client:
+            resp = await client.get("/metrics")
+            assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            return await resp.text()
+
+    text = asyncio.run(_run())
+    greet = "test_handlers_are_timed_and_served.<locals>._run.<locals>.greet"
+    label = f'{{handler="test_metrics.{greet}"}}'
+    assert f"handler_seconds_count{label} 2" in text
+    assert f"handler_errors_total{label} 1" in text
+
+
+def test_exporter_dumps_on_close(tmp_path):
+    registry = Registry(enabled=True)
+    registry.counter("events_total").inc()
+    target = tmp_path / "metrics.prom"
+
+    async def _run():
+        exporter = MetricsExporter(registry, file=str(target), interval=3600)
+        await exporter.start()
+        await exporter.close()
+
+    asyncio.run(_run())
+    assert target.read_text() == "# TYPE events_total counter\nevents_total 1\n"
+
+
+def test_exporter_renders_on_the_loop_and_survives_errors(tmp_path):
+    registry = Registry(enabled=True)
+    threads = []
+
+    def read():
+        threads.append(threading.current_thread())
+        if len(threads) == 1:
+            raise RuntimeError("dictionary changed size during iteration")
+        return 1
+
+    registry.gauge("queued", read=read)
+    target = tmp_path / "metrics.prom"
+
+    async def _run():
+        exporter = MetricsExporter(registry, file=str(target), interval=0.01)
+        await exporter.start()
+        await asyncio.sleep(0.1)
+        assert not exporter._dump_task.done()
+        await exporter.close()
+
+    asyncio.run(_run())
+    assert set(threads) == {threading.main_thread()}
+    assert "queued 1" in target.read_text()
@@ -0,0 +1,174 @@
+import asyncio
+import time
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message, Update
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from brvideo.bot.services.ratelimit import RateLimitMiddleware, TokenBucket
+from brvideo.bot.services.scheduler import UpdateScheduler
+from brvideo.bot.services.send_queue import SendQueue
+
+
+class FakeTelegram:
+    """Local Bot API stand-in, reachable the same way as LOCAL_SESSION_URL."""
+
+    def __init__(self, flood: int = 0):
+        self.flood = flood
+        self.sent = []
+        self.app = web.Application()
+        self.app.router.add_post("/bot{token}/{method}", self.handle)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        data = dict(await request.post())
+        if self.flood:
+            self.flood -= 1
+            return web.json_response(
+                {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": "Too Many Requests: retry after 1",
+                    "parameters": {"retry_after": 1},
+                }
+            )
+        self.sent.append((time.monotonic(), data))
+        return web.json_response(
+            {
+                "ok": True,
+                "result": {
+                    "message_id": len(self.sent),
+                    "date": 0,
+                    "chat": {"id": int(data["chat_id"]), "type": "private"},
+                    "text": data["text"],
+                },
+            }
+        )
+
+
+async def _bot(server: TestServer, limiter: RateLimitMiddleware) -> Bot:
+    session = AiohttpSession(
+        api=TelegramAPIServer.from_base(str(server.make_url("")), is_local=True)
+    )
+    session.middleware(limiter)
+    return Bot("42:TEST", session=session)
+
+
+def test_token_bucket_spaces_out_calls():
+    async def _run():
+        bucket = TokenBucket(rate=100, capacity=1)
+        started = time.monotonic()
+        for _ in range(6):
+            await bucket.acquire()
+        # one token up front, five more at 10ms each
+        assert time.monotonic() - started >= 0.045
+
+    asyncio.run(_run())
+
+
+def test_per_chat_limit_and_retry_after():
+    async def _run():
+        fake = FakeTelegram(flood=1)
+        async with TestServer(fake.app) as server:
+            limiter = RateLimitMiddleware(global_rate=1000, chat_rate=50, chat_burst=1)
+            bot = await _bot(server, limiter)
+
+            started = time.monotonic()
+            await asyncio.gather(*(bot.send_message(1, f"m{i}") for i in range(3)))
+            # the first call was answered with retry_after=1
+            assert time.monotonic() - started >= 1
+            assert limiter.stats.retried == 1
+            assert sorted(data["text"] for _, data in fake.sent) == ["m0", "m1", "m2"]
+            stamps = [t for t, _ in fake.sent]
+            assert all(b - a >= 0.015 for a, b in zip(stamps, stamps[1:]))
+            assert limiter.depth == 0
+
+            await bot.session.close()
+
+    asyncio.run(_run())
+
+
+def test_send_queue_coalesces_bursts():
+    async def _run():
+        fake = FakeTelegram()
+        async with TestServer(fake.app) as server:
+            limiter = RateLimitMiddleware(global_rate=1000, chat_rate=20, chat_burst=1)
+            bot = await _bot(server, limiter)
+            queue = SendQueue(bot)
+
+            for i in range(10):
+                queue.send(-100, f"app {i}", message_thread_id=5)
+            queue.send(7, "other chat")
+            assert queue.depth == 11
+            await queue.close()
+
+            texts = [data["text"] for _, data in fake.sent]
+            assert "other chat" in texts
+            group = [t for t in texts if t != "other chat"]
+            assert len(group) < 10
+            assert "\n\n".join(group).split("\n\n") == [f"app {i}" for i in range(10)]
+            assert queue.depth == 0
+            assert queue.stats.coalesced == 10 - len(group)
+
+            # a message with a keyboard is neither joined nor reordered
+            fake.sent.clear()
+            markup = InlineKeyboardMarkup(
+                inline_keyboard=[[InlineKeyboardButton(text="ok", callback_data="ok")]]
+            )
+            queue.send(1, "before")
+            queue.send(1, "digest", reply_markup=markup)
+            queue.send(1, "after")
+            await queue.close()
+            sent = [(data["text"], "reply_markup" in data) for _, data in fake.sent]
+            assert sent == [("before", False), ("digest", True), ("after", False)]
+
+            await bot.session.close()
+
+    asyncio.run(_run())
+
+
+def test_throttled_replies_give_their_scheduler_slot_back():
+    async def _run():
+        fake = FakeTelegram()
+        async with TestServer(fake.app) as server:
+            limiter = RateLimitMiddleware(global_rate=1000, chat_rate=5, chat_burst=1)
+            bot = await _bot(server, limiter)
+            scheduler = UpdateScheduler(concurrency=1)
+            done = {}
+
+            async def chatty(message: Message):
+                for i in range(3):  # 0.2s apart
+                    await message.answer(f"{message.text} {i}")
+                done[message.chat.id] = time.monotonic()
+
+            router = Router()
+            router.message()(chatty)
+            dp = Dispatcher()
+            scheduler.install(dp)
+            dp.include_router(router)
+
+            started = time.monotonic()
+            for chat in (1, 2):
+                update = {
+                    "update_id": chat,
+                    "message": {
+                        "message_id": chat,
+                        "date": 0,
+                        "chat": {"id": chat, "type": "private"},
+                        "from": {"id": chat, "is_bot": False, "first_name": "u"},
+                        "text": "hi",
+                    },
+                }
+                await scheduler.submit(dp.feed_update(bot, Update.model_validate(update)))
+            await scheduler.join()
+
+            # with the only slot held while chat 1 waits, chat 2 would start after it
+            assert done[2] - started < 0.6
+            assert done[1] - started < 0.6
+            assert len(fake.sent) == 6
+
+            await bot.session.close()
+
+    asyncio.run(_run())
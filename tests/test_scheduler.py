@@ -0,0 +1,104 @@
+import asyncio
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.types import Message, Update
+
+from brvideo.bot.services.scheduler import UpdateScheduler
+
+
+def _update(update_id: int, chat_id: int, text: str) -> Update:
+    return Update.model_validate(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": 0,
+                "chat": {"id": chat_id, "type": "private"},
+                "from": {"id": chat_id, "is_bot": False, "first_name": "u"},
+                "text": text,
+            },
+        }
+    )
+
+
+def _dispatcher(scheduler: UpdateScheduler, handler):
+    router = Router()
+    router.message()(handler)
+    dp = Dispatcher()
+    dp.update.outer_middleware(scheduler)
+    dp.include_router(router)
+    return dp
+
+
+def test_same_chat_runs_in_order_and_chats_run_in_parallel():
+    async def _run():
+        scheduler = UpdateScheduler(concurrency=8)
+        log = []
+        active = {"now": 0, "max": 0}
+
+        async def handler(message: Message):
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+            # later messages finish faster, so only the scheduler keeps them ordered
+            await asyncio.sleep(0.01 / int(message.text))
+            log.append((message.chat.id, int(message.text)))
+            active["now"] -= 1
+
+        dp = _dispatcher(scheduler, handler)
+        bot = Bot("42:TEST")
+        for i in range(1, 6):
+            for chat in (1, 2, 3):
+                await scheduler.submit(dp.feed_update(bot, _update(i * 10 + chat, chat, str(i))))
+        await scheduler.join()
+        await bot.session.close()
+
+        for chat in (1, 2, 3):
+            assert [n for c, n in log if c == chat] == [1, 2, 3, 4, 5]
+        # one handler per chat at a time, three chats side by side
+        assert active["max"] == 3
+        assert scheduler.busy_chats == 0
+
+    asyncio.run(_run())
+
+
+def test_global_concurrency_limit():
+    async def _run():
+        scheduler = UpdateScheduler(concurrency=2)
+        active = {"now": 0, "max": 0}
+
+        async def handler(message: Message):
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+            await asyncio.sleep(0.005)
+            active["now"] -= 1
+
+        dp = _dispatcher(scheduler, handler)
+        bot = Bot("42:TEST")
+        for chat in range(10):
+            await scheduler.submit(dp.feed_update(bot, _update(chat, chat, "x")))
+        await scheduler.join()
+        await bot.session.close()
+
+        assert active["max"] == 2
+
+    asyncio.run(_run())
+
+
+def test_submit_waits_when_full():
+    async def _run():
+        scheduler = UpdateScheduler(max_pending=2)
+        release = asyncio.Event()
+
+        await scheduler.submit(release.wait())
+        await scheduler.submit(release.wait())
+        blocked = asyncio.create_task(scheduler.submit(release.wait()))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        assert scheduler.pending == 2
+
+        release.set()
+        await blocked
+        await scheduler.join()
+        assert scheduler.pending == 0
+
+    asyncio.run(_run())
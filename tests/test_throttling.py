@@ -0,0 +1,121 @@
+import asyncio
+import time
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.types import Message, Update
+
+from brvideo.bot.handlers import get_root_router
+from brvideo.bot.middlewares.throttling import RateTable, ThrottlingMiddleware
+from brvideo.bot.services.bot import BotService, BotServiceConfig
+from brvideo.bot.services.scheduler import UpdateScheduler
+
+
+def _update(update_id: int, user_id: int) -> Update:
+    return Update.model_validate(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": 0,
+                "chat": {"id": user_id, "type": "private"},
+                "from": {"id": user_id, "is_bot": False, "first_name": "u"},
+                "text": "hi",
+            },
+        }
+    )
+
+
+def test_rate_table_allows_burst_then_limits():
+    table = RateTable(rate=10, burst=3)
+    assert [table.wait(1) for _ in range(3)] == [0, 0, 0]
+    assert table.wait(1) > 0
+    assert table.wait(2) == 0  # users are independent
+
+    time.sleep(0.11)
+    assert table.wait(1) == 0
+
+
+def test_rate_table_forgets_idle_users():
+    table = RateTable(rate=20, burst=1)
+    for user_id in range(10_000):
+        table.wait(user_id)
+    assert len(table) == 10_000
+
+    time.sleep(table.period * 2.5)
+    table.wait(-1)
+    assert len(table) == 1
+
+
+def _run_updates(middleware: ThrottlingMiddleware, updates):
+    handled = []
+    router = Router()
+
+    @router.message()
+    async def _record(message: Message):
+        handled.append(message.message_id)
+
+    dp = Dispatcher()
+    dp.update.middleware(middleware)
+    dp.include_router(router)
+
+    async def _run():
+        bot = Bot("42:TEST")
+        await asyncio.gather(*(dp.feed_update(bot, update) for update in updates))
+        await bot.session.close()
+
+    asyncio.run(_run())
+    return handled
+
+
+def test_drop_mode_counts_dropped_updates():
+    middleware = ThrottlingMiddleware(rate=1, burst=2, mode="drop")
+    handled = _run_updates(
+        middleware, [_update(i, user_id=7) for i in range(5)] + [_update(9, user_id=8)]
+    )
+    assert sorted(handled) == [0, 1, 9]
+    assert middleware.stats.dropped == 3
+    assert middleware.stats.passed == 3
+
+
+def test_delay_mode_spaces_out_updates():
+    middleware = ThrottlingMiddleware(rate=50, burst=1, mode="delay", max_delay=0.05)
+    started = time.monotonic()
+    handled = _run_updates(middleware, [_update(i, user_id=7) for i in range(5)])
+    # 0 passes at once, 1 and 2 wait for their slot, the rest are too far out
+    assert sorted(handled) == [0, 1, 2]
+    assert middleware.stats.delayed == 2 and middleware.stats.dropped == 2
+    assert time.monotonic() - started >= 0.04
+
+
+def test_delayed_updates_do_not_hold_scheduler_permits():
+    async def _run():
+        service = BotService(BotServiceConfig(token="42:TEST"))
+        await service.initialize()
+        outer = [type(mw) for mw in service.dp.update.outer_middleware]
+        assert outer.index(ThrottlingMiddleware) < outer.index(UpdateScheduler)
+        await service.close()
+        # the root router is built once per process, free it for other tests
+        get_root_router()._parent_router = None
+
+        # a flood sleeping in the throttle leaves the only permit free
+        handled = []
+        router = Router()
+
+        @router.message()
+        async def _record(message: Message):
+            handled.append(message.message_id)
+
+        dp = Dispatcher()
+        dp.update.outer_middleware(ThrottlingMiddleware(rate=5, burst=1, max_delay=1))
+        dp.update.outer_middleware(UpdateScheduler(concurrency=1))
+        dp.include_router(router)
+        bot = Bot("42:TEST")
+        flood = [asyncio.create_task(dp.feed_update(bot, _update(i, 7))) for i in range(3)]
+        await asyncio.sleep(0.05)
+        await asyncio.wait_for(dp.feed_update(bot, _update(10, 8)), timeout=0.1)
+        assert handled == [0, 10]
+        await asyncio.gather(*flood)
+        await bot.session.close()
+        assert handled == [0, 10, 1, 2]
+
+    asyncio.run(_run())
@@ -0,0 +1,56 @@
+import asyncio
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.types import Message, Update
+
+from brvideo.bot.middlewares.ensure_message import (
+    EnsureCallbackQueryMiddleware,
+    EnsureMessageMiddleware,
+)
+from brvideo.bot.services.bot import BotService, BotServiceConfig
+
+
+def test_allowed_updates_follow_registered_handlers():
+    async def _run():
+        service = BotService(BotServiceConfig(token="42:TEST"))
+        await service.initialize()
+        assert sorted(service.allowed_updates) == ["callback_query", "message"]
+
+        outer = {
+            name: [type(mw) for mw in observer.outer_middleware]
+            for name, observer in service.dp.observers.items()
+        }
+        assert EnsureMessageMiddleware in outer["message"]
+        assert EnsureCallbackQueryMiddleware in outer["callback_query"]
+        assert EnsureMessageMiddleware not in outer["update"]
+        await service.close()
+
+    asyncio.run(_run())
+
+
+def test_message_checks_cover_nested_routers():
+    async def _run():
+        handled = []
+        nested = Router()
+
+        @nested.message()
+        async def _record(message: Message):
+            handled.append(message.message_id)
+
+        dp = Dispatcher()
+        dp.message.outer_middleware(EnsureMessageMiddleware())
+        dp.include_router(Router()).include_router(nested)
+
+        bot = Bot("42:TEST")
+        chat = {"id": -5, "type": "supergroup"}
+        for update in (
+            {"update_id": 1, "message": {"message_id": 1, "date": 0, "chat": chat,
+                                         "from": {"id": 1, "is_bot": False, "first_name": "u"}}},
+            # anonymous admin post without from_user never reaches handlers
+            {"update_id": 2, "message": {"message_id": 2, "date": 0, "chat": chat}},
+        ):
+            await dp.feed_update(bot, Update.model_validate(update))
+        await bot.session.close()
+        assert handled == [1]
+
+    asyncio.run(_run())
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from aiogram import Bot, Dispatcher, Router
+from aiogram.types import Message
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+from pydantic import ValidationError
+
+from brvideo.bot.services.scheduler import UpdateScheduler
+from brvideo.bot.services.webhook import QueuedRequestHandler
+from brvideo.core.config import Settings
+
+
+def _update(update_id: int, text: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": 1, "type": "private"},
+            "from": {"id": 1, "is_bot": False, "first_name": "u"},
+            "text": text,
+        },
+    }
+
+
+def _setup(received: list, concurrency: int = 4, max_pending: int = 100, **handler_kwargs):
+    router = Router()
+
+    @router.message()
+    async def _record(message: Message):
+        received.append(message.text)
+
+    scheduler = UpdateScheduler(concurrency=concurrency, max_pending=max_pending)
+    dp = Dispatcher()
+    dp.update.outer_middleware(scheduler)
+    dp.include_router(router)
+    handler = QueuedRequestHandler(
+        dispatcher=dp, bot=Bot("42:TEST"), scheduler=scheduler, **handler_kwargs
+    )
+    app = web.Application()
+    handler.register(app, path="/webhook")
+    return app, handler
+
+
+def test_webhook_rejects_wrong_secret_and_processes_updates():
+    async def _run():
+        received = []
+        app, handler = _setup(received, secret_token="s3cret")
+        async with TestClient(TestServer(app)) as client:
+            resp = await client.post(
+                "/webhook",
+                json=_update(1, "nope"),
+                headers={"X-Telegram-Bot-Api-Secret-Token": "wrong"},
+            )
+            assert resp.status == 401
+
+            for i in range(2, 12):
+                resp = await client.post(
+                    "/webhook",
+                    json=_update(i, f"m{i}"),
+                    headers={"X-Telegram-Bot-Api-Secret-Token": "s3cret"},
+                )
+                assert resp.status == 200
+            await handler.join()
+
+        assert sorted(received) == sorted(f"m{i}" for i in range(2, 12))
+        await handler.bot.session.close()
+
+    asyncio.run(_run())
+
+
+def test_webhook_drains_queue_on_shutdown():
+    async def _run():
+        received = []
+        app, handler = _setup(received, concurrency=1)
+        async with TestClient(TestServer(app)) as client:
+            for i in range(1, 21):
+                resp = await client.post("/webhook", json=_update(i, f"m{i}"))
+                assert resp.status == 200
+        # leaving the client runs on_shutdown, which waits for queued updates
+        assert len(received) == 20
+        await handler.bot.session.close()
+
+    asyncio.run(_run())
+
+
+def test_webhook_malformed_body():
+    async def _run():
+        app, handler = _setup([])
+        async with TestClient(TestServer(app)) as client:
+            resp = await client.post("/webhook", data=b"not json")
+            assert resp.status == 400
+        await handler.bot.session.close()
+
+    asyncio.run(_run())
+
+
+def test_public_webhook_requires_a_secret():
+    with pytest.raises(ValidationError, match="WEBHOOK_SECRET"):
+        Settings(_env_file=None, WEBHOOK_URL="https://example.com")  # type: ignore[call-arg]
+    settings = Settings(
+        _env_file=None, WEBHOOK_URL="https://example.com", WEBHOOK_SECRET="s3cret"
+    )  # type: ignore[call-arg]
+    assert settings.WEBHOOK_SECRET == "s3cret"
+    assert Settings(_env_file=None).WEBHOOK_SECRET is None  # type: ignore[call-arg]